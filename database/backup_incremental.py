@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+database/backup_incremental.py
+
+Deltas do banco entre dois snapshots completos.
+
+Triggers anotam em alteracoes_backup o id de cada linha inserida, alterada
+ou removida em usuarios, ferramentas, maquinas e marcadores_turno (e de
+cada linha de logs alterada ou removida); as linhas novas do ledger são as de id acima da
+marca guardada em backup_estado. Tabelas sem id inteiro (catalogo_ferramentas
+e as marcas d'água de marcas_exportacao) são anotadas pela chave, em
+alteracoes_backup_chaves. Um delta é um arquivo SQLite pequeno com
+essas linhas, os ids removidos e os metadados da cadeia (snapshot base e
+número de sequência). Aplicados em ordem sobre o snapshot, os deltas
+reconstroem o banco do turno.
+
+A orquestração (nomes de arquivo, snapshot semanal, restauração e
+retenção) fica em database/database_backup.py.
+"""
+import os
+import sqlite3
+import datetime
+from contextlib import closing
+from typing import Dict, List, Optional
+
+# Tabelas cujas inserções, alterações e remoções vão para o delta. As da
+# migração 4 ficam separadas: DDL_ALTERACOES_BACKUP não pode mudar depois de publicada
+_TABELAS_MIGRACAO_4 = ("usuarios", "ferramentas", "maquinas")
+TABELAS_RASTREADAS = (*_TABELAS_MIGRACAO_4, "marcadores_turno")
+# Tabelas rastreadas pela chave primária TEXT: tabela -> coluna da chave
+TABELAS_RASTREADAS_POR_CHAVE = {"catalogo_ferramentas": "codigo_barra", "marcas_exportacao": "destino"}
+
+
+def _triggers(tabela: str, eventos: Dict[str, List[str]]) -> List[str]:
+    ddl = []
+    for evento, linhas in eventos.items():
+        valores = ", ".join(f"('{tabela}', {linha}.id)" for linha in linhas)
+        ddl.append(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{tabela}_backup_{evento.lower()}
+        AFTER {evento} ON {tabela}
+        BEGIN
+            INSERT OR IGNORE INTO alteracoes_backup (tabela, linha_id) VALUES {valores};
+        END
+        """)
+    return ddl
+
+
+def _triggers_por_chave(tabela: str, chave: str) -> List[str]:
+    # NOT EXISTS em vez de OR IGNORE: um UPSERT na tabela anularia o OR IGNORE do trigger
+    ddl = []
+    for evento, linhas in {"INSERT": ["NEW"], "UPDATE": ["OLD", "NEW"], "DELETE": ["OLD"]}.items():
+        anotacoes = "".join(f"""
+            INSERT INTO alteracoes_backup_chaves (tabela, chave)
+            SELECT '{tabela}', {linha}.{chave}
+            WHERE NOT EXISTS (SELECT 1 FROM alteracoes_backup_chaves
+                              WHERE tabela = '{tabela}' AND chave = {linha}.{chave});""" for linha in linhas)
+        ddl.append(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{tabela}_backup_{evento.lower()}
+        AFTER {evento} ON {tabela}
+        BEGIN{anotacoes}
+        END
+        """)
+    return ddl
+
+
+DDL_ALTERACOES_BACKUP = [
+    """
+    CREATE TABLE IF NOT EXISTS alteracoes_backup (
+        tabela TEXT NOT NULL,
+        linha_id INTEGER NOT NULL,
+        PRIMARY KEY (tabela, linha_id)
+    ) WITHOUT ROWID
+    """,
+    # Uma única linha: snapshot base da cadeia atual, último delta gerado e
+    # maior id de logs já coberto pela cadeia
+    """
+    CREATE TABLE IF NOT EXISTS backup_estado (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        base TEXT,
+        base_data TEXT,
+        sequencia INTEGER NOT NULL DEFAULT 0,
+        ultimo_log_id INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "INSERT OR IGNORE INTO backup_estado (id) VALUES (1)",
+    *[
+        ddl
+        for tabela in _TABELAS_MIGRACAO_4
+        for ddl in _triggers(tabela, {
+            "INSERT": ["NEW"], "UPDATE": ["OLD", "NEW"], "DELETE": ["OLD"],
+        })
+    ],
+    # O ledger só cresce; inserções saem pela marca de id, não por trigger
+    *_triggers("logs", {"UPDATE": ["OLD", "NEW"], "DELETE": ["OLD"]}),
+]
+
+# Rastreamento de marcadores_turno (migração 5, depois de criar a tabela). A
+# cadeia em andamento é invalidada: o snapshot dela não tem a tabela, então o
+# próximo backup começa uma cadeia nova com snapshot
+DDL_RASTREAR_MARCADORES = [
+    *_triggers("marcadores_turno", {"INSERT": ["NEW"], "UPDATE": ["OLD", "NEW"], "DELETE": ["OLD"]}),
+    "UPDATE backup_estado SET base = NULL, base_data = NULL, sequencia = 0 WHERE id = 1",
+]
+
+
+def ddl_rastrear_por_chave(tabela: str) -> List[str]:
+    """
+    Passos de migração que passam a rastrear uma tabela de
+    TABELAS_RASTREADAS_POR_CHAVE (e criam alteracoes_backup_chaves, se
+    preciso). Como em DDL_RASTREAR_MARCADORES, a cadeia em andamento é
+    invalidada: as alterações anteriores aos triggers não estão nos deltas.
+    """
+    return [
+        """
+        CREATE TABLE IF NOT EXISTS alteracoes_backup_chaves (
+            tabela TEXT NOT NULL,
+            chave TEXT NOT NULL,
+            PRIMARY KEY (tabela, chave)
+        ) WITHOUT ROWID
+        """,
+        *_triggers_por_chave(tabela, TABELAS_RASTREADAS_POR_CHAVE[tabela]),
+        "UPDATE backup_estado SET base = NULL, base_data = NULL, sequencia = 0 WHERE id = 1",
+    ]
+
+
+def _conectar(caminho: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(caminho, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA busy_timeout = 30000")
+    return conn
+
+
+def estado_backup(caminho: str) -> dict:
+    """Lê backup_estado do banco: base, base_data, sequencia e ultimo_log_id."""
+    with closing(_conectar(caminho)) as conn:
+        base, base_data, sequencia, ultimo_log_id = conn.execute(
+            "SELECT base, base_data, sequencia, ultimo_log_id FROM backup_estado WHERE id = 1"
+        ).fetchone()
+    return {
+        "base": base,
+        "base_data": datetime.date.fromisoformat(base_data) if base_data else None,
+        "sequencia": sequencia,
+        "ultimo_log_id": ultimo_log_id,
+    }
+
+
+def iniciar_cadeia(caminho: str, base: Optional[str], base_data: Optional[datetime.date] = None) -> None:
+    """
+    Começa uma cadeia nova: zera as alterações anotadas e move a marca do
+    ledger para o último log. Chamado antes de copiar o snapshot `base`, de
+    modo que tudo o que acontecer depois vá para o próximo delta (o que já
+    entrar no snapshot é reaplicado sem efeito). base=None invalida a cadeia
+    e força um snapshot no próximo backup.
+    """
+    with closing(_conectar(caminho)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM alteracoes_backup")
+            conn.execute("DELETE FROM alteracoes_backup_chaves")
+            conn.execute(
+                "UPDATE backup_estado SET base = ?, base_data = ?, sequencia = 0, "
+                "ultimo_log_id = (SELECT COALESCE(MAX(id), 0) FROM logs) WHERE id = 1",
+                (base, base_data.isoformat() if base_data else None)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def gerar_delta(caminho: str, destino: str, criado_em: Optional[datetime.datetime] = None) -> dict:
+    """
+    Grava em `destino` as mudanças desde o último backup da cadeia.
+
+    Tudo acontece numa transação de escrita do banco em uso: as linhas são
+    copiadas, as anotações zeradas e a sequência avançada de uma vez, então
+    nenhuma alteração fica de fora nem é contada duas vezes. O delta é
+    pequeno, e o lock dura poucos milissegundos.
+
+    :return: dict com base, sequencia, linhas (por tabela), removidos e bytes
+    :raises ValueError: se não houver snapshot base (iniciar_cadeia não rodou)
+    """
+    criado_em = criado_em or datetime.datetime.now()
+    temporario = destino + ".tmp"
+    if os.path.exists(temporario):
+        os.remove(temporario)
+
+    linhas = {}
+    with closing(_conectar(caminho)) as conn:
+        conn.execute("ATTACH DATABASE ? AS delta", (temporario,))
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                base, sequencia, ultimo_log_id = conn.execute(
+                    "SELECT base, sequencia, ultimo_log_id FROM backup_estado WHERE id = 1"
+                ).fetchone()
+                if base is None:
+                    raise ValueError("Banco sem snapshot base: faça um backup completo antes do delta.")
+                sequencia += 1
+
+                for tabela in TABELAS_RASTREADAS:
+                    conn.execute(
+                        f"CREATE TABLE delta.{tabela} AS SELECT * FROM main.{tabela} WHERE id IN "
+                        f"(SELECT linha_id FROM alteracoes_backup WHERE tabela = '{tabela}')"
+                    )
+                for tabela, chave in TABELAS_RASTREADAS_POR_CHAVE.items():
+                    conn.execute(
+                        f"CREATE TABLE delta.{tabela} AS SELECT * FROM main.{tabela} WHERE {chave} IN "
+                        f"(SELECT chave FROM alteracoes_backup_chaves WHERE tabela = '{tabela}')"
+                    )
+                conn.execute(
+                    "CREATE TABLE delta.logs AS SELECT * FROM main.logs WHERE id > ? OR id IN "
+                    "(SELECT linha_id FROM alteracoes_backup WHERE tabela = 'logs')",
+                    (ultimo_log_id,)
+                )
+                conn.execute("CREATE TABLE delta.removidos (tabela TEXT NOT NULL, linha_id INTEGER NOT NULL)")
+                for tabela in (*TABELAS_RASTREADAS, "logs"):
+                    conn.execute(
+                        f"INSERT INTO delta.removidos SELECT tabela, linha_id FROM alteracoes_backup a "
+                        f"WHERE tabela = '{tabela}' AND NOT EXISTS "
+                        f"(SELECT 1 FROM main.{tabela} t WHERE t.id = a.linha_id)"
+                    )
+                    linhas[tabela] = conn.execute(f"SELECT COUNT(*) FROM delta.{tabela}").fetchone()[0]
+                conn.execute("CREATE TABLE delta.removidos_chaves (tabela TEXT NOT NULL, chave TEXT NOT NULL)")
+                for tabela, chave in TABELAS_RASTREADAS_POR_CHAVE.items():
+                    conn.execute(
+                        f"INSERT INTO delta.removidos_chaves SELECT tabela, chave FROM alteracoes_backup_chaves a "
+                        f"WHERE tabela = '{tabela}' AND NOT EXISTS "
+                        f"(SELECT 1 FROM main.{tabela} t WHERE t.{chave} = a.chave)"
+                    )
+                    linhas[tabela] = conn.execute(f"SELECT COUNT(*) FROM delta.{tabela}").fetchone()[0]
+                removidos = conn.execute(
+                    "SELECT (SELECT COUNT(*) FROM delta.removidos) + (SELECT COUNT(*) FROM delta.removidos_chaves)"
+                ).fetchone()[0]
+
+                novo_ultimo = conn.execute(
+                    "SELECT MAX(?, COALESCE(MAX(id), 0)) FROM delta.logs", (ultimo_log_id,)
+                ).fetchone()[0]
+                conn.execute("CREATE TABLE delta.meta (chave TEXT PRIMARY KEY, valor TEXT)")
+                conn.executemany("INSERT INTO delta.meta VALUES (?, ?)", [
+                    ("base", base),
+                    ("sequencia", str(sequencia)),
+                    ("log_id_de", str(ultimo_log_id)),
+                    ("log_id_ate", str(novo_ultimo)),
+                    ("criado_em", criado_em.isoformat(timespec="seconds")),
+                ])
+
+                conn.execute("DELETE FROM alteracoes_backup")
+                conn.execute("DELETE FROM alteracoes_backup_chaves")
+                conn.execute(
+                    "UPDATE backup_estado SET sequencia = ?, ultimo_log_id = ? WHERE id = 1",
+                    (sequencia, novo_ultimo)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.execute("DETACH DATABASE delta")
+    os.replace(temporario, destino)
+
+    return {
+        "base": base,
+        "sequencia": sequencia,
+        "linhas": linhas,
+        "removidos": removidos,
+        "bytes": os.path.getsize(destino),
+    }
+
+
+def ler_metadados(delta: str) -> dict:
+    """Metadados de um arquivo de delta: base, sequencia, log_id_de, log_id_ate e criado_em."""
+    with closing(sqlite3.connect(delta)) as conn:
+        meta = dict(conn.execute("SELECT chave, valor FROM meta").fetchall())
+    meta["sequencia"] = int(meta["sequencia"])
+    return meta
+
+
+def aplicar_delta(caminho: str, delta: str) -> None:
+    """
+    Aplica um delta sobre o banco em `caminho`, numa transação.
+
+    As linhas do delta substituem as de mesmo id, ou de mesma chave nas
+    TABELAS_RASTREADAS_POR_CHAVE (remove e insere, para que os triggers de
+    saldos_ativos desfaçam e refaçam o saldo), e os ids e chaves removidos
+    são apagados. Aplicar o mesmo delta de novo não muda nada.
+    """
+    with closing(_conectar(caminho)) as conn:
+        conn.execute("ATTACH DATABASE ? AS delta", (delta,))
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                chaves = {**{tabela: "id" for tabela in (*TABELAS_RASTREADAS, "logs")},
+                          **TABELAS_RASTREADAS_POR_CHAVE}
+                for tabela, chave in chaves.items():
+                    colunas = ", ".join(
+                        linha[1] for linha in conn.execute(f"PRAGMA delta.table_info({tabela})")
+                    )
+                    if not colunas:
+                        # Delta de uma cadeia anterior à tabela
+                        continue
+                    removidos = ("SELECT linha_id FROM delta.removidos" if chave == "id"
+                                 else "SELECT chave FROM delta.removidos_chaves")
+                    conn.execute(
+                        f"DELETE FROM main.{tabela} WHERE {chave} IN (SELECT {chave} FROM delta.{tabela}) "
+                        f"OR {chave} IN ({removidos} WHERE tabela = ?)",
+                        (tabela,)
+                    )
+                    conn.execute(
+                        f"INSERT INTO main.{tabela} ({colunas}) SELECT {colunas} FROM delta.{tabela}"
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.execute("DETACH DATABASE delta")
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+database/busca_ferramentas.py
+
+Busca de ferramentas por texto: parte da descrição, do código de barras ou
+do catálogo da planilha (descrição original, classificação e código do
+produto), com prefixos, sem diferenciar maiúsculas nem acentos.
+
+O índice é a tabela FTS5 busca_ferramentas (rowid = ferramentas.id),
+mantida por triggers em ferramentas e em catalogo_ferramentas (preenchida
+pela importação da planilha). Cada palavra digitada vale como prefixo e
+todas precisam casar; os resultados saem ordenados pelo bm25, com peso
+maior para o código e a descrição (a função de rank do índice, gravada na
+configuração da tabela FTS5, de modo que ORDER BY rank LIMIT n ordena
+todos os resultados e só guarda os n melhores).
+
+Se o SQLite não tiver FTS5, a migração segue sem o índice e a busca cai
+para LIKE (bem mais lenta em cadastros grandes). O índice pode ser
+reconstruído a partir das tabelas:
+
+    python -m database.busca_ferramentas "pastilha tnga"
+    python -m database.busca_ferramentas --reconstruir
+"""
+import re
+import sqlite3
+import logging
+import argparse
+from typing import List
+
+from database.conexao import obter_conexao, transacao
+
+logger = logging.getLogger(__name__)
+
+# Pesos do bm25 por coluna do índice: codigo_barra, nome, catalogo
+PESOS_BM25 = (10.0, 5.0, 1.0)
+
+DDL_CATALOGO_FERRAMENTAS = [
+    # Texto do catálogo (planilha) de cada código, gravado pela importação
+    """
+    CREATE TABLE IF NOT EXISTS catalogo_ferramentas (
+        codigo_barra TEXT PRIMARY KEY,
+        texto TEXT NOT NULL
+    ) WITHOUT ROWID
+    """,
+]
+
+DDL_BUSCA_FERRAMENTAS = [
+    # remove_diacritics 2: "ROSCA" casa com "rôsca"; prefix: índices para prefixos de 2 e 3 letras
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS busca_ferramentas USING fts5(
+        codigo_barra, nome, catalogo,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_ferramentas_busca_insert
+    AFTER INSERT ON ferramentas
+    BEGIN
+        INSERT INTO busca_ferramentas (rowid, codigo_barra, nome, catalogo)
+        VALUES (NEW.id, NEW.codigo_barra, NEW.nome,
+                (SELECT texto FROM catalogo_ferramentas WHERE codigo_barra = NEW.codigo_barra));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_ferramentas_busca_update
+    AFTER UPDATE OF codigo_barra, nome ON ferramentas
+    BEGIN
+        DELETE FROM busca_ferramentas WHERE rowid = OLD.id;
+        INSERT INTO busca_ferramentas (rowid, codigo_barra, nome, catalogo)
+        VALUES (NEW.id, NEW.codigo_barra, NEW.nome,
+                (SELECT texto FROM catalogo_ferramentas WHERE codigo_barra = NEW.codigo_barra));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_ferramentas_busca_delete
+    AFTER DELETE ON ferramentas
+    BEGIN
+        DELETE FROM busca_ferramentas WHERE rowid = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_catalogo_busca_insert
+    AFTER INSERT ON catalogo_ferramentas
+    BEGIN
+        UPDATE busca_ferramentas SET catalogo = NEW.texto
+        WHERE rowid = (SELECT id FROM ferramentas WHERE codigo_barra = NEW.codigo_barra);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_catalogo_busca_update
+    AFTER UPDATE OF texto ON catalogo_ferramentas
+    BEGIN
+        UPDATE busca_ferramentas SET catalogo = NEW.texto
+        WHERE rowid = (SELECT id FROM ferramentas WHERE codigo_barra = NEW.codigo_barra);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_catalogo_busca_delete
+    AFTER DELETE ON catalogo_ferramentas
+    BEGIN
+        UPDATE busca_ferramentas SET catalogo = NULL
+        WHERE rowid = (SELECT id FROM ferramentas WHERE codigo_barra = OLD.codigo_barra);
+    END
+    """,
+]
+
+_PREENCHER_BUSCA = """
+    INSERT INTO busca_ferramentas (rowid, codigo_barra, nome, catalogo)
+    SELECT f.id, f.codigo_barra, f.nome, c.texto
+    FROM ferramentas f
+    LEFT JOIN catalogo_ferramentas c ON c.codigo_barra = f.codigo_barra
+"""
+
+_COLUNAS = ("id", "nome", "codigo_barra", "estoque_almoxarifado", "consumivel")
+
+
+def criar_indice_busca(conn: sqlite3.Connection) -> bool:
+    """
+    Cria o índice, os triggers e indexa o cadastro atual (passo da migração).
+
+    :return: False se o SQLite em uso não tem FTS5 (a busca usa LIKE)
+    """
+    try:
+        conn.execute(DDL_BUSCA_FERRAMENTAS[0])
+    except sqlite3.OperationalError as e:
+        if "fts5" not in str(e):
+            raise
+        logger.warning("SQLite sem FTS5 (%s); a busca de ferramentas vai usar LIKE.", e)
+        return False
+    for ddl in DDL_BUSCA_FERRAMENTAS[1:]:
+        conn.execute(ddl)
+    conn.execute("DELETE FROM busca_ferramentas")
+    conn.execute(_PREENCHER_BUSCA)
+    return True
+
+
+def configurar_ranking(conn: sqlite3.Connection) -> None:
+    """Grava PESOS_BM25 como a função de rank do índice (passo da migração; sem FTS5, nada)."""
+    if conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'busca_ferramentas'"
+    ).fetchone() is None:
+        return
+    conn.execute(
+        "INSERT INTO busca_ferramentas (busca_ferramentas, rank) VALUES ('rank', ?)",
+        (f"bm25({', '.join(map(str, PESOS_BM25))})",)
+    )
+
+
+def indice_disponivel() -> bool:
+    """Se o banco em uso tem o índice FTS5 de busca."""
+    return obter_conexao().execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'busca_ferramentas'"
+    ).fetchone() is not None
+
+
+def reconstruir_indice_busca() -> int:
+    """
+    Refaz o índice a partir de ferramentas e catalogo_ferramentas (também o
+    cria, num banco migrado por um SQLite sem FTS5 e aberto agora com FTS5).
+
+    :return: ferramentas indexadas (0 se não houver FTS5)
+    """
+    with transacao() as conn:
+        if not criar_indice_busca(conn):
+            return 0
+        configurar_ranking(conn)
+        return conn.execute("SELECT COUNT(*) FROM busca_ferramentas").fetchone()[0]
+
+
+def termos_busca(texto: str) -> List[str]:
+    """Palavras do texto como o tokenizer do índice as separa (letras e dígitos)."""
+    return re.findall(r"[^\W_]+", texto)
+
+
+def _buscar_fts(conn: sqlite3.Connection, termos: List[str], limite: int) -> List[tuple]:
+    # ORDER BY rank direto no índice: o FTS5 calcula o bm25 (com os pesos configurados)
+    # de todos os resultados e guarda só os `limite` melhores; o JOIN vem depois
+    return conn.execute(
+        """
+        SELECT f.id, f.nome, f.codigo_barra, f.estoque_almoxarifado, f.consumivel
+        FROM (
+            SELECT rowid, rank
+            FROM busca_ferramentas
+            WHERE busca_ferramentas MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        ) b
+        JOIN ferramentas f ON f.id = b.rowid
+        ORDER BY b.rank
+        """,
+        (" ".join(f'"{termo}"*' for termo in termos), limite)
+    ).fetchall()
+
+
+def _buscar_like(conn: sqlite3.Connection, termos: List[str], limite: int) -> List[tuple]:
+    # Cada palavra em qualquer parte do código, da descrição ou do catálogo (os termos
+    # só têm letras e dígitos, sem curingas do LIKE); varre a tabela inteira
+    condicoes = " AND ".join("(f.codigo_barra LIKE ? OR f.nome LIKE ? OR c.texto LIKE ?)" for _ in termos)
+    return conn.execute(
+        f"""
+        SELECT f.id, f.nome, f.codigo_barra, f.estoque_almoxarifado, f.consumivel
+        FROM ferramentas f
+        LEFT JOIN catalogo_ferramentas c ON c.codigo_barra = f.codigo_barra
+        WHERE {condicoes}
+        ORDER BY f.codigo_barra LIKE ? DESC, f.nome
+        LIMIT ?
+        """,
+        (*[f"%{termo}%" for termo in termos for _ in range(3)], f"{termos[0]}%", limite)
+    ).fetchall()
+
+
+def buscar_ferramentas(texto: str, limite: int = 20) -> List[dict]:
+    """
+    Ferramentas que casam com o texto digitado, das mais relevantes para as
+    menos. Cada palavra vale como prefixo e todas precisam casar em alguma
+    coluna (código, descrição ou catálogo). Sem o índice FTS5, usa LIKE.
+
+    :return: dicts com id, nome, codigo_barra, estoque_almoxarifado e consumivel
+    """
+    termos = termos_busca(texto)
+    if not termos:
+        return []
+    buscar = _buscar_fts if indice_disponivel() else _buscar_like
+    return [
+        {**dict(zip(_COLUNAS, linha)), "consumivel": linha[4].strip().upper()}
+        for linha in buscar(obter_conexao(), termos, limite)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Busca de ferramentas por texto (FTS5)")
+    parser.add_argument("texto", nargs="?")
+    parser.add_argument("--limite", type=int, default=20)
+    parser.add_argument("--reconstruir", action="store_true", help="Refaz o índice a partir do cadastro")
+    args = parser.parse_args()
+    if args.reconstruir:
+        print(f"✅ {reconstruir_indice_busca()} ferramenta(s) indexada(s).")
+    if args.texto:
+        for ferramenta in buscar_ferramentas(args.texto, args.limite):
+            print(f"{ferramenta['codigo_barra']:<12}{ferramenta['nome']}")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+database/cache_ferramentas.py
+
+Cache de leitura (read-through) dos registros de ferramentas.
+
+As telas de movimentação e de estoque consultam a ferramenta a cada leitura
+do código de barras; o cache guarda os registros mais recentes em memória,
+indexados por código de barras e por id, com descarte LRU ao atingir
+config.CACHE_FERRAMENTAS_TAMANHO.
+
+Quem altera a tabela ferramentas chama invalidar_ferramenta() (ou
+limpar_cache_ferramentas() em cargas em lote). Dentro de uma transação a
+invalidação é adiada para o fim dela, e leituras feitas no meio de uma
+transação não populam o cache, para que dados não confirmados nunca
+fiquem guardados.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import database.config as config
+from database.conexao import ao_finalizar_transacao, obter_conexao
+
+
+class CacheFerramentas:
+    """LRU thread-safe de registros de ferramentas, por id e por código de barras."""
+
+    def __init__(self, tamanho: Optional[int] = None):
+        self.tamanho = config.CACHE_FERRAMENTAS_TAMANHO if tamanho is None else tamanho
+        self._lock = threading.Lock()
+        self._por_id: "OrderedDict[int, dict]" = OrderedDict()
+        self._por_codigo: Dict[str, int] = {}
+        self._caminho = None
+        self._versao = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+        self.invalidacoes = 0
+
+    def obter(self, codigo_barra: str = None, ferramenta_id: int = None,
+              carregar: Callable[[], Optional[dict]] = None) -> Optional[dict]:
+        """
+        Retorna uma cópia do registro em cache ou, na falta dele, o resultado
+        de carregar() (que é guardado se a leitura não estiver numa transação).
+        """
+        with self._lock:
+            self._conferir_banco()
+            if ferramenta_id is None:
+                ferramenta_id = self._por_codigo.get(codigo_barra)
+            registro = self._por_id.get(ferramenta_id)
+            if registro is not None:
+                self._por_id.move_to_end(ferramenta_id)
+                self.acertos += 1
+                return dict(registro)
+            self.falhas += 1
+            versao = self._versao
+
+        registro = carregar()
+        if registro is not None and not obter_conexao().in_transaction:
+            self._guardar(registro, versao)
+        return registro
+
+    def invalidar(self, codigo_barra: str = None, ferramenta_id: int = None) -> None:
+        """Remove a ferramenta do cache (por código de barras ou por id)."""
+        with self._lock:
+            if ferramenta_id is None:
+                ferramenta_id = self._por_codigo.get(codigo_barra)
+            self._versao += 1
+            registro = self._por_id.pop(ferramenta_id, None)
+            if registro is not None:
+                self._por_codigo.pop(registro["codigo_barra"], None)
+                self.invalidacoes += 1
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._versao += 1
+            self._por_id.clear()
+            self._por_codigo.clear()
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                "itens": len(self._por_id),
+                "tamanho": self.tamanho,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+                "descartes": self.descartes,
+                "invalidacoes": self.invalidacoes,
+            }
+
+    def _guardar(self, registro: dict, versao: int) -> None:
+        with self._lock:
+            if versao != self._versao:
+                # Houve invalidação durante a leitura: o registro pode estar velho
+                return
+            fid = registro["id"]
+            self._por_id[fid] = dict(registro)
+            self._por_id.move_to_end(fid)
+            self._por_codigo[registro["codigo_barra"]] = fid
+            while len(self._por_id) > self.tamanho:
+                _, antigo = self._por_id.popitem(last=False)
+                self._por_codigo.pop(antigo["codigo_barra"], None)
+                self.descartes += 1
+
+    def _conferir_banco(self) -> None:
+        # O agendador troca de arquivo a cada turno: registros do banco anterior não valem
+        if self._caminho != config.DATABASE_CAMINHO:
+            self._caminho = config.DATABASE_CAMINHO
+            self._versao += 1
+            self._por_id.clear()
+            self._por_codigo.clear()
+
+
+cache_ferramentas = CacheFerramentas()
+
+
+def invalidar_ferramenta(codigo_barra: str = None, ferramenta_id: int = None) -> None:
+    """Invalida a ferramenta no cache ao fim da transação atual (ou já, fora de uma)."""
+    ao_finalizar_transacao(lambda: cache_ferramentas.invalidar(codigo_barra, ferramenta_id))
+
+
+def limpar_cache_ferramentas() -> None:
+    """Esvazia o cache ao fim da transação atual (cargas e remoções em lote)."""
+    ao_finalizar_transacao(cache_ferramentas.limpar)
+
+
+def estatisticas_cache_ferramentas() -> dict:
+    """Acertos, falhas, descartes e ocupação do cache de ferramentas."""
+    return cache_ferramentas.estatisticas()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+database/catalogo_backups.py
+
+Catálogo dos backups: um pequeno banco SQLite (catalogo.db, em BACKUP_DIR)
+com uma linha por backup — tipo, data e turno, tamanho, páginas, SHA-256
+do conteúdo do banco e, nos deltas, o snapshot base e a sequência.
+
+O último backup, as cadeias do modo incremental e os backups vencidos saem
+de consultas indexadas, sem listar o diretório, ler datas de modificação
+nem interpretar nomes de arquivo. Quando o catálogo é criado, os backups
+que já estão no diretório são importados uma única vez (sincronizar()).
+
+    python -m database.catalogo_backups                 # lista os backups
+    python -m database.catalogo_backups --sincronizar   # confere com o diretório
+"""
+import os
+import re
+import gzip
+import sqlite3
+import hashlib
+import logging
+import argparse
+import datetime
+from contextlib import closing
+from typing import Iterable, List, Optional, Tuple
+
+import database.config as config
+from database.backup_incremental import ler_metadados
+
+logger = logging.getLogger(__name__)
+
+ARQUIVO_CATALOGO = "catalogo.db"
+
+# Nome do arquivo → tipo do backup
+TIPOS = {"backup": "completo", "snapshot": "snapshot", "delta": "delta"}
+
+_NOME_BACKUP = re.compile(
+    r"^(backup|snapshot|delta)_(\d{4}-\d{2}-\d{2})_([^_.]+)(?:_\d+)?\.db(\.gz)?$"
+)
+
+_DDL = [
+    # nome: arquivo .db do backup; com compactado = 1, o arquivo em disco é nome + ".gz".
+    # bytes: tamanho em disco; sha256 e paginas: do banco (antes da compressão),
+    # preenchidos quando o conteúdo não muda mais.
+    """
+    CREATE TABLE IF NOT EXISTS backups (
+        nome TEXT PRIMARY KEY,
+        tipo TEXT NOT NULL,
+        data TEXT NOT NULL,
+        turno TEXT NOT NULL,
+        criado_em TEXT NOT NULL,
+        bytes INTEGER NOT NULL,
+        paginas INTEGER,
+        sha256 TEXT,
+        compactado INTEGER NOT NULL DEFAULT 0,
+        base TEXT,
+        sequencia INTEGER
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_backups_tipo_criado ON backups (tipo, criado_em)",
+    "CREATE INDEX IF NOT EXISTS idx_backups_data_turno ON backups (data, turno)",
+    "CREATE INDEX IF NOT EXISTS idx_backups_base ON backups (base, sequencia)",
+]
+
+_BLOCO = 1024 * 1024
+
+
+def _caminho_catalogo() -> str:
+    return os.path.join(config.BACKUP_DIR, ARQUIVO_CATALOGO)
+
+
+def _conectar() -> sqlite3.Connection:
+    novo = not os.path.exists(_caminho_catalogo())
+    conn = sqlite3.connect(_caminho_catalogo(), timeout=30)
+    conn.row_factory = sqlite3.Row
+    with conn:
+        for ddl in _DDL:
+            conn.execute(ddl)
+    if novo:
+        adicionados, _ = _sincronizar(conn)
+        if adicionados:
+            logger.info("Catálogo de backups criado com %d backup(s) já existentes.", adicionados)
+    return conn
+
+
+def caminho_arquivo(backup: dict) -> str:
+    """Caminho em disco de um backup do catálogo."""
+    return os.path.join(config.BACKUP_DIR, backup["nome"] + (".gz" if backup["compactado"] else ""))
+
+
+def calcular_sha256(caminho: str, compactado: Optional[bool] = None) -> str:
+    """
+    SHA-256 do conteúdo do banco, lido em fluxo. Arquivos compactados (por
+    padrão, os terminados em .gz) são descompactados na leitura.
+    """
+    if compactado is None:
+        compactado = caminho.endswith(".gz")
+    sha = hashlib.sha256()
+    with (gzip.open if compactado else open)(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(_BLOCO), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def registrar(caminho: str, data: datetime.date, turno: str, paginas: Optional[int] = None,
+              sha256: Optional[str] = None, base: Optional[str] = None,
+              sequencia: Optional[int] = None) -> None:
+    """Inclui (ou substitui) no catálogo o backup gravado em `caminho`."""
+    nome = os.path.basename(caminho)
+    with closing(_conectar()) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO backups (nome, tipo, data, turno, criado_em, bytes, paginas, "
+            "sha256, compactado, base, sequencia) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)",
+            (
+                nome, TIPOS[nome.split("_", 1)[0]], data.isoformat(), turno,
+                datetime.datetime.now().isoformat(timespec="microseconds"),
+                os.path.getsize(caminho), paginas, sha256, base, sequencia,
+            )
+        )
+
+
+def marcar_compactado(nome: str, bytes_compactado: int, sha256: str, paginas: Optional[int]) -> None:
+    with closing(_conectar()) as conn, conn:
+        conn.execute(
+            "UPDATE backups SET compactado = 1, bytes = ?, sha256 = ?, paginas = COALESCE(?, paginas) "
+            "WHERE nome = ?",
+            (bytes_compactado, sha256, paginas, nome)
+        )
+
+
+def remover(nomes: Iterable[str]) -> None:
+    with closing(_conectar()) as conn, conn:
+        conn.executemany("DELETE FROM backups WHERE nome = ?", ((nome,) for nome in nomes))
+
+
+def _consultar(sql: str, parametros: tuple = ()) -> List[dict]:
+    with closing(_conectar()) as conn:
+        return [dict(linha) for linha in conn.execute(sql, parametros)]
+
+
+def buscar(nome: str) -> Optional[dict]:
+    linhas = _consultar("SELECT * FROM backups WHERE nome = ?", (nome,))
+    return linhas[0] if linhas else None
+
+
+def ultimo(tipos: Tuple[str, ...], excluir: Iterable[str] = ()) -> Optional[dict]:
+    """Backup mais recente dos tipos dados, fora os nomes em `excluir`."""
+    excluir = tuple(excluir)
+    linhas = _consultar(
+        f"SELECT * FROM backups WHERE tipo IN ({','.join('?' * len(tipos))}) "
+        f"AND nome NOT IN ({','.join('?' * len(excluir))}) ORDER BY criado_em DESC LIMIT 1",
+        (*tipos, *excluir)
+    )
+    return linhas[0] if linhas else None
+
+
+def do_turno(data: datetime.date, turno: str, tipos: Tuple[str, ...]) -> List[dict]:
+    """Backups de um turno, do mais antigo ao mais recente."""
+    return _consultar(
+        f"SELECT * FROM backups WHERE data = ? AND turno = ? AND tipo IN ({','.join('?' * len(tipos))}) "
+        f"ORDER BY criado_em",
+        (data.isoformat(), turno, *tipos)
+    )
+
+
+def cadeia(base: str) -> List[dict]:
+    """Deltas do snapshot `base`, em ordem de sequência."""
+    return _consultar("SELECT * FROM backups WHERE base = ? ORDER BY sequencia", (base,))
+
+
+def nao_compactados(tipo: str) -> List[dict]:
+    return _consultar("SELECT * FROM backups WHERE tipo = ? AND compactado = 0 ORDER BY criado_em", (tipo,))
+
+
+def vencidos(limite: datetime.date) -> List[dict]:
+    """
+    Backups a remover: cópias completas anteriores a `limite` e cadeias
+    (snapshot + deltas) cujo backup mais novo é anterior a `limite`.
+    """
+    return _consultar(
+        """
+        SELECT * FROM backups WHERE tipo = 'completo' AND data < :limite
+        UNION ALL
+        SELECT b.* FROM backups b
+        JOIN (
+            SELECT COALESCE(base, nome) AS cadeia, MAX(data) AS ultima
+            FROM backups WHERE tipo IN ('snapshot', 'delta')
+            GROUP BY cadeia
+        ) c ON c.cadeia = COALESCE(b.base, b.nome)
+        WHERE b.tipo IN ('snapshot', 'delta') AND c.ultima < :limite
+        """,
+        {"limite": limite.isoformat()}
+    )
+
+
+def listar() -> List[dict]:
+    return _consultar("SELECT * FROM backups ORDER BY criado_em")
+
+
+def _sincronizar(conn: sqlite3.Connection) -> Tuple[int, int]:
+    """Inclui os arquivos de backup fora do catálogo e tira os que não existem mais."""
+    conhecidos = {linha["nome"]: linha["compactado"] for linha in conn.execute("SELECT nome, compactado FROM backups")}
+    adicionados = 0
+    for filename in sorted(os.listdir(config.BACKUP_DIR)):
+        encontrado = _NOME_BACKUP.match(filename)
+        if not encontrado:
+            continue
+        prefixo, data, turno, gz = encontrado.groups()
+        nome = filename[:-3] if gz else filename
+        if nome in conhecidos and conhecidos[nome] == bool(gz):
+            continue
+        caminho = os.path.join(config.BACKUP_DIR, filename)
+        paginas = base = sequencia = None
+        try:
+            if not gz:
+                with closing(sqlite3.connect(caminho)) as backup:
+                    paginas = backup.execute("PRAGMA page_count").fetchone()[0]
+            if prefixo == "delta":
+                meta = ler_metadados(caminho)
+                base, sequencia = meta["base"], meta["sequencia"]
+        except sqlite3.Error as e:
+            logger.warning("Backup '%s' ilegível, fora do catálogo: %s", filename, e)
+            continue
+        criado_em = datetime.datetime.fromtimestamp(os.path.getmtime(caminho))
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO backups (nome, tipo, data, turno, criado_em, bytes, paginas, "
+                "compactado, base, sequencia) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (nome, TIPOS[prefixo], data, turno, criado_em.isoformat(timespec="microseconds"),
+                 os.path.getsize(caminho), paginas, int(bool(gz)), base, sequencia)
+            )
+        conhecidos[nome] = bool(gz)
+        adicionados += 1
+
+    sumidos = [
+        (linha["nome"],) for linha in conn.execute("SELECT nome, compactado FROM backups")
+        if not os.path.exists(caminho_arquivo(linha))
+    ]
+    with conn:
+        conn.executemany("DELETE FROM backups WHERE nome = ?", sumidos)
+    return adicionados, len(sumidos)
+
+
+def sincronizar() -> Tuple[int, int]:
+    """
+    Confere o catálogo com o diretório (backups copiados à mão, apagados
+    fora do sistema ou gravados antes de uma queda).
+
+    :return: (backups incluídos, backups retirados)
+    """
+    with closing(_conectar()) as conn:
+        return _sincronizar(conn)
+
+
+def _imprimir(backups: List[dict]) -> None:
+    print(f"{'Backup':<40}{'tipo':>10}{'MB':>9}{'páginas':>10}  {'criado em':<20} sha256")
+    for b in backups:
+        nome = b["nome"] + (".gz" if b["compactado"] else "")
+        print(f"{nome:<40}{b['tipo']:>10}{b['bytes'] / 1024 / 1024:>9.1f}"
+              f"{b['paginas'] if b['paginas'] is not None else '-':>10}  {b['criado_em'][:19]:<20} "
+              f"{(b['sha256'] or '-')[:12]}")
+    total = sum(b["bytes"] for b in backups)
+    print(f"📦 {len(backups)} backup(s), {total / 1024 / 1024:.1f} MB em {config.BACKUP_DIR}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Catálogo de backups")
+    parser.add_argument("--sincronizar", action="store_true",
+                        help="Inclui arquivos fora do catálogo e retira os que não existem mais")
+    args = parser.parse_args()
+    if args.sincronizar:
+        incluidos, retirados = sincronizar()
+        print(f"✅ Catálogo sincronizado: {incluidos} incluído(s), {retirados} retirado(s).")
+    _imprimir(listar())
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+database/checkpoints_estoque.py
+
+Estoque e saldos num momento passado, a partir de checkpoints do ledger.
+
+A cada CHECKPOINT_INTERVALO_LOGS logs, um checkpoint guarda o estoque de
+almoxarifado de cada ferramenta e uma cópia de saldos_ativos, junto com o
+último log coberto. Para saber como estavam as coisas num momento T, a
+consulta acha o último log anterior a T e parte do estado mais próximo
+dele — o checkpoint anterior, o seguinte ou o estado atual — reaplicando
+ou desfazendo só os logs entre os dois. O custo depende do intervalo, não
+do tamanho do ledger.
+
+Num ledger que já existia, os checkpoints são criados para trás a partir
+do estado atual, desfazendo um intervalo de logs por vez.
+
+    python -m database.checkpoints_estoque --criar
+    python -m database.checkpoints_estoque --em "2026-10-13 13:59"
+"""
+import sqlite3
+import logging
+import argparse
+import datetime
+from typing import Dict, List, Optional, Tuple
+
+import database.config as config
+from database.conexao import transacao
+from database.saldos import DELTA_SALDO
+
+logger = logging.getLogger(__name__)
+
+# Efeito de uma linha do ledger em estoque_almoxarifado (como em registrar_movimentacao)
+DELTA_ALMOXARIFADO = (
+    "CASE WHEN acao IN ('RETIRADA', 'CONSUMO', 'SUBTRACAO') THEN -quantidade ELSE quantidade END"
+)
+
+DDL_CHECKPOINTS = [
+    # data_hora: a do último log coberto (UTC, como em logs)
+    """
+    CREATE TABLE IF NOT EXISTS checkpoints_estoque (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ultimo_log_id INTEGER NOT NULL UNIQUE,
+        data_hora DATETIME,
+        criado_em DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS checkpoint_ferramentas (
+        checkpoint_id INTEGER NOT NULL,
+        ferramenta_id INTEGER NOT NULL,
+        estoque_almoxarifado INTEGER NOT NULL,
+        PRIMARY KEY (checkpoint_id, ferramenta_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS checkpoint_saldos (
+        checkpoint_id INTEGER NOT NULL,
+        usuario_id INTEGER NOT NULL,
+        ferramenta_id INTEGER NOT NULL,
+        saldo INTEGER NOT NULL,
+        PRIMARY KEY (checkpoint_id, usuario_id, ferramenta_id)
+    ) WITHOUT ROWID
+    """,
+]
+
+# Efeito somado dos logs de id em (:de, :ate]
+_DELTAS_FERRAMENTAS = f"""
+    SELECT ferramenta_id, SUM({DELTA_ALMOXARIFADO}) AS delta FROM logs
+    WHERE id > :de AND id <= :ate
+    GROUP BY ferramenta_id
+"""
+_DELTAS_SALDOS = f"""
+    SELECT usuario_id, ferramenta_id, SUM({DELTA_SALDO}) AS delta FROM logs
+    WHERE id > :de AND id <= :ate
+    GROUP BY usuario_id, ferramenta_id
+"""
+
+Estado = Tuple[Dict[int, int], Dict[Tuple[int, int], int]]
+
+
+def data_hora_utc(momento: datetime.datetime) -> str:
+    """Horário local no formato de logs.data_hora (CURRENT_TIMESTAMP, em UTC)."""
+    return momento.astimezone(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _inserir_checkpoint(conn: sqlite3.Connection, ultimo_log_id: int) -> int:
+    return conn.execute(
+        "INSERT INTO checkpoints_estoque (ultimo_log_id, data_hora) "
+        "VALUES (?, (SELECT data_hora FROM logs WHERE id <= ? ORDER BY id DESC LIMIT 1))",
+        (ultimo_log_id, ultimo_log_id)
+    ).lastrowid
+
+
+def criar_checkpoint() -> Optional[int]:
+    """
+    Checkpoint do estado atual, se o ledger andou CHECKPOINT_INTERVALO_LOGS
+    logs desde o checkpoint mais recente.
+
+    :return: id do checkpoint criado ou None
+    """
+    with transacao() as conn:
+        ultimo = conn.execute("SELECT COALESCE(MAX(id), 0) FROM logs").fetchone()[0]
+        anterior = conn.execute("SELECT COALESCE(MAX(ultimo_log_id), 0) FROM checkpoints_estoque").fetchone()[0]
+        if ultimo - anterior < config.CHECKPOINT_INTERVALO_LOGS:
+            return None
+        checkpoint = _inserir_checkpoint(conn, ultimo)
+        conn.execute(
+            "INSERT INTO checkpoint_ferramentas (checkpoint_id, ferramenta_id, estoque_almoxarifado) "
+            "SELECT ?, id, estoque_almoxarifado FROM ferramentas",
+            (checkpoint,)
+        )
+        conn.execute(
+            "INSERT INTO checkpoint_saldos (checkpoint_id, usuario_id, ferramenta_id, saldo) "
+            "SELECT ?, usuario_id, ferramenta_id, saldo FROM saldos_ativos",
+            (checkpoint,)
+        )
+    return checkpoint
+
+
+def _criar_checkpoint_anterior() -> Optional[int]:
+    """
+    Cria o checkpoint do múltiplo de CHECKPOINT_INTERVALO_LOGS logo abaixo
+    do checkpoint mais antigo, desfazendo sobre ele os logs do intervalo.
+    """
+    with transacao() as conn:
+        mais_antigo = conn.execute(
+            "SELECT id, ultimo_log_id FROM checkpoints_estoque ORDER BY ultimo_log_id LIMIT 1"
+        ).fetchone()
+        if mais_antigo is None:
+            return None
+        base, ate = mais_antigo
+        alvo = (ate - 1) // config.CHECKPOINT_INTERVALO_LOGS * config.CHECKPOINT_INTERVALO_LOGS
+        if alvo <= 0 or not conn.execute("SELECT 1 FROM logs WHERE id <= ? LIMIT 1", (alvo,)).fetchone():
+            return None
+
+        parametros = {"checkpoint": _inserir_checkpoint(conn, alvo), "base": base, "de": alvo, "ate": ate}
+        conn.execute(
+            f"""
+            INSERT INTO checkpoint_ferramentas (checkpoint_id, ferramenta_id, estoque_almoxarifado)
+            SELECT :checkpoint, c.ferramenta_id, c.estoque_almoxarifado - COALESCE(d.delta, 0)
+            FROM checkpoint_ferramentas c
+            LEFT JOIN ({_DELTAS_FERRAMENTAS}) AS d ON d.ferramenta_id = c.ferramenta_id
+            WHERE c.checkpoint_id = :base
+            """,
+            parametros
+        )
+        conn.execute(
+            f"""
+            INSERT INTO checkpoint_saldos (checkpoint_id, usuario_id, ferramenta_id, saldo)
+            SELECT :checkpoint, usuario_id, ferramenta_id, SUM(saldo) AS total FROM (
+                SELECT usuario_id, ferramenta_id, saldo FROM checkpoint_saldos WHERE checkpoint_id = :base
+                UNION ALL
+                SELECT usuario_id, ferramenta_id, -({DELTA_SALDO}) FROM logs WHERE id > :de AND id <= :ate
+            )
+            GROUP BY usuario_id, ferramenta_id
+            HAVING total <> 0
+            """,
+            parametros
+        )
+    return parametros["checkpoint"]
+
+
+def criar_checkpoints() -> int:
+    """
+    Cria o checkpoint do estado atual (se devido) e os que faltam para trás,
+    cada um na sua transação curta.
+
+    :return: quantidade de checkpoints criados
+    """
+    criados = int(criar_checkpoint() is not None)
+    while _criar_checkpoint_anterior() is not None:
+        criados += 1
+    if criados:
+        logger.info("%d checkpoint(s) de estoque criado(s).", criados)
+    return criados
+
+
+def _aplicar(conn: sqlite3.Connection, estado: Estado, de: int, ate: int, sinal: int) -> None:
+    """Soma (sinal=1) ou desfaz (sinal=-1) em `estado` os logs de id em (de, ate]."""
+    ferramentas, saldos = estado
+    for ferramenta_id, delta in conn.execute(_DELTAS_FERRAMENTAS, {"de": de, "ate": ate}):
+        if ferramenta_id in ferramentas:
+            ferramentas[ferramenta_id] += sinal * delta
+    for usuario_id, ferramenta_id, delta in conn.execute(_DELTAS_SALDOS, {"de": de, "ate": ate}):
+        par = (usuario_id, ferramenta_id)
+        saldos[par] = saldos.get(par, 0) + sinal * delta
+
+
+def _estado_em(conn: sqlite3.Connection, momento: datetime.datetime) -> Estado:
+    """
+    Estoque de almoxarifado por ferramenta e saldos por par usuário/ferramenta
+    logo depois do último log registrado até `momento`.
+    """
+    linha = conn.execute(
+        "SELECT id FROM logs WHERE data_hora <= ? ORDER BY data_hora DESC, id DESC LIMIT 1",
+        (data_hora_utc(momento),)
+    ).fetchone()
+    alvo = linha[0] if linha else 0
+    atual = conn.execute("SELECT COALESCE(MAX(id), 0) FROM logs").fetchone()[0]
+
+    # Ponto de partida: o que exigir menos logs reaplicados (None = estado atual)
+    candidatos = [(atual - alvo, None, atual)]
+    for sql in (
+        "SELECT id, ultimo_log_id FROM checkpoints_estoque WHERE ultimo_log_id <= ? "
+        "ORDER BY ultimo_log_id DESC LIMIT 1",
+        "SELECT id, ultimo_log_id FROM checkpoints_estoque WHERE ultimo_log_id > ? "
+        "ORDER BY ultimo_log_id LIMIT 1",
+    ):
+        encontrado = conn.execute(sql, (alvo,)).fetchone()
+        if encontrado:
+            candidatos.append((abs(encontrado[1] - alvo), encontrado[0], encontrado[1]))
+    _, checkpoint, base = min(candidatos, key=lambda candidato: candidato[0])
+
+    ferramentas_atuais = dict(conn.execute("SELECT id, estoque_almoxarifado FROM ferramentas"))
+    if checkpoint is None:
+        ferramentas = ferramentas_atuais
+        saldos = {(u, f): s for u, f, s in conn.execute("SELECT usuario_id, ferramenta_id, saldo FROM saldos_ativos")}
+    else:
+        ferramentas = dict(conn.execute(
+            "SELECT ferramenta_id, estoque_almoxarifado FROM checkpoint_ferramentas WHERE checkpoint_id = ?",
+            (checkpoint,)
+        ))
+        saldos = {(u, f): s for u, f, s in conn.execute(
+            "SELECT usuario_id, ferramenta_id, saldo FROM checkpoint_saldos WHERE checkpoint_id = ?",
+            (checkpoint,)
+        )}
+    estado = (ferramentas, saldos)
+    if base <= alvo:
+        _aplicar(conn, estado, base, alvo, 1)
+    else:
+        _aplicar(conn, estado, alvo, base, -1)
+
+    # Ferramentas cadastradas depois do checkpoint: do estado atual, desfazendo os logs após o alvo
+    novas = {fid: estoque for fid, estoque in ferramentas_atuais.items() if fid not in ferramentas}
+    if novas:
+        for ferramenta_id, delta in conn.execute(
+            f"SELECT ferramenta_id, SUM({DELTA_ALMOXARIFADO}) FROM logs "
+            f"WHERE ferramenta_id IN ({', '.join('?' * len(novas))}) AND id > ? GROUP BY ferramenta_id",
+            (*novas, alvo)
+        ):
+            novas[ferramenta_id] -= delta
+        ferramentas.update(novas)
+    # Ferramentas excluídas do cadastro saem do resultado
+    for fid in set(ferramentas) - set(ferramentas_atuais):
+        del ferramentas[fid]
+    return ferramentas, {par: saldo for par, saldo in saldos.items() if saldo and par[1] in ferramentas}
+
+
+def estoque_em(momento: datetime.datetime) -> List[tuple]:
+    """
+    Estoque de cada ferramenta em `momento` (horário local).
+
+    :return: tuplas (ferramenta_id, codigo_barra, nome, estoque_almoxarifado,
+             estoque_ativo), por nome
+    """
+    with transacao("DEFERRED") as conn:
+        ferramentas, saldos = _estado_em(conn, momento)
+        cadastro = conn.execute("SELECT id, codigo_barra, nome FROM ferramentas ORDER BY nome, id").fetchall()
+    ativo: Dict[int, int] = {}
+    for (_, ferramenta_id), saldo in saldos.items():
+        ativo[ferramenta_id] = ativo.get(ferramenta_id, 0) + saldo
+    return [(fid, codigo, nome, ferramentas[fid], ativo.get(fid, 0)) for fid, codigo, nome in cadastro]
+
+
+def saldos_em(momento: datetime.datetime, usuario_id: Optional[int] = None) -> List[tuple]:
+    """
+    O que cada usuário (ou só `usuario_id`) tinha retirado em `momento` (horário local).
+
+    :return: tuplas (usuario_id, usuario, ferramenta_id, codigo_barra,
+             ferramenta, saldo), por usuário e ferramenta
+    """
+    with transacao("DEFERRED") as conn:
+        _, saldos = _estado_em(conn, momento)
+        usuarios = dict(conn.execute("SELECT id, nome FROM usuarios"))
+        ferramentas = {fid: (codigo, nome) for fid, codigo, nome in conn.execute(
+            "SELECT id, codigo_barra, nome FROM ferramentas"
+        )}
+    linhas = [
+        (uid, usuarios.get(uid, f"#{uid}"), fid, *ferramentas[fid], saldo)
+        for (uid, fid), saldo in saldos.items()
+        if usuario_id is None or uid == usuario_id
+    ]
+    return sorted(linhas, key=lambda linha: (linha[1], linha[4]))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Checkpoints de estoque e consultas por data/hora")
+    parser.add_argument("--criar", action="store_true", help="Cria os checkpoints que faltam")
+    parser.add_argument("--em", metavar="'AAAA-MM-DD HH:MM'", help="Estoque e saldos nesse momento")
+    args = parser.parse_args()
+
+    from database.database import criar_tabelas
+    criar_tabelas()
+
+    if args.criar:
+        print(f"✅ {criar_checkpoints()} checkpoint(s) criado(s).")
+    if args.em:
+        momento = datetime.datetime.fromisoformat(args.em)
+        print(f"📦 Estoque em {momento:%d/%m/%Y %H:%M}")
+        for _, codigo, nome, almoxarifado, ativo in estoque_em(momento):
+            if almoxarifado or ativo:
+                print(f"   {codigo:<16}{nome[:40]:<42}almoxarifado {almoxarifado:>6}  ativo {ativo:>6}")
+        print("👤 Com os usuários")
+        for _, usuario, _, codigo, _, saldo in saldos_em(momento):
+            print(f"   {usuario:<24}{codigo:<16}{saldo:>6}")
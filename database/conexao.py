@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+database/conexao.py
+
+Gerenciador de conexões SQLite persistentes.
+
+Cada thread mantém a sua própria conexão aberta e a reutiliza entre as
+queries, com cache de statements preparados e os PRAGMAs definidos em
+config.SQLITE_PRAGMAS. Quando o agendador troca config.DATABASE_CAMINHO
+(backup de turno), a próxima query da thread reabre a conexão no novo arquivo.
+Com config.INSTRUMENTACAO_ATIVA, as conexões medem cada comando
+(ver database/instrumentacao.py).
+"""
+import re
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+import database.config as config
+from database.instrumentacao import ConexaoInstrumentada
+
+logger = logging.getLogger(__name__)
+
+_PRAGMA_VALIDO = re.compile(r"^[a-z_]+$")
+
+
+class GerenciadorConexoes:
+    """
+    Mantém uma conexão SQLite por thread, aberta sob demanda.
+
+    As conexões trabalham em modo autocommit (isolation_level=None): cada
+    comando isolado é confirmado na hora, como antes, e transações explícitas
+    são abertas com BEGIN/COMMIT por quem precisar delas.
+    """
+
+    def __init__(
+        self,
+        pragmas: Optional[Dict[str, object]] = None,
+        cached_statements: Optional[int] = None,
+        timeout: float = 5.0
+    ):
+        self.pragmas = dict(config.SQLITE_PRAGMAS if pragmas is None else pragmas)
+        self.cached_statements = (
+            config.SQLITE_CACHED_STATEMENTS if cached_statements is None else cached_statements
+        )
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._abertas = set()
+        self._geracao = 0
+
+    def obter(self) -> sqlite3.Connection:
+        """
+        Retorna a conexão da thread atual, abrindo-a (ou reabrindo-a) se preciso.
+
+        A conexão é trocada quando config.DATABASE_CAMINHO mudou ou quando
+        fechar_todas() foi chamado; nunca no meio de uma transação aberta.
+        """
+        caminho = config.DATABASE_CAMINHO
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.geracao == self._geracao:
+            if self._local.caminho == caminho or conn.in_transaction:
+                return conn
+            self._descartar(conn)
+
+        conn = self._abrir(caminho)
+        self._local.conn = conn
+        self._local.caminho = caminho
+        self._local.geracao = self._geracao
+        return conn
+
+    @contextmanager
+    def transacao(self, modo: str = "IMMEDIATE") -> Iterator[sqlite3.Connection]:
+        """
+        Abre uma unidade de trabalho atômica na conexão da thread.
+
+        A transação externa usa BEGIN <modo> (IMMEDIATE por padrão, reservando o
+        lock de escrita logo no início para que validação e gravação enxerguem
+        o mesmo estado). Chamadas aninhadas viram SAVEPOINTs: um erro interno
+        desfaz só a sua parte e a transação externa decide o resto.
+        """
+        conn = self.obter()
+        profundidade = getattr(self._local, "profundidade", 0)
+        savepoint = f"sp_{profundidade}" if conn.in_transaction else None
+        conn.execute(f"SAVEPOINT {savepoint}" if savepoint else f"BEGIN {modo}")
+        self._local.profundidade = profundidade + 1
+        if not savepoint:
+            self._local.ao_finalizar = []
+        try:
+            yield conn
+        except BaseException:
+            if savepoint:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            else:
+                conn.rollback()
+            raise
+        else:
+            if savepoint:
+                conn.execute(f"RELEASE {savepoint}")
+            else:
+                conn.commit()
+        finally:
+            self._local.profundidade = profundidade
+            if not savepoint:
+                self._executar_ao_finalizar()
+
+    def ao_finalizar(self, callback: Callable[[], None]) -> None:
+        """
+        Agenda callback para quando a transação externa da thread terminar
+        (commit ou rollback). Fora de transação, roda imediatamente.
+        """
+        if getattr(self._local, "profundidade", 0):
+            self._local.ao_finalizar.append(callback)
+        else:
+            callback()
+
+    def _executar_ao_finalizar(self) -> None:
+        callbacks, self._local.ao_finalizar = self._local.ao_finalizar, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                logger.exception("Falha em callback de fim de transação")
+
+    def fechar_da_thread(self) -> None:
+        """Fecha a conexão da thread atual (threads de vida curta, ao terminar)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            self._descartar(conn)
+
+    def fechar_todas(self) -> None:
+        """
+        Fecha todas as conexões abertas (encerramento do app ou troca de arquivo).
+
+        As threads que voltarem a consultar o banco abrem uma conexão nova.
+        """
+        with self._lock:
+            self._geracao += 1
+            abertas, self._abertas = self._abertas, set()
+        for conn in abertas:
+            try:
+                # Atualiza as estatísticas do planejador quando o SQLite julgar útil
+                conn.execute("PRAGMA optimize")
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning("Falha ao fechar conexão: %s", e)
+
+    def _abrir(self, caminho: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            caminho,
+            timeout=self.timeout,
+            isolation_level=None,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+            factory=ConexaoInstrumentada if config.INSTRUMENTACAO_ATIVA else sqlite3.Connection
+        )
+        for nome, valor in self.pragmas.items():
+            if not _PRAGMA_VALIDO.match(nome):
+                raise ValueError(f"PRAGMA inválido: {nome!r}")
+            conn.execute(f"PRAGMA {nome} = {valor}")
+        with self._lock:
+            self._abertas.add(conn)
+        logger.debug("Conexão aberta em %s (%s)", caminho, threading.current_thread().name)
+        return conn
+
+    def _descartar(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._abertas.discard(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+_gerenciador = GerenciadorConexoes()
+
+
+def obter_conexao() -> sqlite3.Connection:
+    """Conexão persistente da thread atual para config.DATABASE_CAMINHO."""
+    return _gerenciador.obter()
+
+
+def transacao(modo: str = "IMMEDIATE"):
+    """Context manager de transação atômica na conexão da thread atual."""
+    return _gerenciador.transacao(modo)
+
+
+def ao_finalizar_transacao(callback: Callable[[], None]) -> None:
+    """Roda callback ao fim da transação externa da thread (ou já, se não houver)."""
+    _gerenciador.ao_finalizar(callback)
+
+
+def fechar_conexao_da_thread() -> None:
+    """Fecha a conexão persistente da thread atual, se houver."""
+    _gerenciador.fechar_da_thread()
+
+
+def fechar_conexoes() -> None:
+    """Fecha todas as conexões persistentes abertas pelo processo."""
+    _gerenciador.fechar_todas()
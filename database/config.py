@@ -13,12 +13,74 @@ DATABASE_CAMINHO = os.path.join(BASE_DIR, "database.db")
 # Diretório para backups do banco de dados
 BACKUP_DIR = os.path.join(BASE_DIR, "backups")
 
+# Backup online (API de backup do SQLite): páginas copiadas por passo e pausa
+# entre passos, para que as gravações do quiosque continuem durante a cópia
+BACKUP_PAGINAS_POR_PASSO = 1024
+BACKUP_PAUSA_S = 0.01
+
+# Virada de turno: "marcador" mantém o banco principal em uso, grava só um
+# marcador do turno e faz o backup em segundo plano; "arquivo" copia o banco
+# para um arquivo novo a cada turno e passa a usar a cópia
+VIRADA_DE_TURNO = "marcador"
+
+# Modo do backup de turno: "completo" copia o banco inteiro a cada turno (no modo
+# de virada "arquivo", a cópia passa a ser o banco em uso); "incremental" grava um snapshot completo a cada
+# BACKUP_SNAPSHOT_DIAS dias e, nos demais turnos, só um delta com o que mudou
+BACKUP_MODO = "completo"
+BACKUP_SNAPSHOT_DIAS = 7
+
+# Backups que não estão em uso são guardados compactados (gzip, em fluxo)
+BACKUP_COMPACTAR = True
+BACKUP_COMPRESSAO_NIVEL = 6
+
+# Intervalo, em logs, entre checkpoints de estoque e saldos: consultas de
+# "como estava em" partem do checkpoint mais próximo e só reaplicam os logs até ele
+CHECKPOINT_INTERVALO_LOGS = 10_000
+
 # Diretório para exportações
 EXPORT_DIR = os.path.join(BASE_DIR, "exports")
 
+# Ajustes (PRAGMAs) aplicados a cada conexão SQLite aberta pelo sistema
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",        # leitores não bloqueiam o gravador
+    "synchronous": "NORMAL",      # seguro com WAL e bem mais rápido que FULL
+    "cache_size": -16000,         # valor negativo = KiB (~16 MB por conexão)
+    "mmap_size": 64 * 1024 * 1024,
+    "busy_timeout": 5000,         # ms aguardando o lock antes de falhar
+}
+
+# Quantidade de statements preparados mantidos em cache por conexão
+SQLITE_CACHED_STATEMENTS = 256
+
+# Quantidade máxima de ferramentas mantidas no cache de leitura (LRU)
+CACHE_FERRAMENTAS_TAMANHO = 1024
+
+# Intervalo mínimo (s) entre recargas do diretório de usuários ao ler um RFID desconhecido
+DIRETORIO_USUARIOS_RECARGA_S = 30
+
+# Instrumentação das queries (histogramas por forma de SQL e log de queries lentas)
+INSTRUMENTACAO_ATIVA = True
+LIMITE_QUERY_LENTA_MS = 50     # registra no log de lentas com EXPLAIN QUERY PLAN
+LIMITE_QUERY_CRITICA_MS = 500  # idem, mas em nível de erro
+ESTATISTICAS_CAMINHO = os.path.join(BASE_DIR, "estatisticas_queries.json")
+
 # Caminho para a planilha (mesmo diretório base, conforme sua imagem)
 PLANILHA_IP_CAMINHO = os.path.join(BASE_DIR, "Consulta Produtos IP.xlsx")
 
+# Linhas por lote na leitura em fluxo das planilhas (importação e catálogo IP)
+PLANILHA_LOTE_LINHAS = 2000
+
+# Catálogo da planilha para consultas por Ref. Sistema (utils/consulta_planilha):
+# lido uma vez e relido só quando a planilha muda. Com CATALOGO_IP_PERSISTIR, o
+# catálogo lido fica numa tabela SQLite e os próximos inícios não abrem o Excel
+CATALOGO_IP_PERSISTIR = True
+CATALOGO_IP_CAMINHO = os.path.join(BASE_DIR, "catalogo_ip.db")
+
+# Telas criadas no primeiro uso (interface/navegacao); com PRE_AQUECER_TELAS, as
+# demais são preparadas em segundo plano PRE_AQUECER_ESPERA_MS depois que o login aparece
+PRE_AQUECER_TELAS = True
+PRE_AQUECER_ESPERA_MS = 500
+
 # Garante que os diretórios necessários existam
 os.makedirs(BASE_DIR, exist_ok=True)
 os.makedirs(BACKUP_DIR, exist_ok=True)
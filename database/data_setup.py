@@ -1,13 +1,18 @@
 #!/usr/bin/env python3
 import sys
 import os
+import sqlite3
 import logging
-from typing import Optional
+from typing import Dict, Iterable, Optional, Tuple, Union
 
 import pandas as pd
 from database.config import PLANILHA_IP_CAMINHO
+from database.conexao import obter_conexao, transacao
 from database.database import criar_tabelas
 from database.database_utils import executar_query
+from database.cache_ferramentas import limpar_cache_ferramentas
+from database.diretorio_usuarios import recarregar_usuarios
+from database.leitura_planilha import ler_planilha_em_lotes
 
 # Configura logger
 logger = logging.getLogger(__name__)
@@ -55,6 +60,7 @@ def seed_test_data() -> None:
             "INSERT OR IGNORE INTO usuarios (nome, senha, rfid, tipo) VALUES (?, ?, ?, ?)",
             (nome, senha, rfid, tipo)
         )
+    recarregar_usuarios()
     executar_query(
         "INSERT OR IGNORE INTO maquinas (nome) VALUES (?)",
         ("VMC855",)
@@ -62,58 +68,177 @@ def seed_test_data() -> None:
     logger.info("Dados de teste inseridos com sucesso.")
 
 
-def import_tools_from_excel() -> None:
+# Colunas da planilha "Consulta Produtos IP.xlsx" usadas na importação
+COLUNA_CODIGO = "Ref. Sistema"
+COLUNA_DESCRICAO = "Descrição"
+COLUNAS_CONSUMIVEL = ("Consumível?", "Consumível")
+# Entram, com a descrição, no texto do catálogo indexado pela busca de ferramentas
+COLUNAS_CATALOGO = ("Classificação", "Código")
+
+
+def validar_planilha_ferramentas(df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
     """
-    Lê a planilha configurada em config.PLANILHA_IP_CAMINHO e importa ferramentas.
+    Normaliza e valida a planilha de uma vez (operações de coluna do pandas).
+
+    Código em maiúsculas e sem espaços nas pontas, descrição aparada e
+    consumível como 'SIM'/'NÃO' (vazio conta como 'NÃO'). O texto do
+    catálogo junta a descrição com as COLUNAS_CATALOGO presentes. Linhas
+    sem código ou sem descrição são descartadas; códigos repetidos ficam
+    com a última ocorrência.
+
+    :return: (DataFrame com codigo_barra, nome, consumivel e catalogo; linhas descartadas)
+    """
+    faltando = [c for c in (COLUNA_CODIGO, COLUNA_DESCRICAO) if c not in df.columns]
+    if faltando:
+        raise ValueError(f"Coluna(s) obrigatória(s) ausente(s) na planilha: {', '.join(faltando)}")
+    col_consumivel: Optional[str] = next((c for c in COLUNAS_CONSUMIVEL if c in df.columns), None)
+
+    codigo = df[COLUNA_CODIGO].astype("string").str.strip().str.upper()
+    nome = df[COLUNA_DESCRICAO].astype("string").str.strip()
+    if col_consumivel:
+        sim = df[col_consumivel].astype("string").str.strip().str.upper().str.startswith("S")
+        consumivel = sim.map({True: "SIM", False: "NÃO"}).fillna("NÃO")
+    else:
+        consumivel = pd.Series("NÃO", index=df.index)
+
+    # Códigos numéricos com células vazias na coluna chegam como float (5269.0)
+    extras = [
+        df[c].astype("string").str.strip().str.replace(r"\.0$", "", regex=True)
+        for c in COLUNAS_CATALOGO if c in df.columns
+    ]
+    catalogo = nome.str.cat(extras, sep=" ", na_rep="").str.strip() if extras else nome
+
+    ferramentas = pd.DataFrame({"codigo_barra": codigo, "nome": nome, "consumivel": consumivel,
+                                "catalogo": catalogo})
+    validas = codigo.fillna("").ne("") & nome.fillna("").ne("")
+    ferramentas = ferramentas[validas].drop_duplicates("codigo_barra", keep="last")
+    return ferramentas.astype(str), len(df) - len(ferramentas)
+
+
+def importar_ferramentas(lotes: Union[pd.DataFrame, Iterable[pd.DataFrame]]) -> Dict[str, int]:
+    """
+    Carrega as ferramentas da planilha, lote a lote, com memória limitada.
+
+    Cada lote é validado no pandas e gravado com executemany numa tabela
+    temporária, que não trava o banco: o quiosque continua registrando
+    movimentações enquanto a planilha é lida. Um código repetido fica com a
+    última ocorrência, também entre lotes.
+
+    Depois, numa única transação curta, a tabela temporária é comparada com
+    o cadastro: as ferramentas novas são inseridas (estoque 0) e as que
+    mudaram de descrição ou de consumível são atualizadas. O estoque das que
+    já existem não é tocado. O texto do catálogo de cada código vai para
+    catalogo_ferramentas, que os triggers levam ao índice de busca.
+
+    :param lotes: um DataFrame ou os lotes de ler_planilha_em_lotes()
+    :return: {"inseridas", "atualizadas", "inalteradas", "ignoradas"}
+    """
+    if isinstance(lotes, pd.DataFrame):
+        lotes = [lotes]
+    conn = obter_conexao()
+    conn.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS importacao_ferramentas "
+        "(codigo_barra TEXT PRIMARY KEY, nome TEXT NOT NULL, consumivel TEXT NOT NULL, catalogo TEXT NOT NULL)"
+    )
+    conn.execute("DELETE FROM temp.importacao_ferramentas")
+    validas = ignoradas = 0
+    try:
+        for df in lotes:
+            ferramentas, descartadas = validar_planilha_ferramentas(df)
+            validas += len(ferramentas)
+            ignoradas += descartadas
+            with transacao("DEFERRED"):
+                conn.executemany(
+                    "INSERT OR REPLACE INTO temp.importacao_ferramentas (codigo_barra, nome, consumivel, catalogo) "
+                    "VALUES (?, ?, ?, ?)",
+                    ferramentas[["codigo_barra", "nome", "consumivel", "catalogo"]].itertuples(index=False, name=None)
+                )
+
+        with transacao():
+            unicas, inseridas, atualizadas = conn.execute(
+                """
+                SELECT COUNT(*),
+                       COALESCE(SUM(f.id IS NULL), 0),
+                       COALESCE(SUM(f.nome <> i.nome OR f.consumivel <> i.consumivel), 0)
+                FROM temp.importacao_ferramentas i
+                LEFT JOIN ferramentas f ON f.codigo_barra = i.codigo_barra
+                """
+            ).fetchone()
+            # Antes das ferramentas, para as novas já entrarem no índice com o catálogo
+            conn.execute(
+                """
+                INSERT INTO catalogo_ferramentas (codigo_barra, texto)
+                SELECT codigo_barra, catalogo FROM temp.importacao_ferramentas WHERE true
+                ON CONFLICT (codigo_barra) DO UPDATE SET texto = excluded.texto
+                WHERE texto <> excluded.texto
+                """
+            )
+            # INSERT e UPDATE separados, não um UPSERT: o ON CONFLICT do comando
+            # externo anularia o OR IGNORE dos triggers de alteracoes_backup
+            conn.execute(
+                """
+                INSERT INTO ferramentas (nome, codigo_barra, estoque_almoxarifado, consumivel)
+                SELECT i.nome, i.codigo_barra, 0, i.consumivel
+                FROM temp.importacao_ferramentas i
+                WHERE NOT EXISTS (SELECT 1 FROM ferramentas f WHERE f.codigo_barra = i.codigo_barra)
+                """
+            )
+            conn.execute(
+                """
+                UPDATE ferramentas SET nome = i.nome, consumivel = i.consumivel
+                FROM temp.importacao_ferramentas i
+                WHERE ferramentas.codigo_barra = i.codigo_barra
+                  AND (ferramentas.nome <> i.nome OR ferramentas.consumivel <> i.consumivel)
+                """
+            )
+            if inseridas or atualizadas:
+                limpar_cache_ferramentas()
+    finally:
+        conn.execute("DROP TABLE IF EXISTS temp.importacao_ferramentas")
+    return {
+        "inseridas": inseridas,
+        "atualizadas": atualizadas,
+        "inalteradas": unicas - inseridas - atualizadas,
+        "ignoradas": ignoradas + validas - unicas,
+    }
+
+
+def import_tools_from_excel(caminho: Optional[str] = None) -> Optional[Dict[str, int]]:
+    """
+    Lê a planilha (config.PLANILHA_IP_CAMINHO, por padrão) em lotes, sem
+    carregá-la inteira, e importa as ferramentas com importar_ferramentas().
+
+    :return: resumo da importação, ou None se a planilha não pôde ser lida
     """
     logger.info("Importando ferramentas da planilha…")
-    caminho = resource_path(PLANILHA_IP_CAMINHO)
+    caminho = caminho or resource_path(PLANILHA_IP_CAMINHO)
     if not os.path.exists(caminho):
         logger.error("Planilha não encontrada em: %s", caminho)
-        return
+        return None
 
     try:
-        df = pd.read_excel(caminho)
+        colunas = (COLUNA_CODIGO, COLUNA_DESCRICAO, *COLUNAS_CONSUMIVEL, *COLUNAS_CATALOGO)
+        resumo = importar_ferramentas(ler_planilha_em_lotes(caminho, colunas=colunas))
     except FileNotFoundError:
         logger.error("Arquivo não existe: %s", caminho)
-        return
+        return None
     except ValueError as e:
-        logger.error("Formato inválido na planilha: %s", e)
-        return
+        logger.error("Planilha inválida: %s", e)
+        return None
+    except sqlite3.Error:
+        logger.exception("Falha ao gravar as ferramentas da planilha")
+        return None
     except Exception:
         logger.exception("Falha ao ler a planilha")
-        return
+        return None
 
-    if df.empty:
+    if not any(resumo.values()):
         logger.warning("Planilha sem registros.")
-        return
-
-    col_consumivel: Optional[str] = next(
-        (c for c in ("Consumível?", "Consumível") if c in df.columns),
-        None
+    logger.info(
+        "Importação concluída: %(inseridas)d inseridas, %(atualizadas)d atualizadas, "
+        "%(inalteradas)d inalteradas, %(ignoradas)d ignoradas.", resumo
     )
-
-    inseridos = 0
-    for row in df.itertuples(index=False):
-        ref_sistema = str(getattr(row, 'Ref. Sistema', '')).strip()
-        descricao = str(getattr(row, 'Descrição', '')).strip()
-        raw = getattr(row, col_consumivel) if col_consumivel else "NÃO"
-        consumivel_flag = 1 if str(raw).strip().upper().startswith("S") else 0
-
-        if not (ref_sistema and descricao):
-            continue
-
-        executar_query(
-            """
-            INSERT OR IGNORE INTO ferramentas
-              (nome, codigo_barra, estoque_almoxarifado, consumivel)
-            VALUES (?, ?, ?, ?)
-            """,
-            (descricao, ref_sistema, 0, consumivel_flag)
-        )
-        inseridos += 1
-
-    logger.info("Importação concluída: %d itens processados.", inseridos)
+    return resumo
 
 
 if __name__ == "__main__":
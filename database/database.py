@@ -1,93 +1,82 @@
 import sqlite3
+import datetime
+from typing import Iterator, Optional, Sequence, Tuple, Union
+
+from database.conexao import obter_conexao, transacao
+from database.cache_ferramentas import cache_ferramentas, invalidar_ferramenta
 from database.database_utils import executar_query
+from database.migracoes import aplicar_migracoes
+# Estoque e saldos num momento passado (usados pela tela de exportação)
+from database.checkpoints_estoque import data_hora_utc, estoque_em, saldos_em
+# Busca por texto (usada pelas telas de movimentação e de estoque)
+from database.busca_ferramentas import buscar_ferramentas
 
 
 def criar_tabelas():
     """
-    Cria as tabelas necessárias no banco de dados, caso não existam:
+    Cria ou atualiza o esquema do banco aplicando as migrações pendentes
+    (ver database/migracoes.py):
 
       - usuarios
       - ferramentas
       - logs
       - maquinas
-    """
-    tabelas = [
-        # Usuários
-        """
-        CREATE TABLE IF NOT EXISTS usuarios (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT NOT NULL,
-            senha TEXT NOT NULL,
-            rfid TEXT UNIQUE NOT NULL,
-            tipo TEXT NOT NULL
-        )
-        """,
-        # Ferramentas (sem campo estoque_ativo estático)
-        """
-        CREATE TABLE IF NOT EXISTS ferramentas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT NOT NULL,
-            codigo_barra TEXT UNIQUE NOT NULL,
-            estoque_almoxarifado INTEGER NOT NULL,
-            consumivel TEXT NOT NULL DEFAULT 'NÃO'
-        )
-        """,
-        # Logs de movimentação (ledger)
-        """
-        CREATE TABLE IF NOT EXISTS logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            usuario_id INTEGER NOT NULL,
-            ferramenta_id INTEGER NOT NULL,
-            acao TEXT NOT NULL,
-            quantidade INTEGER NOT NULL,
-            motivo TEXT,
-            operacoes INTEGER,
-            avaliacao INTEGER,
-            data_hora DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY(usuario_id) REFERENCES usuarios(id),
-            FOREIGN KEY(ferramenta_id) REFERENCES ferramentas(id)
-        )
-        """,
-        # Máquinas
-        """
-        CREATE TABLE IF NOT EXISTS maquinas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT NOT NULL
-        )
-        """
-    ]
+      - saldos_ativos (mantida por triggers em logs)
+      - índices do ledger
+      - marcadores de turno e checkpoints de estoque (consultas por data/hora
+        com estoque_em e saldos_em, de database/checkpoints_estoque.py)
+      - índice FTS5 de busca das ferramentas (buscar_ferramentas, de
+        database/busca_ferramentas.py)
 
+    Quando o banco já está na versão atual, só PRAGMA user_version é lido.
+    """
     try:
-        for ddl in tabelas:
-            executar_query(ddl)
+        aplicar_migracoes()
         print("✅ Banco de dados configurado com sucesso!")
     except Exception as e:
         print(f"⚠️ Erro ao criar tabelas: {e}")
 
 
-def buscar_ferramenta_por_codigo(codigo_barra: str):
-    """
-    Busca uma ferramenta pelo código de barras.
-
-    Retorna dict com id, nome, estoque_almoxarifado e consumivel.
-    """
+def _carregar_ferramenta(coluna: str, valor):
     query = (
-        "SELECT id, nome, estoque_almoxarifado, consumivel "
-        "FROM ferramentas WHERE codigo_barra = ?"
+        "SELECT id, nome, codigo_barra, estoque_almoxarifado, consumivel "
+        f"FROM ferramentas WHERE {coluna} = ?"
     )
-    resultado = executar_query(query, (codigo_barra,), fetch=True)
+    resultado = executar_query(query, (valor,), fetch=True)
     if not resultado:
         return None
 
-    fid, nome, est_alm, consumivel = resultado[0]
+    fid, nome, codigo, est_alm, consumivel = resultado[0]
     return {
         "id": fid,
         "nome": nome,
+        "codigo_barra": codigo,
         "estoque_almoxarifado": est_alm,
         "consumivel": consumivel.strip().upper()
     }
 
 
+def buscar_ferramenta_por_codigo(codigo_barra: str):
+    """
+    Busca uma ferramenta pelo código de barras, passando pelo cache de
+    ferramentas (database/cache_ferramentas.py).
+
+    Retorna dict com id, nome, codigo_barra, estoque_almoxarifado e consumivel.
+    """
+    return cache_ferramentas.obter(
+        codigo_barra=codigo_barra,
+        carregar=lambda: _carregar_ferramenta("codigo_barra", codigo_barra)
+    )
+
+
+def buscar_ferramenta_por_id(ferramenta_id: int):
+    """Como buscar_ferramenta_por_codigo, mas pelo id da ferramenta."""
+    return cache_ferramentas.obter(
+        ferramenta_id=ferramenta_id,
+        carregar=lambda: _carregar_ferramenta("id", ferramenta_id)
+    )
+
+
 def registrar_movimentacao(
     usuario_id: int,
     codigo_barra: str,
@@ -101,77 +90,154 @@ def registrar_movimentacao(
     Registra movimentação de ferramentas no ledger e ajusta estoque_almoxarifado.
 
     Ações: RETIRADA, DEVOLUCAO, CONSUMO, ADICAO, SUBTRACAO.
-    """
-    # Busca dados da ferramenta
-    ferramenta = buscar_ferramenta_por_codigo(codigo_barra)
-    if not ferramenta:
-        return {"status": False, "mensagem": "⚠️ Ferramenta não encontrada!"}
-
-    fid = ferramenta["id"]
-    est_alm = ferramenta["estoque_almoxarifado"]
-
-    # Se for devolução, calcula saldo ativo via logs
-    if acao == "DEVOLUCAO":
-        saldo = executar_query(
-            """
-            SELECT COALESCE(
-                SUM(CASE WHEN acao = 'RETIRADA' THEN quantidade
-                         WHEN acao = 'DEVOLUCAO' THEN -quantidade ELSE 0 END)
-            , 0)
-            FROM logs
-            WHERE usuario_id = ? AND ferramenta_id = ?
-            """,
-            (usuario_id, fid),
-            fetch_one=True
-        )
-        saldo_ativo = saldo[0] if saldo else 0
-    else:
-        saldo_ativo = None
-
-    # Validações
-    if acao == "RETIRADA" and quantidade > est_alm:
-        return {"status": False, "mensagem": "❌ Estoque insuficiente para retirada!"}
-    if acao == "DEVOLUCAO" and quantidade > saldo_ativo:
-        return {"status": False, "mensagem": "❌ Estoque ativo insuficiente para devolução!"}
-    if acao == "CONSUMO":
-        if motivo is None or operacoes is None or avaliacao is None:
-            return {"status": False, "mensagem": "⚠️ Dados incompletos para consumo!"}
-        if quantidade > est_alm:
-            return {"status": False, "mensagem": "❌ Estoque insuficiente para consumo!"}
-    if acao in ("ADICAO", "SUBTRACAO") and quantidade <= 0:
-        return {"status": False, "mensagem": "⚠️ Quantidade deve ser maior que zero!"}
 
+    Busca da ferramenta, cálculo do saldo, validações, INSERT em logs e UPDATE
+    em ferramentas rodam numa única transação (BEGIN IMMEDIATE): ou o registro
+    no ledger e o ajuste de estoque são gravados juntos, ou nenhum dos dois.
+    A ferramenta sai do cache de leitura quando a transação termina.
+    """
     try:
-        # Insere no ledger
-        sql_log = (
-            "INSERT INTO logs (usuario_id, ferramenta_id, acao, quantidade, motivo, operacoes, avaliacao) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?)"
-        )
-        executar_query(sql_log, (usuario_id, fid, acao, quantidade, motivo, operacoes, avaliacao))
-
-        # Ajusta estoque_almoxarifado
-        ajuste = "-" if acao in ("RETIRADA", "CONSUMO", "SUBTRACAO") else "+"
-        if acao == "DEVOLUCAO" or acao == "ADICAO":
-            ajuste = "+"
-
-        executar_query(
-            f"UPDATE ferramentas SET estoque_almoxarifado = estoque_almoxarifado {ajuste} ? WHERE codigo_barra = ?",
-            (quantidade, codigo_barra)
-        )
+        with transacao() as conn:
+            # Busca dados da ferramenta
+            ferramenta = conn.execute(
+                "SELECT id, estoque_almoxarifado FROM ferramentas WHERE codigo_barra = ?",
+                (codigo_barra,)
+            ).fetchone()
+            if not ferramenta:
+                return {"status": False, "mensagem": "⚠️ Ferramenta não encontrada!"}
+
+            fid, est_alm = ferramenta
+
+            # Se for devolução, lê o saldo ativo mantido em saldos_ativos
+            if acao == "DEVOLUCAO":
+                saldo = conn.execute(
+                    "SELECT saldo FROM saldos_ativos WHERE usuario_id = ? AND ferramenta_id = ?",
+                    (usuario_id, fid)
+                ).fetchone()
+                saldo_ativo = saldo[0] if saldo else 0
+            else:
+                saldo_ativo = None
+
+            # Validações
+            if acao == "RETIRADA" and quantidade > est_alm:
+                return {"status": False, "mensagem": "❌ Estoque insuficiente para retirada!"}
+            if acao == "DEVOLUCAO" and quantidade > saldo_ativo:
+                return {"status": False, "mensagem": "❌ Estoque ativo insuficiente para devolução!"}
+            if acao == "CONSUMO":
+                if motivo is None or operacoes is None or avaliacao is None:
+                    return {"status": False, "mensagem": "⚠️ Dados incompletos para consumo!"}
+                if quantidade > est_alm:
+                    return {"status": False, "mensagem": "❌ Estoque insuficiente para consumo!"}
+            if acao in ("ADICAO", "SUBTRACAO") and quantidade <= 0:
+                return {"status": False, "mensagem": "⚠️ Quantidade deve ser maior que zero!"}
+
+            # Insere no ledger
+            conn.execute(
+                "INSERT INTO logs (usuario_id, ferramenta_id, acao, quantidade, motivo, operacoes, avaliacao) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (usuario_id, fid, acao, quantidade, motivo, operacoes, avaliacao)
+            )
+
+            # Ajusta estoque_almoxarifado
+            ajuste = "-" if acao in ("RETIRADA", "CONSUMO", "SUBTRACAO") else "+"
+            conn.execute(
+                f"UPDATE ferramentas SET estoque_almoxarifado = estoque_almoxarifado {ajuste} ? WHERE id = ?",
+                (quantidade, fid)
+            )
+            invalidar_ferramenta(ferramenta_id=fid)
 
         return {"status": True, "mensagem": f"✅ {acao.capitalize()} de {quantidade} unidades realizado com sucesso!"}
-    except Exception as e:
+    except sqlite3.Error as e:
         return {"status": False, "mensagem": f"⚠️ Erro ao registrar movimentação: {e}"}
 
 
-def buscar_ultimas_movimentacoes(limit: int = 10) -> list:
+def registrar_movimentacoes_em_lote(
+    usuario_id: int,
+    itens: Sequence[Tuple[str, int]],
+    acao: str
+) -> dict:
     """
-    Recupera as últimas movimentações registradas.
+    Registra várias retiradas ou devoluções de uma vez (carrinho do quiosque).
 
-    Retorna lista de tuplas: (data_hora, usuario_nome, codigo_barra,
-    ferramenta_nome, acao, quantidade, motivo, operacoes, avaliacao).
+    Códigos repetidos são somados. A validação de todos os itens usa uma
+    consulta para as ferramentas (e uma para os saldos, na devolução); se
+    algum item não passar, nada é gravado. Caso contrário, os INSERTs em
+    logs e os UPDATEs em ferramentas vão numa única transação.
+
+    :param itens: pares (codigo_barra, quantidade)
+    :param acao: 'RETIRADA' ou 'DEVOLUCAO'
+    :return: dict com 'status', 'mensagem' e 'erros' (uma mensagem por item recusado)
     """
-    query = """
+    if acao not in ("RETIRADA", "DEVOLUCAO"):
+        return {"status": False, "mensagem": "⚠️ Lote aceita apenas RETIRADA ou DEVOLUCAO!", "erros": []}
+
+    quantidades = {}
+    for codigo, quantidade in itens:
+        quantidades[codigo] = quantidades.get(codigo, 0) + quantidade
+    if not quantidades:
+        return {"status": False, "mensagem": "⚠️ Nenhum item no lote!", "erros": []}
+
+    try:
+        with transacao() as conn:
+            marcadores = ", ".join("?" * len(quantidades))
+            ferramentas = {
+                codigo: (fid, est_alm)
+                for fid, codigo, est_alm in conn.execute(
+                    "SELECT id, codigo_barra, estoque_almoxarifado FROM ferramentas "
+                    f"WHERE codigo_barra IN ({marcadores})",
+                    tuple(quantidades)
+                )
+            }
+            saldos = {}
+            if acao == "DEVOLUCAO" and ferramentas:
+                ids = [fid for fid, _ in ferramentas.values()]
+                saldos = dict(conn.execute(
+                    "SELECT ferramenta_id, saldo FROM saldos_ativos "
+                    f"WHERE usuario_id = ? AND ferramenta_id IN ({', '.join('?' * len(ids))})",
+                    (usuario_id, *ids)
+                ))
+
+            # Validações de todos os itens antes de qualquer escrita
+            erros = []
+            for codigo, quantidade in quantidades.items():
+                if codigo not in ferramentas:
+                    erros.append(f"⚠️ {codigo}: ferramenta não encontrada!")
+                    continue
+                fid, est_alm = ferramentas[codigo]
+                if quantidade <= 0:
+                    erros.append(f"⚠️ {codigo}: quantidade deve ser maior que zero!")
+                elif acao == "RETIRADA" and quantidade > est_alm:
+                    erros.append(f"❌ {codigo}: estoque insuficiente ({est_alm} disponível)!")
+                elif acao == "DEVOLUCAO" and quantidade > saldos.get(fid, 0):
+                    erros.append(f"❌ {codigo}: estoque ativo insuficiente ({saldos.get(fid, 0)} em aberto)!")
+            if erros:
+                return {"status": False, "mensagem": "❌ Lote recusado: nenhum item foi registrado.", "erros": erros}
+
+            movimentos = [(ferramentas[c][0], q) for c, q in quantidades.items()]
+            conn.executemany(
+                "INSERT INTO logs (usuario_id, ferramenta_id, acao, quantidade) VALUES (?, ?, ?, ?)",
+                [(usuario_id, fid, acao, q) for fid, q in movimentos]
+            )
+            ajuste = "-" if acao == "RETIRADA" else "+"
+            conn.executemany(
+                f"UPDATE ferramentas SET estoque_almoxarifado = estoque_almoxarifado {ajuste} ? WHERE id = ?",
+                [(q, fid) for fid, q in movimentos]
+            )
+            for fid, _ in movimentos:
+                invalidar_ferramenta(ferramenta_id=fid)
+
+        total = sum(q for _, q in movimentos)
+        return {
+            "status": True,
+            "mensagem": f"✅ {acao.capitalize()} de {len(movimentos)} itens ({total} unidades) realizada com sucesso!",
+            "erros": []
+        }
+    except sqlite3.Error as e:
+        return {"status": False, "mensagem": f"⚠️ Erro ao registrar lote: {e}", "erros": []}
+
+
+# Colunas devolvidas pelas consultas de histórico (l.id vai por último, só para o cursor)
+_SELECT_MOVIMENTACOES = """
     SELECT
         l.data_hora,
         u.nome     AS usuario_nome,
@@ -181,11 +247,103 @@ def buscar_ultimas_movimentacoes(limit: int = 10) -> list:
         l.quantidade,
         l.motivo,
         l.operacoes,
-        l.avaliacao
+        l.avaliacao,
+        l.id
     FROM logs l
     JOIN usuarios u  ON l.usuario_id    = u.id
     JOIN ferramentas f ON l.ferramenta_id = f.id
-    ORDER BY l.data_hora DESC
-    LIMIT ?
+"""
+
+
+def _limite_utc(valor: Union[str, datetime.date]) -> str:
+    if isinstance(valor, str):
+        return valor
+    if not isinstance(valor, datetime.datetime):
+        valor = datetime.datetime.combine(valor, datetime.time())
+    return data_hora_utc(valor)
+
+
+def buscar_movimentacoes(
+    usuario_id: Optional[int] = None,
+    ferramenta_id: Optional[int] = None,
+    acoes: Optional[Sequence[str]] = None,
+    data_inicio: Union[str, datetime.date, None] = None,
+    data_fim: Union[str, datetime.date, None] = None,
+    apos: Optional[Tuple[str, int]] = None,
+    limite: int = 50,
+    crescente: bool = False
+) -> Tuple[list, Optional[Tuple[str, int]]]:
+    """
+    Uma página do histórico de movimentações, paginada por cursor (keyset).
+
+    Os filtros são opcionais e combináveis, com data_inicio inclusiva e
+    data_fim exclusiva. logs.data_hora é gravado em UTC: datas e datetimes
+    são tomados no horário local e convertidos (uma data vale a partir da
+    meia-noite local); strings já devem estar em UTC, no formato do banco
+    ('AAAA-MM-DD' ou 'AAAA-MM-DD HH:MM:SS'). A ordem é (data_hora, id),
+    decrescente por padrão.
+
+    O cursor é o par (data_hora, id) da última linha da página anterior:
+    com crescente=False a página traz as movimentações mais antigas que ele,
+    com crescente=True as mais novas. Cada página custa uma busca de faixa
+    nos índices do ledger, não importa quão fundo se esteja no histórico.
+
+    :return: (linhas, proximo_cursor); linhas no formato de
+             buscar_ultimas_movimentacoes e proximo_cursor None na última página
+    :raises sqlite3.Error: se a consulta falhar (uma página vazia seria
+             confundida com o fim do histórico)
+    """
+    condicoes, params = [], []
+    if usuario_id is not None:
+        condicoes.append("l.usuario_id = ?")
+        params.append(usuario_id)
+    if ferramenta_id is not None:
+        condicoes.append("l.ferramenta_id = ?")
+        params.append(ferramenta_id)
+    if acoes:
+        condicoes.append(f"l.acao IN ({', '.join('?' * len(acoes))})")
+        params.extend(acoes)
+    if data_inicio is not None:
+        condicoes.append("l.data_hora >= ?")
+        params.append(_limite_utc(data_inicio))
+    if data_fim is not None:
+        condicoes.append("l.data_hora < ?")
+        params.append(_limite_utc(data_fim))
+    if apos is not None:
+        condicoes.append(f"(l.data_hora, l.id) {'>' if crescente else '<'} (?, ?)")
+        params.extend(apos)
+
+    ordem = "ASC" if crescente else "DESC"
+    query = (
+        _SELECT_MOVIMENTACOES
+        + (f"WHERE {' AND '.join(condicoes)}\n" if condicoes else "")
+        + f"ORDER BY l.data_hora {ordem}, l.id {ordem}\nLIMIT ?"
+    )
+    linhas = obter_conexao().execute(query, (*params, limite)).fetchall()
+    cursor = (linhas[-1][0], linhas[-1][-1]) if len(linhas) == limite else None
+    return [linha[:-1] for linha in linhas], cursor
+
+
+def iterar_movimentacoes(lote: int = 500, **filtros) -> Iterator[tuple]:
+    """
+    Percorre o histórico filtrado (mesmos filtros de buscar_movimentacoes)
+    buscando uma página de `lote` linhas por vez, para períodos longos
+    sem carregar tudo na memória. Um erro do banco em qualquer página é
+    propagado (sqlite3.Error), em vez de encerrar o histórico ali.
+    """
+    cursor = filtros.pop("apos", None)
+    while True:
+        linhas, cursor = buscar_movimentacoes(apos=cursor, limite=lote, **filtros)
+        yield from linhas
+        if cursor is None:
+            return
+
+
+def buscar_ultimas_movimentacoes(limit: int = 10) -> list:
+    """
+    Recupera as últimas movimentações registradas.
+
+    Retorna lista de tuplas: (data_hora, usuario_nome, codigo_barra,
+    ferramenta_nome, acao, quantidade, motivo, operacoes, avaliacao).
     """
-    return executar_query(query, (limit,), fetch=True) or []
+    return buscar_movimentacoes(limite=limit)[0]
@@ -1,108 +1,496 @@
 import os
-import shutil
+import gzip
+import time
+import hashlib
+import sqlite3
+import logging
+import argparse
 import datetime
-from database.config import BACKUP_DIR, DATABASE_CAMINHO
+from contextlib import closing
+from typing import List, Optional, Tuple
+
+import database.config as config
+from database.backup_incremental import (
+    aplicar_delta, estado_backup, gerar_delta, iniciar_cadeia
+)
+from database import catalogo_backups as catalogo
+from database.migracoes import aplicar_migracoes
+from database.turnos import turno_em
+
+logger = logging.getLogger(__name__)
 
 # Cria o diretório de backup, se não existir.
-os.makedirs(BACKUP_DIR, exist_ok=True)
+os.makedirs(config.BACKUP_DIR, exist_ok=True)
 
-TURNOS = {
-    "1turno": datetime.time(6, 0),
-    "2turno": datetime.time(13, 0),
-    "3turno": datetime.time(21, 0),
-}
+# Dias que um backup (ou a cadeia snapshot + deltas inteira) é mantido
+RETENCAO_DIAS = 90
 
-def get_turno_atual():
-    agora = datetime.datetime.now().time()
-    for nome, hora in reversed(TURNOS.items()):
-        if agora >= hora:
-            return nome
-    return "1turno"
+# Tamanho dos blocos lidos/gravados ao compactar e descompactar
+_BLOCO = 1024 * 1024
 
-def get_backup_filename(data=None, turno=None):
-    if data is None:
-        data = datetime.date.today()
+def _data_e_turno(data=None, turno=None) -> Tuple[datetime.date, str]:
+    """Sem turno, vale o turno em andamento, com a data em que ele começou."""
     if turno is None:
-        turno = get_turno_atual()
+        atual = turno_em()
+        return data or atual.data, atual.nome
+    return data or datetime.date.today(), turno
+
+def get_backup_filename(data=None, turno=None):
+    data, turno = _data_e_turno(data, turno)
     return f"backup_{data}_{turno}.db"
 
-def realizar_backup(turno=None):
+def copiar_banco_online(origem: str, destino: str,
+                        paginas: Optional[int] = None, pausa: Optional[float] = None) -> dict:
     """
-    Cria um backup com base no turno atual (ou turno forçado).
+    Copia o banco com a API de backup do SQLite, sem parar o quiosque.
+
+    A cópia anda em passos de `paginas` páginas com uma pausa entre eles,
+    para não monopolizar o disco. Em modo WAL a origem fica numa transação
+    de leitura durante toda a cópia: o backup é um retrato consistente, as
+    gravações continuam normalmente e a cópia não recomeça a cada
+    gravação de outra conexão (o que acontece sem esse retrato). O arquivo é
+    gerado como <destino>.tmp, conferido com PRAGMA quick_check e só então
+    renomeado para o destino, de modo que um backup incompleto nunca fica
+    com o nome final.
+
+    :return: dict com paginas, bytes, segundos, mb_s e quick_check
+    :raises sqlite3.Error: se a cópia falhar ou o quick_check não der 'ok'
     """
-    if turno is None:
-        turno = get_turno_atual()
-    data = datetime.date.today()
+    paginas = config.BACKUP_PAGINAS_POR_PASSO if paginas is None else paginas
+    pausa = config.BACKUP_PAUSA_S if pausa is None else pausa
+    temporario = destino + ".tmp"
+    if os.path.exists(temporario):
+        os.remove(temporario)
+
+    def progresso(status, restantes, total):
+        if restantes:
+            time.sleep(pausa)
+
+    inicio = time.perf_counter()
+    with closing(sqlite3.connect(origem, isolation_level=None)) as src, \
+            closing(sqlite3.connect(temporario)) as dst:
+        retrato = src.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        if retrato:
+            src.execute("BEGIN")
+            src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        try:
+            src.backup(dst, pages=paginas, progress=progresso)
+        finally:
+            if retrato:
+                src.execute("COMMIT")
+        total_paginas = dst.execute("PRAGMA page_count").fetchone()[0]
+        tamanho_pagina = dst.execute("PRAGMA page_size").fetchone()[0]
+        verificacao = dst.execute("PRAGMA quick_check").fetchone()[0]
+        # A cópia herda o modo WAL da origem; volta ao modo padrão para ficar num arquivo só
+        dst.execute("PRAGMA journal_mode = DELETE")
+    segundos = time.perf_counter() - inicio
+
+    if verificacao != "ok":
+        os.remove(temporario)
+        raise sqlite3.DatabaseError(f"quick_check do backup falhou: {verificacao}")
+    os.replace(temporario, destino)
+
+    tamanho = total_paginas * tamanho_pagina
+    return {
+        "paginas": total_paginas,
+        "bytes": tamanho,
+        "segundos": segundos,
+        "mb_s": tamanho / 1024 / 1024 / segundos if segundos else 0.0,
+        "quick_check": verificacao,
+    }
+
+def _relatar(descricao, destino, estatisticas):
+    mensagem = (
+        f"{descricao}: {destino} "
+        f"({estatisticas['bytes'] / 1024 / 1024:.1f} MB em {estatisticas['segundos']:.2f}s, "
+        f"{estatisticas['mb_s']:.1f} MB/s, quick_check {estatisticas['quick_check']})"
+    )
+    print(f"✅ {mensagem}")
+    logger.info(mensagem)
+
+def compactar_backup(caminho: str) -> dict:
+    """
+    Troca o backup `caminho` por `caminho`.gz, em fluxo (blocos de 1 MB; o
+    arquivo nunca fica inteiro na memória).
+
+    O .gz é relido e conferido pelo SHA-256 do conteúdo antes de apagar o
+    original, e mantém a data de modificação do backup.
+
+    :return: dict com bytes_original, bytes_compactado, razao, sha256 e segundos
+    """
+    compactado = caminho + ".gz"
+    temporario = compactado + ".tmp"
+    inicio = time.perf_counter()
+    sha = hashlib.sha256()
+    try:
+        with open(caminho, "rb") as origem, \
+                gzip.open(temporario, "wb", compresslevel=config.BACKUP_COMPRESSAO_NIVEL) as destino:
+            for bloco in iter(lambda: origem.read(_BLOCO), b""):
+                sha.update(bloco)
+                destino.write(bloco)
+        if catalogo.calcular_sha256(temporario, compactado=True) != sha.hexdigest():
+            raise OSError(f"conferência do arquivo compactado falhou: {compactado}")
+    except Exception:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    os.replace(temporario, compactado)
+    estado = os.stat(caminho)
+    os.utime(compactado, (estado.st_atime, estado.st_mtime))
+    os.remove(caminho)
+
+    original, final = estado.st_size, os.path.getsize(compactado)
+    return {
+        "bytes_original": original,
+        "bytes_compactado": final,
+        "razao": original / final if final else 0.0,
+        "sha256": sha.hexdigest(),
+        "segundos": time.perf_counter() - inicio,
+    }
+
+def descompactar_backup(compactado: str, destino: str, sha256: Optional[str] = None) -> dict:
+    """
+    Descompacta um backup .gz direto em `destino`, em fluxo. Como em
+    copiar_banco_online, o arquivo é gerado como <destino>.tmp e só é
+    renomeado depois do PRAGMA quick_check (e da conferência do SHA-256 do
+    catálogo, quando informado).
+
+    :return: dict com bytes, segundos, mb_s e quick_check
+    :raises sqlite3.Error: se o quick_check não der 'ok' ou o SHA-256 não conferir
+    """
+    temporario = destino + ".tmp"
+    inicio = time.perf_counter()
+    sha = hashlib.sha256()
+    try:
+        with gzip.open(compactado, "rb") as origem, open(temporario, "wb") as arquivo:
+            for bloco in iter(lambda: origem.read(_BLOCO), b""):
+                sha.update(bloco)
+                arquivo.write(bloco)
+        if sha256 and sha.hexdigest() != sha256:
+            raise sqlite3.DatabaseError(f"SHA-256 do backup não confere com o catálogo: {compactado}")
+        with closing(sqlite3.connect(temporario)) as conn:
+            verificacao = conn.execute("PRAGMA quick_check").fetchone()[0]
+        if verificacao != "ok":
+            raise sqlite3.DatabaseError(f"quick_check do backup falhou: {verificacao}")
+    except Exception:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    os.replace(temporario, destino)
+
+    tamanho, segundos = os.path.getsize(destino), time.perf_counter() - inicio
+    return {
+        "bytes": tamanho,
+        "segundos": segundos,
+        "mb_s": tamanho / 1024 / 1024 / segundos if segundos else 0.0,
+        "quick_check": verificacao,
+    }
+
+def _restaurar_arquivo(backup: dict, destino: str) -> dict:
+    """Restaura em `destino` um backup do catálogo, compactado ou não."""
+    if backup["compactado"]:
+        return descompactar_backup(catalogo.caminho_arquivo(backup), destino, backup["sha256"])
+    return copiar_banco_online(catalogo.caminho_arquivo(backup), destino)
+
+def _compactar(caminho: str) -> None:
+    try:
+        with closing(sqlite3.connect(caminho)) as conn:
+            paginas = conn.execute("PRAGMA page_count").fetchone()[0]
+        estatisticas = compactar_backup(caminho)
+    except (OSError, sqlite3.Error) as e:
+        # No Windows, um backup ainda aberto por alguma thread não pode ser apagado
+        logger.warning("Backup '%s' não compactado: %s", caminho, e)
+        return
+    catalogo.marcar_compactado(
+        os.path.basename(caminho), estatisticas["bytes_compactado"], estatisticas["sha256"], paginas
+    )
+    mensagem = (
+        f"Backup compactado: {caminho}.gz ({estatisticas['bytes_original'] / 1024 / 1024:.1f} → "
+        f"{estatisticas['bytes_compactado'] / 1024 / 1024:.1f} MB, {estatisticas['razao']:.1f}x, "
+        f"{estatisticas['segundos']:.2f}s)"
+    )
+    print(f"🗜️ {mensagem}")
+    logger.info(mensagem)
+
+def compactar_backups_antigos(manter=()) -> None:
+    """
+    Compacta as cópias completas que não estão mais em uso: todas menos o
+    banco atual e as de `manter`.
+    """
+    em_uso = {os.path.abspath(config.DATABASE_CAMINHO), *map(os.path.abspath, manter)}
+    for backup in catalogo.nao_compactados("completo"):
+        caminho = catalogo.caminho_arquivo(backup)
+        if os.path.abspath(caminho) not in em_uso:
+            _compactar(caminho)
+
+def realizar_backup(turno=None, data=None):
+    """
+    Cria um backup do banco em uso com base no turno atual (ou turno forçado,
+    do dia `data`).
+
+    Retorna o caminho do banco do turno ou None em caso de falha. No modo
+    completo é a própria cópia, que passa a ser o banco em uso se a virada
+    de turno for por arquivo; no modo incremental o banco em uso não muda
+    de arquivo.
+    """
+    if config.BACKUP_MODO == "incremental":
+        return config.DATABASE_CAMINHO if realizar_backup_incremental(turno, data) else None
+
+    data, turno = _data_e_turno(data, turno)
     backup_filename = get_backup_filename(data, turno)
-    backup_path = os.path.join(BACKUP_DIR, backup_filename)
+    backup_path = os.path.join(config.BACKUP_DIR, backup_filename)
+    origem = config.DATABASE_CAMINHO
 
-    if not os.path.exists(DATABASE_CAMINHO):
+    if not os.path.exists(origem):
         print("❌ Erro: O banco de dados original não foi encontrado. Nenhum backup realizado.")
-        return
+        return None
 
     try:
-        shutil.copy(DATABASE_CAMINHO, backup_path)
-        print(f"✅ Backup ({turno}) realizado com sucesso: {backup_path}")
+        estatisticas = copiar_banco_online(origem, backup_path)
+        # O conteúdo muda enquanto a cópia for o banco em uso; o SHA-256 entra ao compactar
+        catalogo.registrar(backup_path, data, turno, paginas=estatisticas["paginas"])
+        _relatar(f"Backup ({turno}) realizado com sucesso", backup_path, estatisticas)
     except Exception as e:
         print(f"❌ Erro ao criar backup: {e}")
-        return
+        return None
+
+    if config.BACKUP_COMPACTAR:
+        # Na virada por arquivo, a cópia vai ser o banco em uso e a origem só
+        # sai de uso quando o agendador trocar de banco: fica para o próximo turno
+        compactar_backups_antigos(manter=(backup_path,) if config.VIRADA_DE_TURNO == "arquivo" else ())
+    limpar_backups_antigos()
+    return backup_path
+
+def _precisa_snapshot(estado: dict, data: datetime.date) -> bool:
+    base = catalogo.buscar(estado["base"]) if estado["base"] else None
+    return (
+        base is None
+        or not os.path.exists(catalogo.caminho_arquivo(base))
+        or (data - estado["base_data"]).days >= config.BACKUP_SNAPSHOT_DIAS
+    )
+
+def realizar_backup_incremental(turno=None, data=None) -> Optional[str]:
+    """
+    Backup de turno no modo incremental: um snapshot completo quando não há
+    cadeia ou ela já tem BACKUP_SNAPSHOT_DIAS dias; nos outros turnos, um
+    delta com o que mudou desde o último backup.
+
+    Retorna o caminho do arquivo gravado ou None em caso de falha.
+    """
+    data, turno = _data_e_turno(data, turno)
+    origem = config.DATABASE_CAMINHO
+
+    if not os.path.exists(origem):
+        print("❌ Erro: O banco de dados original não foi encontrado. Nenhum backup realizado.")
+        return None
+
+    try:
+        # Na inicialização o backup roda antes de criar_tabelas()
+        aplicar_migracoes()
+        estado = estado_backup(origem)
+        if _precisa_snapshot(estado, data):
+            caminho = os.path.join(config.BACKUP_DIR, f"snapshot_{data}_{turno}.db")
+            iniciar_cadeia(origem, os.path.basename(caminho), data)
+            try:
+                estatisticas = copiar_banco_online(origem, caminho)
+            except Exception:
+                iniciar_cadeia(origem, None)
+                raise
+            if config.BACKUP_COMPACTAR:
+                catalogo.registrar(caminho, data, turno, paginas=estatisticas["paginas"])
+                _relatar(f"Snapshot ({turno}) realizado com sucesso", caminho, estatisticas)
+                _compactar(caminho)
+            else:
+                catalogo.registrar(caminho, data, turno, paginas=estatisticas["paginas"],
+                                   sha256=catalogo.calcular_sha256(caminho))
+                _relatar(f"Snapshot ({turno}) realizado com sucesso", caminho, estatisticas)
+        else:
+            caminho = os.path.join(
+                config.BACKUP_DIR, f"delta_{data}_{turno}_{estado['sequencia'] + 1:03d}.db"
+            )
+            inicio = time.perf_counter()
+            delta = gerar_delta(origem, caminho)
+            catalogo.registrar(caminho, data, turno, sha256=catalogo.calcular_sha256(caminho),
+                               base=delta["base"], sequencia=delta["sequencia"])
+            mensagem = (
+                f"Delta ({turno}) nº {delta['sequencia']} sobre {delta['base']}: {caminho} "
+                f"({delta['bytes'] / 1024:.1f} KB em {time.perf_counter() - inicio:.3f}s, "
+                f"{delta['linhas']['logs']} movimentações, {delta['removidos']} remoções)"
+            )
+            print(f"✅ {mensagem}")
+            logger.info(mensagem)
+    except Exception as e:
+        print(f"❌ Erro ao criar backup incremental: {e}")
+        return None
 
     limpar_backups_antigos()
+    return caminho
+
+def _buscar_alvo(ate: str, tipos: Tuple[str, ...]) -> Optional[dict]:
+    """`ate` é o nome do arquivo (com ou sem .db/.gz) ou o rótulo AAAA-MM-DD_turno."""
+    nome = ate[:-3] if ate.endswith(".gz") else ate
+    backup = catalogo.buscar(nome if nome.endswith(".db") else nome + ".db")
+    if backup and backup["tipo"] in tipos:
+        return backup
+    data, _, turno = ate.partition("_")
+    try:
+        do_turno = catalogo.do_turno(datetime.date.fromisoformat(data), turno, tipos)
+    except ValueError:
+        return None
+    return do_turno[-1] if do_turno else None
+
+def _localizar(ate: Optional[str]) -> Tuple[dict, List[dict]]:
+    """
+    Snapshot e deltas a aplicar para chegar em `ate` (sem ele, o backup
+    incremental mais recente).
+    """
+    if ate is None:
+        alvo = catalogo.ultimo(("snapshot", "delta"))
+    else:
+        alvo = _buscar_alvo(ate, ("snapshot", "delta"))
+    if alvo is None:
+        raise ValueError(f"Nenhum backup incremental encontrado para '{ate or 'o último turno'}'.")
+
+    nome_base = alvo["base"] or alvo["nome"]
+    base = catalogo.buscar(nome_base)
+    if base is None or not os.path.exists(catalogo.caminho_arquivo(base)):
+        raise ValueError(f"O snapshot base '{nome_base}' não existe mais.")
+    deltas = [d for d in catalogo.cadeia(nome_base) if alvo["tipo"] == "delta" and d["sequencia"] <= alvo["sequencia"]]
+    sequencias = [d["sequencia"] for d in deltas if os.path.exists(catalogo.caminho_arquivo(d))]
+    if sequencias != list(range(1, len(deltas) + 1)) or len(deltas) != (alvo["sequencia"] or 0):
+        raise ValueError(f"Cadeia de '{nome_base}' incompleta: deltas {sequencias}.")
+    return base, deltas
+
+def _localizar_completo(ate: Optional[str]) -> Optional[dict]:
+    """Cópia completa mais recente que corresponde a `ate`."""
+    if ate is None:
+        return catalogo.ultimo(("completo",))
+    return _buscar_alvo(ate, ("completo",))
+
+def restaurar_backup(destino: str, ate: Optional[str] = None) -> Optional[str]:
+    """
+    Reconstrói em `destino` o banco de um turno.
+
+    `ate` é o nome de um arquivo de backup ou o rótulo AAAA-MM-DD_Nturno;
+    sem ele, vale o backup mais recente do modo configurado. Uma cópia
+    completa é descompactada (ou copiada) direto em `destino`. No modo
+    incremental, o snapshot base é restaurado e os deltas da cadeia são
+    aplicados em ordem; o banco resultante começa sem cadeia (o próximo
+    backup dele é um snapshot). Os arquivos são conferidos pelo SHA-256
+    registrado no catálogo.
+
+    Retorna `destino` ou None em caso de falha.
+    """
+    if os.path.exists(destino):
+        print(f"❌ Erro: '{destino}' já existe. Restaure para um arquivo novo.")
+        return None
+    try:
+        inicio = time.perf_counter()
+        completo = _localizar_completo(ate) if ate or config.BACKUP_MODO == "completo" else None
+        if completo:
+            _restaurar_arquivo(completo, destino)
+            origem = completo["nome"]
+        else:
+            base, deltas = _localizar(ate)
+            _restaurar_arquivo(base, destino)
+            for delta in deltas:
+                caminho = catalogo.caminho_arquivo(delta)
+                if delta["sha256"] and catalogo.calcular_sha256(caminho) != delta["sha256"]:
+                    raise sqlite3.DatabaseError(f"SHA-256 do delta não confere com o catálogo: {caminho}")
+                aplicar_delta(destino, caminho)
+            iniciar_cadeia(destino, None)
+            origem = f"{base['nome']} + {len(deltas)} delta(s)"
+    except Exception as e:
+        if os.path.exists(destino):
+            os.remove(destino)
+        print(f"❌ Erro ao restaurar backup: {e}")
+        return None
+
+    mensagem = f"Banco restaurado em {destino}: {origem} em {time.perf_counter() - inicio:.2f}s"
+    print(f"✅ {mensagem}")
+    logger.info(mensagem)
+    return destino
 
 def limpar_backups_antigos():
     """
     Remove backups com mais de 90 dias.
+
+    Snapshot e deltas saem juntos, quando o backup mais novo da cadeia
+    passa do prazo: um delta não serve sem o snapshot e os deltas anteriores.
     """
-    hoje = datetime.date.today()
-    for filename in os.listdir(BACKUP_DIR):
-        if not filename.endswith(".db"):
-            continue
+    limite = datetime.date.today() - datetime.timedelta(days=RETENCAO_DIAS)
+    removidos = []
+    for backup in catalogo.vencidos(limite):
+        caminho = catalogo.caminho_arquivo(backup)
         try:
-            partes = filename.replace("backup_", "").replace(".db", "").split("_")
-            data_str = partes[0]
-            data = datetime.datetime.strptime(data_str, "%Y-%m-%d").date()
-            if (hoje - data).days > 90:
-                os.remove(os.path.join(BACKUP_DIR, filename))
-                print(f"🗑️ Backup antigo removido: {filename}")
+            if os.path.exists(caminho):
+                os.remove(caminho)
+                print(f"🗑️ Backup antigo removido: {os.path.basename(caminho)}")
+            removidos.append(backup["nome"])
         except Exception as e:
-            print(f"❌ Erro ao verificar backup '{filename}': {e}")
+            print(f"❌ Erro ao remover backup '{backup['nome']}': {e}")
+    if removidos:
+        catalogo.remover(removidos)
 
 def verificar_backup():
     """
     Verifica se há backup para o turno atual do dia.
     Se não houver, copia o mais recente disponível e usa como base.
+
+    No modo incremental o banco em uso não muda; se o turno ainda não tem
+    snapshot nem delta, o backup é feito agora.
     """
-    data_hoje = datetime.date.today()
-    turno_atual = get_turno_atual()
+    data_hoje, turno_atual = _data_e_turno()
+
+    if config.BACKUP_MODO == "incremental":
+        feitos = catalogo.do_turno(data_hoje, turno_atual, ("snapshot", "delta"))
+        if feitos:
+            print(f"✅ Backup do turno atual já existe: {feitos[-1]['nome']}")
+        elif os.path.exists(config.DATABASE_CAMINHO):
+            realizar_backup_incremental(turno_atual, data_hoje)
+        return config.DATABASE_CAMINHO
+
     backup_filename = get_backup_filename(data_hoje, turno_atual)
-    backup_path = os.path.join(BACKUP_DIR, backup_filename)
+    backup_path = os.path.join(config.BACKUP_DIR, backup_filename)
 
     if os.path.exists(backup_path):
         print(f"✅ Backup do turno atual já existe: {backup_path}")
         return backup_path
 
-    # Buscar o backup mais recente disponível (anterior)
-    backups_existentes = sorted(
-        [f for f in os.listdir(BACKUP_DIR) if f.endswith(".db")],
-        key=lambda f: os.path.getmtime(os.path.join(BACKUP_DIR, f)),
-        reverse=True
-    )
+    # O próprio backup do turno pode ter sido compactado; senão, vale o mais recente
+    ultimo_backup = catalogo.buscar(backup_filename)
+    if not (ultimo_backup and ultimo_backup["compactado"]):
+        ultimo_backup = catalogo.ultimo(("completo",), excluir=(backup_filename,))
 
-    if not backups_existentes:
+    if ultimo_backup is None:
         print("⚠️ Nenhum backup anterior encontrado. Criando novo...")
         realizar_backup(turno_atual)
         return backup_path
 
-    ultimo_backup = backups_existentes[0]
-    ultimo_backup_path = os.path.join(BACKUP_DIR, ultimo_backup)
-
     try:
-        shutil.copy(ultimo_backup_path, backup_path)
-        print(f"🆕 Backup do turno atual criado a partir de '{ultimo_backup}': {backup_path}")
+        estatisticas = _restaurar_arquivo(ultimo_backup, backup_path)
+        catalogo.registrar(backup_path, data_hoje, turno_atual, paginas=estatisticas.get("paginas"))
+        _relatar(f"Backup do turno atual criado a partir de '{ultimo_backup['nome']}'", backup_path, estatisticas)
     except Exception as e:
-        print(f"❌ Erro ao copiar backup '{ultimo_backup}' para hoje: {e}")
+        print(f"❌ Erro ao copiar backup '{ultimo_backup['nome']}' para hoje: {e}")
 
     return backup_path
 
 if __name__ == "__main__":
-    verificar_backup()
+    parser = argparse.ArgumentParser(description="Backups do banco por turno")
+    parser.add_argument("--agora", action="store_true", help="Faz o backup do banco em uso imediatamente")
+    parser.add_argument("--restaurar", metavar="DESTINO",
+                        help="Restaura um backup (compactado, completo ou snapshot + deltas) em DESTINO")
+    parser.add_argument("--ate", metavar="BACKUP",
+                        help="Arquivo de backup ou turno AAAA-MM-DD_Nturno a restaurar (padrão: o último)")
+    parser.add_argument("--compactar", action="store_true",
+                        help="Compacta as cópias completas que não estão em uso")
+    args = parser.parse_args()
+    if args.restaurar:
+        restaurar_backup(args.restaurar, args.ate)
+    elif args.agora:
+        realizar_backup()
+    elif args.compactar:
+        compactar_backups_antigos()
+    else:
+        verificar_backup()
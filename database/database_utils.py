@@ -1,6 +1,7 @@
 import sqlite3
 from typing import List, Tuple
-from database.config import DATABASE_CAMINHO
+from database.conexao import obter_conexao
+from database.diretorio_usuarios import buscar_usuario_por_rfid
 
 
 def executar_query(query: str,
@@ -10,6 +11,10 @@ def executar_query(query: str,
     """
     Executa uma query no banco SQLite.
 
+    Usa a conexão persistente da thread (database.conexao), sempre apontada
+    para o config.DATABASE_CAMINHO vigente. Comandos fora de transação são
+    confirmados imediatamente (autocommit).
+
     Args:
         query (str): SQL a executar.
         params (tuple): Parâmetros para a query.
@@ -20,15 +25,12 @@ def executar_query(query: str,
         Resultado da query ou None.
     """
     try:
-        with sqlite3.connect(DATABASE_CAMINHO) as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            if fetch_one:
-                return cursor.fetchone()
-            if fetch:
-                return cursor.fetchall()
-            conn.commit()
-            return None
+        cursor = obter_conexao().execute(query, params)
+        if fetch_one:
+            return cursor.fetchone()
+        if fetch:
+            return cursor.fetchall()
+        return None
     except sqlite3.Error as e:
         print(f"❌ Erro ao executar query: {e}\n→ Query: {query}\n→ Params: {params}")
         return None
@@ -38,34 +40,28 @@ def buscar_estoque_ativo_usuario(rfid_usuario: str) -> List[Tuple[int, str, str,
     """
     Retorna o estoque ativo das ferramentas para o usuário via RFID.
 
-    Saldo = SUM(CASE WHEN acao='RETIRADA' THEN quantidade
-                     WHEN acao='DEVOLUCAO' THEN -quantidade ELSE 0 END)
+    Lê saldos_ativos, mantida pelos triggers de logs, em vez de somar o
+    ledger inteiro do usuário: o custo é proporcional às ferramentas em aberto.
+
     Args:
         rfid_usuario (str): Código RFID.
 
     Returns:
         Lista de (ferramenta_id, nome, codigo_barra, saldo) com saldo>0.
     """
-    # Converte RFID em usuário_id
-    usuario = executar_query(
-        "SELECT id FROM usuarios WHERE rfid = ?",
-        (rfid_usuario,),
-        fetch_one=True
-    )
+    # Converte RFID em usuário_id pelo diretório em memória
+    usuario = buscar_usuario_por_rfid(rfid_usuario)
     if not usuario:
         return []
-    usuario_id = usuario[0]
+    usuario_id = usuario["id"]
 
-    # Calcula saldo ativo por ferramenta
+    # Saldos em aberto do usuário (faixa da chave primária de saldos_ativos)
     sql = (
-        "SELECT l.ferramenta_id, f.nome, f.codigo_barra, "
-        "SUM(CASE WHEN l.acao = 'RETIRADA' THEN l.quantidade "
-        "WHEN l.acao = 'DEVOLUCAO' THEN -l.quantidade ELSE 0 END) AS saldo "
-        "FROM logs l "
-        "JOIN ferramentas f ON l.ferramenta_id = f.id "
-        "WHERE l.usuario_id = ? "
-        "GROUP BY l.ferramenta_id "
-        "HAVING saldo > 0"
+        "SELECT s.ferramenta_id, f.nome, f.codigo_barra, s.saldo "
+        "FROM saldos_ativos s "
+        "JOIN ferramentas f ON s.ferramenta_id = f.id "
+        "WHERE s.usuario_id = ? AND s.saldo > 0 "
+        "ORDER BY s.ferramenta_id"
     )
     resultados = executar_query(sql, (usuario_id,), fetch=True)
     return resultados or []
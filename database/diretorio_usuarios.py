@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+database/diretorio_usuarios.py
+
+Diretório de usuários em memória: índice rfid → (id, nome, tipo).
+
+A tabela usuarios é lida inteira uma vez e os crachás passam a ser
+resolvidos sem consultar o banco (login RFID, movimentações, estoque ativo
+e leitor de linha de comando). Quem altera usuários chama
+recarregar_usuarios(); o índice também é recarregado quando o agendador
+troca de arquivo de banco.
+
+Um RFID desconhecido provoca no máximo uma recarga a cada
+config.DIRETORIO_USUARIOS_RECARGA_S segundos, para enxergar usuários
+cadastrados por outro quiosque sem voltar a consultar o banco a cada leitura.
+"""
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, Optional
+
+import database.config as config
+from database.conexao import ao_finalizar_transacao, obter_conexao
+
+logger = logging.getLogger(__name__)
+
+
+class DiretorioUsuarios:
+    """Índice thread-safe dos usuários por RFID."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._por_rfid: Dict[str, dict] = {}
+        self._caminho = None
+        self._carregado_em = 0.0
+
+    def buscar(self, rfid: str) -> Optional[dict]:
+        """Retorna {'id', 'nome', 'tipo', 'rfid'} do crachá, ou None se não cadastrado."""
+        rfid = (rfid or "").strip()
+        with self._lock:
+            if self._caminho != config.DATABASE_CAMINHO:
+                self._carregar()
+            usuario = self._por_rfid.get(rfid)
+            if usuario is None and time.monotonic() - self._carregado_em >= config.DIRETORIO_USUARIOS_RECARGA_S:
+                self._carregar()
+                usuario = self._por_rfid.get(rfid)
+        return dict(usuario) if usuario else None
+
+    def invalidar(self) -> None:
+        """Força a recarga na próxima consulta."""
+        with self._lock:
+            self._caminho = None
+
+    def __len__(self) -> int:
+        return len(self._por_rfid)
+
+    def _carregar(self) -> None:
+        conn = obter_conexao()
+        self._carregado_em = time.monotonic()
+        try:
+            linhas = conn.execute("SELECT id, nome, tipo, rfid FROM usuarios").fetchall()
+        except sqlite3.Error as e:
+            logger.error("Falha ao carregar o diretório de usuários: %s", e)
+            return
+        self._por_rfid = {
+            rfid.strip(): {"id": uid, "nome": nome, "tipo": tipo, "rfid": rfid.strip()}
+            for uid, nome, tipo, rfid in linhas
+        }
+        # Lido no meio de uma transação, o índice pode conter linhas não confirmadas
+        self._caminho = None if conn.in_transaction else config.DATABASE_CAMINHO
+        logger.debug("Diretório de usuários carregado: %d usuários.", len(self._por_rfid))
+
+
+diretorio_usuarios = DiretorioUsuarios()
+
+
+def buscar_usuario_por_rfid(rfid: str) -> Optional[dict]:
+    """Resolve o crachá pelo diretório em memória (sem ida ao banco)."""
+    return diretorio_usuarios.buscar(rfid)
+
+
+def recarregar_usuarios() -> None:
+    """Recarrega o diretório ao fim da transação atual (ou na próxima consulta)."""
+    ao_finalizar_transacao(diretorio_usuarios.invalidar)
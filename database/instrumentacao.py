@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+database/instrumentacao.py
+
+Instrumentação das queries SQLite do sistema.
+
+As conexões abertas por database.conexao usam ConexaoInstrumentada, cujos
+cursores medem cada comando (execute + fetch) e acumulam, por forma de SQL
+(o texto normalizado, sem literais):
+
+  - quantidade de execuções, tempo total e máximo
+  - histograma de latência
+  - linhas retornadas/afetadas
+
+Comandos acima de config.LIMITE_QUERY_LENTA_MS vão para o log de queries
+lentas junto com o EXPLAIN QUERY PLAN (capturado uma vez por forma). A tela
+ativa (definir_contexto) também é contabilizada, para saber qual tela mais
+pesa no banco.
+
+As estatísticas são gravadas em config.ESTATISTICAS_CAMINHO ao sair e podem
+ser consultadas pela tela de administração ou pela linha de comando:
+
+    python -m database.instrumentacao [--limpar]
+"""
+import re
+import json
+import time
+import atexit
+import bisect
+import sqlite3
+import logging
+import argparse
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import database.config as config
+
+logger = logging.getLogger(__name__)
+
+# Limites superiores (ms) das faixas do histograma; a última faixa é "acima de 1000"
+FAIXAS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_LISTA = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_RE_ESPACOS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def forma_sql(sql: str) -> str:
+    """Normaliza o SQL: sem literais, listas IN colapsadas e espaços únicos."""
+    forma = _RE_STRING.sub("?", sql)
+    forma = _RE_NUMERO.sub("?", forma)
+    forma = _RE_LISTA.sub("(...)", forma)
+    return _RE_ESPACOS.sub(" ", forma).strip()
+
+
+class EstatisticasQueries:
+    """Acumulador thread-safe das métricas por forma de SQL e por tela."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.formas: Dict[str, dict] = {}
+        self.contextos: Dict[str, dict] = {}
+        self.lentas: List[dict] = []
+        self._planos: Dict[str, str] = {}
+        self.contexto = "-"
+        self.inicio = time.time()
+
+    def registrar(self, sql: str, ms: float, linhas: int) -> None:
+        forma = forma_sql(sql)
+        faixa = bisect.bisect_left(FAIXAS_MS, ms)
+        with self._lock:
+            dados = self.formas.get(forma)
+            if dados is None:
+                dados = self.formas[forma] = {
+                    "execucoes": 0, "total_ms": 0.0, "max_ms": 0.0, "linhas": 0,
+                    "histograma": [0] * (len(FAIXAS_MS) + 1)
+                }
+            dados["execucoes"] += 1
+            dados["total_ms"] += ms
+            dados["max_ms"] = max(dados["max_ms"], ms)
+            dados["linhas"] += linhas
+            dados["histograma"][faixa] += 1
+
+            tela = self.contextos.setdefault(self.contexto, {"execucoes": 0, "total_ms": 0.0})
+            tela["execucoes"] += 1
+            tela["total_ms"] += ms
+
+    def registrar_lenta(self, sql: str, params, ms: float, plano: str) -> None:
+        with self._lock:
+            self.lentas.append({
+                "quando": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "tela": self.contexto,
+                "ms": round(ms, 2),
+                "sql": forma_sql(sql),
+                "params": repr(params)[:200],
+                "plano": plano,
+            })
+            del self.lentas[:-100]
+
+    def plano_em_cache(self, sql: str) -> Optional[str]:
+        return self._planos.get(forma_sql(sql))
+
+    def guardar_plano(self, sql: str, plano: str) -> None:
+        self._planos[forma_sql(sql)] = plano
+
+    def instantaneo(self) -> dict:
+        """Cópia serializável das estatísticas atuais."""
+        with self._lock:
+            return json.loads(json.dumps({
+                "inicio": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.inicio)),
+                "faixas_ms": FAIXAS_MS,
+                "formas": self.formas,
+                "telas": self.contextos,
+                "lentas": self.lentas,
+            }))
+
+    def limpar(self) -> None:
+        with self._lock:
+            self.formas.clear()
+            self.contextos.clear()
+            self.lentas.clear()
+            self.inicio = time.time()
+
+
+estatisticas = EstatisticasQueries()
+
+
+def definir_contexto(nome: str) -> None:
+    """Informa a tela (ou rotina) que está usando o banco a partir de agora."""
+    estatisticas.contexto = nome or "-"
+
+
+def _explicar(conn: sqlite3.Connection, sql: str, params) -> str:
+    """EXPLAIN QUERY PLAN do comando, com cursor comum para não se auto-instrumentar."""
+    if not sql.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")):
+        return ""
+    try:
+        linhas = sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        return " | ".join(str(linha[-1]) for linha in linhas)
+    except sqlite3.Error as e:
+        return f"(plano indisponível: {e})"
+
+
+class CursorInstrumentado(sqlite3.Cursor):
+    """
+    Cursor que mede cada comando do execute até o fim da leitura.
+
+    A medição é fechada quando o resultado se esgota, no próximo execute ou
+    quando o cursor é descartado; o tempo gasto no código Python entre os
+    fetch (ou entre as linhas de um `for linha in cursor`) não é contado.
+    """
+    _sql = None
+
+    def execute(self, sql, params=()):
+        self._encerrar()
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, params)
+        finally:
+            self._abrir(sql, params, time.perf_counter() - inicio)
+
+    def executemany(self, sql, seq_params):
+        self._encerrar()
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_params)
+        finally:
+            self._abrir(sql, (), time.perf_counter() - inicio)
+
+    def fetchone(self):
+        inicio = time.perf_counter()
+        linha = super().fetchone()
+        self._acumular(time.perf_counter() - inicio, 0 if linha is None else 1, linha is None)
+        return linha
+
+    def fetchmany(self, size=None):
+        tamanho = self.arraysize if size is None else size
+        inicio = time.perf_counter()
+        linhas = super().fetchmany(tamanho)
+        self._acumular(time.perf_counter() - inicio, len(linhas), len(linhas) < tamanho)
+        return linhas
+
+    def fetchall(self):
+        inicio = time.perf_counter()
+        linhas = super().fetchall()
+        self._acumular(time.perf_counter() - inicio, len(linhas), True)
+        return linhas
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        inicio = time.perf_counter()
+        try:
+            linha = super().__next__()
+        except StopIteration:
+            self._acumular(time.perf_counter() - inicio, 0, True)
+            raise
+        self._acumular(time.perf_counter() - inicio, 1, False)
+        return linha
+
+    def close(self):
+        self._encerrar()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._encerrar()
+        except Exception:
+            pass
+
+    def _abrir(self, sql, params, segundos):
+        self._sql, self._params, self._segundos = sql, params, segundos
+        self._linhas = 0
+        if self.description is None:
+            # Comando sem resultado (DML/DDL): fecha a medição na hora
+            self._linhas = max(self.rowcount, 0)
+            self._encerrar()
+
+    def _acumular(self, segundos, linhas, esgotou):
+        if self._sql is None:
+            return
+        self._segundos += segundos
+        self._linhas += linhas
+        if esgotou:
+            self._encerrar()
+
+    def _encerrar(self):
+        sql = self._sql
+        if sql is None:
+            return
+        self._sql = None
+        ms = self._segundos * 1000
+        estatisticas.registrar(sql, ms, self._linhas)
+        if ms >= config.LIMITE_QUERY_LENTA_MS:
+            plano = estatisticas.plano_em_cache(sql)
+            if plano is None:
+                plano = _explicar(self.connection, sql, self._params)
+                estatisticas.guardar_plano(sql, plano)
+            estatisticas.registrar_lenta(sql, self._params, ms, plano)
+            nivel = logging.ERROR if ms >= config.LIMITE_QUERY_CRITICA_MS else logging.WARNING
+            logger.log(nivel, "Query lenta (%.1f ms, tela %s): %s | plano: %s",
+                       ms, estatisticas.contexto, forma_sql(sql), plano)
+
+
+class ConexaoInstrumentada(sqlite3.Connection):
+    """Conexão cujos cursores (inclusive os de conn.execute) são instrumentados."""
+
+    def cursor(self, factory=CursorInstrumentado):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_params):
+        return self.cursor().executemany(sql, seq_params)
+
+
+def relatorio(dados: Optional[dict] = None, limite: int = 20) -> str:
+    """
+    Texto com as formas de SQL mais custosas, o peso de cada tela e as
+    últimas queries lentas.
+    """
+    dados = estatisticas.instantaneo() if dados is None else dados
+    faixas = [f"≤{f:g}" for f in dados["faixas_ms"]] + [f">{dados['faixas_ms'][-1]:g}"]
+    linhas = [f"📊 Estatísticas de queries desde {dados['inicio']}", ""]
+
+    linhas.append("Por tela:")
+    for tela, t in sorted(dados["telas"].items(), key=lambda i: -i[1]["total_ms"]):
+        linhas.append(f"  {tela:<16} {t['execucoes']:>8} queries {t['total_ms']:>10.1f} ms")
+
+    linhas += ["", f"Formas de SQL mais custosas (histograma em ms: {' '.join(faixas)}):"]
+    ordenadas = sorted(dados["formas"].items(), key=lambda i: -i[1]["total_ms"])
+    for forma, f in ordenadas[:limite]:
+        media = f["total_ms"] / f["execucoes"] if f["execucoes"] else 0
+        linhas.append(
+            f"  {f['execucoes']:>7}x total {f['total_ms']:>9.1f} ms | média {media:7.2f} | "
+            f"máx {f['max_ms']:8.2f} | linhas {f['linhas']:>8}"
+        )
+        linhas.append(f"      histograma {f['histograma']}")
+        linhas.append(f"      {forma[:160]}")
+
+    linhas += ["", f"Queries lentas (≥ {config.LIMITE_QUERY_LENTA_MS} ms), mais recentes:"]
+    for lenta in dados["lentas"][-10:]:
+        linhas.append(f"  {lenta['quando']} [{lenta['tela']}] {lenta['ms']} ms: {lenta['sql'][:120]}")
+        if lenta["plano"]:
+            linhas.append(f"      plano: {lenta['plano']}")
+    return "\n".join(linhas)
+
+
+def salvar_estatisticas(caminho: Optional[str] = None) -> None:
+    """Grava as estatísticas atuais em JSON (por padrão em config.ESTATISTICAS_CAMINHO)."""
+    caminho = caminho or config.ESTATISTICAS_CAMINHO
+    try:
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(estatisticas.instantaneo(), f, ensure_ascii=False, indent=1)
+    except OSError as e:
+        logger.warning("Não foi possível gravar as estatísticas em %s: %s", caminho, e)
+
+
+def carregar_estatisticas(caminho: Optional[str] = None) -> Optional[dict]:
+    """Lê as estatísticas gravadas pela última execução, se existirem."""
+    caminho = caminho or config.ESTATISTICAS_CAMINHO
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _salvar_ao_sair() -> None:
+    if estatisticas.formas:
+        salvar_estatisticas()
+
+
+atexit.register(_salvar_ao_sair)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estatísticas de queries da última execução")
+    parser.add_argument("--limpar", action="store_true", help="Apaga as estatísticas gravadas")
+    args = parser.parse_args()
+
+    # A execução da linha de comando não deve sobrescrever os dados do aplicativo
+    atexit.unregister(_salvar_ao_sair)
+    if args.limpar:
+        estatisticas.limpar()
+        salvar_estatisticas()
+        print("🗑️ Estatísticas apagadas.")
+    else:
+        dados = carregar_estatisticas()
+        print(relatorio(dados) if dados else f"⚠️ Nenhuma estatística em {config.ESTATISTICAS_CAMINHO}.")
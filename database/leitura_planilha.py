@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+database/leitura_planilha.py
+
+Leitura de planilhas .xlsx em lotes, com memória limitada.
+
+pd.read_excel monta a pasta de trabalho inteira com o openpyxl e depois um
+DataFrame com todas as linhas, de modo que o pico de memória cresce com a
+planilha. Aqui a pasta é aberta em modo somente leitura (read_only=True,
+que percorre o XML da aba sem montar as células) e as linhas saem de um
+gerador em DataFrames de até `lote` linhas, com os nomes do cabeçalho.
+Quem consome (importação de ferramentas, catálogo IP) processa um lote e
+descarta antes de ler o seguinte.
+
+    python -m database.leitura_planilha "Consulta Produtos IP.xlsx"
+"""
+import argparse
+from itertools import islice
+from typing import Iterator, Optional, Sequence
+
+import pandas as pd
+from openpyxl import load_workbook
+
+import database.config as config
+
+
+def ler_planilha_em_lotes(caminho: str, colunas: Optional[Sequence[str]] = None,
+                          lote: Optional[int] = None, aba: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Percorre a planilha em DataFrames de até `lote` linhas.
+
+    A primeira linha é o cabeçalho; colunas sem nome viram 'Unnamed: <n>',
+    como no pd.read_excel. Linhas inteiramente em branco são puladas.
+
+    :param colunas: só estas colunas (as ausentes na planilha são ignoradas)
+    :param lote: linhas por DataFrame (padrão: config.PLANILHA_LOTE_LINHAS)
+    :param aba: nome da aba (padrão: a aba ativa)
+    """
+    lote = lote or config.PLANILHA_LOTE_LINHAS
+    pasta = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        planilha = pasta[aba] if aba else pasta.active
+        linhas = planilha.iter_rows(values_only=True)
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return
+        nomes = [nome if nome is not None else f"Unnamed: {i}" for i, nome in enumerate(cabecalho)]
+        indices = [i for i, nome in enumerate(nomes) if colunas is None or nome in colunas]
+        nomes = [nomes[i] for i in indices]
+        while True:
+            bloco = list(islice(linhas, lote))
+            if not bloco:
+                return
+            # Linhas mais curtas que o cabeçalho (células finais vazias) são completadas com None
+            # e textos vazios viram None, como no pd.read_excel; linhas em branco (o read_only
+            # traz as formatadas do fim da aba) são descartadas
+            registros = [
+                registro for registro in (
+                    tuple(None if i >= len(linha) or linha[i] == "" else linha[i] for i in indices)
+                    for linha in bloco
+                ) if any(valor is not None for valor in registro)
+            ]
+            if registros:
+                yield pd.DataFrame.from_records(registros, columns=nomes)
+    finally:
+        pasta.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lê uma planilha em lotes e mostra o total de linhas")
+    parser.add_argument("planilha")
+    parser.add_argument("--lote", type=int)
+    args = parser.parse_args()
+    total = lotes = 0
+    for df in ler_planilha_em_lotes(args.planilha, lote=args.lote):
+        total += len(df)
+        lotes += 1
+    print(f"✅ {total} linhas em {lotes} lote(s)")
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+database/migracoes.py
+
+Migrações versionadas do esquema, controladas por PRAGMA user_version.
+
+Cada migração tem um número, uma descrição e uma lista de passos (SQL ou
+função que recebe a conexão). As pendentes são aplicadas em ordem, cada uma
+na sua própria transação junto com a atualização de user_version, de modo
+que um banco em produção é atualizado no lugar e nunca fica pela metade.
+
+Para alterar o esquema, acrescente uma nova migração ao final de MIGRACOES;
+nunca edite uma migração já publicada.
+
+    python -m database.migracoes
+"""
+import sqlite3
+import logging
+from typing import Callable, List, Tuple, Union
+
+from database.backup_incremental import DDL_ALTERACOES_BACKUP, DDL_RASTREAR_MARCADORES, ddl_rastrear_por_chave
+from database.busca_ferramentas import DDL_CATALOGO_FERRAMENTAS, configurar_ranking, criar_indice_busca
+from database.checkpoints_estoque import DDL_CHECKPOINTS
+from database.conexao import obter_conexao, transacao
+from database.saldos import DDL_SALDOS_ATIVOS, reconstruir_saldos_ativos
+
+logger = logging.getLogger(__name__)
+
+Passo = Union[str, Callable[[sqlite3.Connection], None]]
+
+
+def _preencher_saldos(conn: sqlite3.Connection) -> None:
+    """Bancos com histórico ganham saldos_ativos já preenchida a partir do ledger."""
+    reconstruir_saldos_ativos()
+
+
+MIGRACOES: List[Tuple[int, str, List[Passo]]] = [
+    (1, "Esquema base: usuarios, ferramentas, logs e maquinas", [
+        # Usuários
+        """
+        CREATE TABLE IF NOT EXISTS usuarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            senha TEXT NOT NULL,
+            rfid TEXT UNIQUE NOT NULL,
+            tipo TEXT NOT NULL
+        )
+        """,
+        # Ferramentas (sem campo estoque_ativo estático)
+        """
+        CREATE TABLE IF NOT EXISTS ferramentas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            codigo_barra TEXT UNIQUE NOT NULL,
+            estoque_almoxarifado INTEGER NOT NULL,
+            consumivel TEXT NOT NULL DEFAULT 'NÃO'
+        )
+        """,
+        # Logs de movimentação (ledger)
+        """
+        CREATE TABLE IF NOT EXISTS logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            usuario_id INTEGER NOT NULL,
+            ferramenta_id INTEGER NOT NULL,
+            acao TEXT NOT NULL,
+            quantidade INTEGER NOT NULL,
+            motivo TEXT,
+            operacoes INTEGER,
+            avaliacao INTEGER,
+            data_hora DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(usuario_id) REFERENCES usuarios(id),
+            FOREIGN KEY(ferramenta_id) REFERENCES ferramentas(id)
+        )
+        """,
+        # Máquinas
+        """
+        CREATE TABLE IF NOT EXISTS maquinas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL
+        )
+        """,
+    ]),
+    (2, "saldos_ativos mantida por triggers em logs", [
+        *DDL_SALDOS_ATIVOS,
+        _preencher_saldos,
+    ]),
+    (3, "Índices de desempenho do ledger e de usuários", [
+        # Últimas movimentações (ORDER BY data_hora DESC, id DESC LIMIT n)
+        "CREATE INDEX IF NOT EXISTS idx_logs_data_hora ON logs (data_hora, id)",
+        # Histórico por usuário e por ferramenta, em ordem cronológica
+        "CREATE INDEX IF NOT EXISTS idx_logs_usuario_data ON logs (usuario_id, data_hora, id)",
+        "CREATE INDEX IF NOT EXISTS idx_logs_ferramenta_data ON logs (ferramenta_id, data_hora, id)",
+        # Login manual e checagens de duplicidade do cadastro
+        "CREATE INDEX IF NOT EXISTS idx_usuarios_nome ON usuarios (nome)",
+    ]),
+    (4, "Rastreamento de alterações para os backups incrementais", DDL_ALTERACOES_BACKUP),
+    (5, "Marcadores de turno (virada sem troca de arquivo)", [
+        # ultimo_log_id: último log anterior ao início do turno; os logs do turno
+        # vão dele (exclusive) até o ultimo_log_id do marcador seguinte
+        """
+        CREATE TABLE IF NOT EXISTS marcadores_turno (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data TEXT NOT NULL,
+            turno TEXT NOT NULL,
+            inicio DATETIME NOT NULL,
+            ultimo_log_id INTEGER NOT NULL,
+            registrado_em DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (data, turno)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_marcadores_turno_inicio ON marcadores_turno (inicio)",
+        *DDL_RASTREAR_MARCADORES,
+    ]),
+    (6, "Checkpoints de estoque e saldos para consultas por data/hora", DDL_CHECKPOINTS),
+    (7, "Marcas d'água das exportações incrementais do ledger", [
+        # Último logs.id já gravado em cada destino (caminho do arquivo)
+        """
+        CREATE TABLE IF NOT EXISTS marcas_exportacao (
+            destino TEXT PRIMARY KEY,
+            ultimo_log_id INTEGER NOT NULL,
+            linhas INTEGER NOT NULL DEFAULT 0,
+            exportado_em DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ]),
+    (8, "Busca de ferramentas por texto (FTS5) e texto do catálogo da planilha", [
+        *DDL_CATALOGO_FERRAMENTAS,
+        # Sem FTS5 no SQLite em uso, segue sem o índice (busca por LIKE)
+        criar_indice_busca,
+    ]),
+    (9, "Pesos do bm25 como função de rank do índice de busca", [configurar_ranking]),
+    (10, "Rastreamento de catalogo_ferramentas para os backups incrementais",
+     ddl_rastrear_por_chave("catalogo_ferramentas")),
+    (11, "Rastreamento de marcas_exportacao para os backups incrementais",
+     ddl_rastrear_por_chave("marcas_exportacao")),
+]
+
+VERSAO_ATUAL = MIGRACOES[-1][0]
+
+
+def versao_banco() -> int:
+    """Versão do esquema gravada no banco atual (PRAGMA user_version)."""
+    return obter_conexao().execute("PRAGMA user_version").fetchone()[0]
+
+
+def aplicar_migracoes() -> int:
+    """
+    Aplica as migrações pendentes no banco em config.DATABASE_CAMINHO.
+
+    :return: versão do esquema após a execução
+    """
+    versao = versao_banco()
+    if versao >= VERSAO_ATUAL:
+        if versao > VERSAO_ATUAL:
+            logger.warning("Banco na versão %d, mais nova que a do sistema (%d).", versao, VERSAO_ATUAL)
+        return versao
+
+    for numero, descricao, passos in MIGRACOES:
+        if numero <= versao:
+            continue
+        with transacao() as conn:
+            # Outro quiosque pode ter aplicado a migração enquanto aguardávamos o lock
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= numero:
+                continue
+            for passo in passos:
+                if callable(passo):
+                    passo(conn)
+                else:
+                    conn.execute(passo)
+            conn.execute(f"PRAGMA user_version = {numero}")
+        logger.info("Migração %d aplicada: %s", numero, descricao)
+    return VERSAO_ATUAL
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    print(f"📂 Versão do banco: {versao_banco()} (sistema: {VERSAO_ATUAL})")
+    print(f"✅ Banco na versão {aplicar_migracoes()}.")
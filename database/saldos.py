@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+database/saldos.py
+
+Tabela saldos_ativos: quanto de cada ferramenta está com cada usuário.
+
+É mantida incrementalmente por triggers em logs (RETIRADA soma, DEVOLUCAO
+subtrai) e pode ser reconstruída ou conferida a partir do ledger:
+
+    python -m database.saldos --verificar
+    python -m database.saldos --reconstruir
+"""
+import logging
+import argparse
+from typing import List, Tuple
+
+from database.conexao import transacao
+from database.database_utils import executar_query
+
+logger = logging.getLogger(__name__)
+
+# Expressão do saldo de uma linha do ledger
+DELTA_SALDO = (
+    "CASE acao WHEN 'RETIRADA' THEN quantidade "
+    "WHEN 'DEVOLUCAO' THEN -quantidade ELSE 0 END"
+)
+
+DDL_SALDOS_ATIVOS = [
+    """
+    CREATE TABLE IF NOT EXISTS saldos_ativos (
+        usuario_id INTEGER NOT NULL,
+        ferramenta_id INTEGER NOT NULL,
+        saldo INTEGER NOT NULL,
+        PRIMARY KEY (usuario_id, ferramenta_id)
+    ) WITHOUT ROWID
+    """,
+    # Cada movimento de retirada/devolução ajusta o saldo do par usuário/ferramenta;
+    # pares zerados são removidos para a tabela conter só ferramentas em aberto.
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_logs_saldo_insert
+    AFTER INSERT ON logs
+    WHEN NEW.acao IN ('RETIRADA', 'DEVOLUCAO')
+    BEGIN
+        INSERT INTO saldos_ativos (usuario_id, ferramenta_id, saldo)
+        VALUES (
+            NEW.usuario_id, NEW.ferramenta_id,
+            CASE NEW.acao WHEN 'RETIRADA' THEN NEW.quantidade ELSE -NEW.quantidade END
+        )
+        ON CONFLICT (usuario_id, ferramenta_id) DO UPDATE SET saldo = saldo + excluded.saldo;
+        DELETE FROM saldos_ativos
+        WHERE usuario_id = NEW.usuario_id AND ferramenta_id = NEW.ferramenta_id AND saldo = 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_logs_saldo_delete
+    AFTER DELETE ON logs
+    WHEN OLD.acao IN ('RETIRADA', 'DEVOLUCAO')
+    BEGIN
+        INSERT INTO saldos_ativos (usuario_id, ferramenta_id, saldo)
+        VALUES (
+            OLD.usuario_id, OLD.ferramenta_id,
+            CASE OLD.acao WHEN 'RETIRADA' THEN -OLD.quantidade ELSE OLD.quantidade END
+        )
+        ON CONFLICT (usuario_id, ferramenta_id) DO UPDATE SET saldo = saldo + excluded.saldo;
+        DELETE FROM saldos_ativos
+        WHERE usuario_id = OLD.usuario_id AND ferramenta_id = OLD.ferramenta_id AND saldo = 0;
+    END
+    """,
+]
+
+# Saldos recalculados do zero a partir do ledger
+_SALDOS_DO_LEDGER = f"""
+    SELECT usuario_id, ferramenta_id, SUM({DELTA_SALDO}) AS saldo
+    FROM logs
+    GROUP BY usuario_id, ferramenta_id
+    HAVING saldo <> 0
+"""
+
+
+def reconstruir_saldos_ativos() -> int:
+    """
+    Recalcula saldos_ativos inteira a partir de logs, numa única transação.
+
+    :return: número de pares usuário/ferramenta com saldo em aberto
+    """
+    with transacao() as conn:
+        conn.execute("DELETE FROM saldos_ativos")
+        conn.execute(
+            f"INSERT INTO saldos_ativos (usuario_id, ferramenta_id, saldo) {_SALDOS_DO_LEDGER}"
+        )
+        total = conn.execute("SELECT COUNT(*) FROM saldos_ativos").fetchone()[0]
+    logger.info("saldos_ativos reconstruída: %d saldos em aberto.", total)
+    return total
+
+
+def verificar_saldos_ativos() -> List[Tuple[int, int, int, int]]:
+    """
+    Compara saldos_ativos com o ledger.
+
+    :return: divergências como (usuario_id, ferramenta_id, saldo_ledger, saldo_tabela);
+             lista vazia quando a tabela está consistente
+    """
+    sql = f"""
+    WITH ledger AS ({_SALDOS_DO_LEDGER})
+    SELECT l.usuario_id, l.ferramenta_id, l.saldo, COALESCE(s.saldo, 0)
+    FROM ledger l
+    LEFT JOIN saldos_ativos s
+      ON s.usuario_id = l.usuario_id AND s.ferramenta_id = l.ferramenta_id
+    WHERE s.saldo IS NOT l.saldo
+    UNION ALL
+    SELECT s.usuario_id, s.ferramenta_id, 0, s.saldo
+    FROM saldos_ativos s
+    WHERE NOT EXISTS (
+        SELECT 1 FROM ledger l
+        WHERE l.usuario_id = s.usuario_id AND l.ferramenta_id = s.ferramenta_id
+    )
+    """
+    return executar_query(sql, fetch=True) or []
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Manutenção da tabela saldos_ativos")
+    grupo = parser.add_mutually_exclusive_group(required=True)
+    grupo.add_argument("--verificar", action="store_true", help="Compara a tabela com o ledger")
+    grupo.add_argument("--reconstruir", action="store_true", help="Recalcula a tabela a partir do ledger")
+    args = parser.parse_args()
+
+    # Garante o esquema (e o preenchimento inicial da tabela) no banco atual
+    from database.database import criar_tabelas
+    criar_tabelas()
+
+    if args.reconstruir:
+        print(f"✅ saldos_ativos reconstruída: {reconstruir_saldos_ativos()} saldos em aberto.")
+    else:
+        divergencias = verificar_saldos_ativos()
+        if not divergencias:
+            print("✅ saldos_ativos confere com o ledger.")
+        for usuario_id, ferramenta_id, esperado, registrado in divergencias:
+            print(f"❌ usuário {usuario_id}, ferramenta {ferramenta_id}: "
+                  f"ledger={esperado} tabela={registrado}")
@@ -1,29 +1,32 @@
+import datetime
 import threading
-import schedule
 import time
 import logging
-from typing import Dict
+from typing import List, Optional
 
+from database.checkpoints_estoque import criar_checkpoints
 from database.database_backup import realizar_backup
+from database.turnos import Turno, inicios_entre, proximo_inicio, proximos_inicios
+from database.virada_turno import virar_turno
 import database.config as config
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
-# Horários de início de cada turno (configurável)
-TURNOS: Dict[str, str] = {
-    "1turno": "06:00",
-    "2turno": "14:00",
-    "3turno": "22:00",
-}
+# Espera máxima entre conferências do relógio. A espera normal vai direto até
+# o próximo turno; este limite só garante que, depois de uma suspensão do
+# computador (quando o relógio monotônico da espera para), o backup perdido
+# seja recuperado em poucos minutos.
+ESPERA_MAXIMA_S = 300
 
 _config_lock = threading.Lock()
 _stop_event = threading.Event()
+_proximo: Optional[Turno] = None
 
-def _backup_e_troca(turno: str) -> None:
+def _backup_e_troca(turno: str, data: Optional[datetime.date] = None) -> None:
     """Executa backup para o turno informado e atualiza config.DATABASE_CAMINHO."""
     try:
-        novo_db = realizar_backup(turno=turno)
+        novo_db = realizar_backup(turno=turno, data=data)
     except Exception:
         logger.exception("Erro ao executar backup para %s", turno)
         return
@@ -35,34 +38,83 @@ def _backup_e_troca(turno: str) -> None:
     else:
         logger.error("Falha ao gerar backup para %s", turno)
 
-def agendar_backups() -> None:
-    """Agenda backups diários para cada turno."""
-    for turno, horario in TURNOS.items():
-        schedule.every().day.at(horario).do(_backup_e_troca, turno)
-        logger.info("Backup agendado para %s às %s", turno, horario)
+def _virada(turno: Turno) -> None:
+    """
+    Virada de turno conforme config.VIRADA_DE_TURNO: com "marcador", grava o
+    marcador e checkpoints e backup seguem em segundo plano no mesmo banco;
+    com "arquivo", cria os checkpoints, faz o backup e troca de banco aqui mesmo.
+    """
+    if config.VIRADA_DE_TURNO == "marcador":
+        virar_turno(turno)
+    else:
+        try:
+            # Antes da cópia, para que o checkpoint vá junto para o banco novo
+            criar_checkpoints()
+        except Exception:
+            logger.exception("Erro ao criar checkpoints de estoque")
+        _backup_e_troca(turno.nome, turno.data)
+
+def proxima_execucao() -> Optional[Turno]:
+    """Próximo backup agendado (None com o agendador parado)."""
+    return _proximo
+
+def proximas_execucoes(quantidade: int = 3) -> List[Turno]:
+    """Os próximos backups, a partir do agendado."""
+    if _proximo is None:
+        return []
+    return [_proximo, *proximos_inicios(quantidade - 1, _proximo.inicio)]
 
 def iniciar_agendador_em_thread() -> threading.Thread:
     """
     Inicia o agendador em thread daemon.
     Retorna o objeto Thread para possível controle externo.
     """
-    agendar_backups()
+    global _proximo
+    _stop_event.clear()
+    _proximo = proximo_inicio()
+    logger.info("Próximo backup: %s de %s às %s", _proximo.nome, _proximo.data, _proximo.inicio)
     t = threading.Thread(target=_loop, daemon=True)
     t.start()
     return t
 
 def _loop() -> None:
-    """Loop interno que roda pendências até stop_event ser sinalizado."""
-    while not _stop_event.is_set():
-        schedule.run_pending()
-        time.sleep(30)
+    """
+    Dorme até o próximo início de turno (ou até stop_event) e faz o backup.
+
+    Se o computador estava suspenso e um ou mais turnos começaram nesse
+    meio-tempo, faz só o backup do turno em andamento: os anteriores já não
+    podem ser reconstituídos e teriam o mesmo conteúdo.
+    """
+    global _proximo
+    while True:
+        espera = (_proximo.inicio - datetime.datetime.now()).total_seconds()
+        if _stop_event.wait(min(max(espera, 0.0), ESPERA_MAXIMA_S)):
+            break
+        agora = datetime.datetime.now()
+        if agora < _proximo.inicio:
+            continue
+
+        perdidos = inicios_entre(_proximo.inicio - datetime.timedelta(microseconds=1), agora)
+        turno = perdidos[-1]
+        if len(perdidos) > 1 or agora - turno.inicio > datetime.timedelta(seconds=ESPERA_MAXIMA_S):
+            logger.warning(
+                "Agendador atrasado (suspensão?): %d início(s) de turno desde %s; "
+                "fazendo o backup de %s de %s.",
+                len(perdidos), _proximo.inicio, turno.nome, turno.data
+            )
+        _virada(turno)
+        _proximo = proximo_inicio(agora)
+        logger.info("Próximo backup: %s de %s às %s", _proximo.nome, _proximo.data, _proximo.inicio)
+    _proximo = None
 
 def stop_agendador() -> None:
-    """Sinaliza para a thread de agendamento parar."""
+    """Sinaliza para a thread de agendamento parar (ela acorda na hora)."""
     _stop_event.set()
 
 if __name__ == "__main__":
     iniciar_agendador_em_thread()
+    for turno in proximas_execucoes():
+        print(f"🕒 Backup de {turno.nome} ({turno.data}) às {turno.inicio:%d/%m %H:%M}")
     try:
         # Mantém o script ativo
         while True:
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+database/turnos.py
+
+Calendário dos turnos: fonte única dos horários usados pelo agendador de
+backups e pelos nomes dos arquivos de backup e de exportação.
+
+Cada turno começa no horário de TURNOS e vai até o início do seguinte. O
+último atravessa a meia-noite e pertence ao dia em que começou: às 02:00 do
+dia 19 ainda é o 3turno do dia 18.
+
+    python -m database.turnos     # turno atual e próximos inícios
+"""
+import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+# Horário de início de cada turno, em ordem
+TURNOS: Dict[str, datetime.time] = {
+    "1turno": datetime.time(6, 0),
+    "2turno": datetime.time(14, 0),
+    "3turno": datetime.time(22, 0),
+}
+
+
+class Turno(NamedTuple):
+    data: datetime.date
+    nome: str
+    inicio: datetime.datetime
+
+
+def _inicios_do_dia(data: datetime.date) -> List[Turno]:
+    return [Turno(data, nome, datetime.datetime.combine(data, hora)) for nome, hora in TURNOS.items()]
+
+
+def turno_em(momento: Optional[datetime.datetime] = None) -> Turno:
+    """Turno em andamento em `momento` (padrão: agora)."""
+    momento = momento or datetime.datetime.now()
+    for dia in (momento.date(), momento.date() - datetime.timedelta(days=1)):
+        iniciados = [t for t in _inicios_do_dia(dia) if t.inicio <= momento]
+        if iniciados:
+            return iniciados[-1]
+    raise ValueError("TURNOS vazio")
+
+
+def proximo_inicio(momento: Optional[datetime.datetime] = None) -> Turno:
+    """Primeiro início de turno estritamente depois de `momento` (padrão: agora)."""
+    momento = momento or datetime.datetime.now()
+    for dia in (momento.date(), momento.date() + datetime.timedelta(days=1)):
+        for turno in _inicios_do_dia(dia):
+            if turno.inicio > momento:
+                return turno
+    raise ValueError("TURNOS vazio")
+
+
+def proximos_inicios(quantidade: int = 3, momento: Optional[datetime.datetime] = None) -> List[Turno]:
+    """Os próximos `quantidade` inícios de turno depois de `momento`."""
+    inicios = []
+    for _ in range(quantidade):
+        momento = proximo_inicio(momento).inicio
+        inicios.append(turno_em(momento))
+    return inicios
+
+
+def inicios_entre(desde: datetime.datetime, ate: datetime.datetime) -> List[Turno]:
+    """Inícios de turno no intervalo (desde, ate], em ordem."""
+    inicios = []
+    turno = proximo_inicio(desde)
+    while turno.inicio <= ate:
+        inicios.append(turno)
+        turno = proximo_inicio(turno.inicio)
+    return inicios
+
+
+if __name__ == "__main__":
+    atual = turno_em()
+    print(f"🕒 Turno atual: {atual.nome} de {atual.data} (desde {atual.inicio:%H:%M})")
+    for turno in proximos_inicios(len(TURNOS)):
+        print(f"   próximo: {turno.nome} de {turno.data} às {turno.inicio:%d/%m %H:%M}")
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+database/virada_turno.py
+
+Virada de turno sem trocar de arquivo (config.VIRADA_DE_TURNO = "marcador").
+
+O banco principal continua sendo o banco em uso. Na virada, só uma linha é
+gravada em marcadores_turno (turno, início e o último log anterior a ele),
+o que leva milissegundos; os checkpoints de estoque e o backup do turno
+rodam em seguida numa thread à parte, com a API de backup online,
+enquanto o quiosque segue registrando movimentações. O histórico de todos os turnos fica num único banco e os
+logs de um turno são o intervalo de ids entre o seu marcador e o seguinte.
+
+    python -m database.virada_turno      # últimos turnos registrados
+"""
+import os
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from contextlib import closing
+from typing import List, Optional
+
+import database.config as config
+from database import catalogo_backups as catalogo
+from database.checkpoints_estoque import criar_checkpoints, data_hora_utc
+from database.conexao import fechar_conexao_da_thread, obter_conexao, transacao
+from database.database_backup import copiar_banco_online, realizar_backup
+from database.turnos import Turno
+
+logger = logging.getLogger(__name__)
+
+# Uma tarefa de virada por vez; o lock fica com a thread até ela terminar
+_tarefas_lock = threading.Lock()
+
+
+def registrar_marcador(turno: Turno) -> bool:
+    """
+    Grava o marcador do turno no banco em uso, se ainda não existir.
+
+    ultimo_log_id é o último log gravado antes do início do turno (pelo
+    índice de data_hora), de modo que um marcador gravado com atraso —
+    agendador acordando depois de uma suspensão — não puxa para o turno
+    novo as movimentações do anterior.
+
+    :return: True se o marcador foi criado agora
+    """
+    with transacao() as conn:
+        cursor = conn.execute(
+            """
+            INSERT OR IGNORE INTO marcadores_turno (data, turno, inicio, ultimo_log_id)
+            VALUES (?, ?, ?, COALESCE(
+                (SELECT id FROM logs WHERE data_hora < ? ORDER BY data_hora DESC, id DESC LIMIT 1), 0
+            ))
+            """,
+            (turno.data.isoformat(), turno.nome, turno.inicio.isoformat(sep=" "), data_hora_utc(turno.inicio))
+        )
+        return cursor.rowcount == 1
+
+
+def marcadores(quantidade: int = 30) -> List[dict]:
+    """
+    Últimos turnos registrados, do mais recente ao mais antigo, com a
+    quantidade de logs de cada um (o turno em andamento conta até agora).
+    """
+    conn = obter_conexao()
+    linhas = conn.execute(
+        """
+        SELECT data, turno, inicio, registrado_em, ultimo_log_id,
+               COALESCE(LEAD(ultimo_log_id) OVER (ORDER BY inicio),
+                        (SELECT COALESCE(MAX(id), 0) FROM logs)) - ultimo_log_id AS logs
+        FROM marcadores_turno
+        ORDER BY inicio DESC
+        LIMIT ?
+        """,
+        (quantidade,)
+    ).fetchall()
+    colunas = ("data", "turno", "inicio", "registrado_em", "ultimo_log_id", "logs")
+    return [dict(zip(colunas, linha)) for linha in linhas]
+
+
+def tarefas_em_segundo_plano(turno: Turno, backup: bool = True) -> Optional[threading.Thread]:
+    """
+    Roda numa thread daemon o trabalho pesado da virada, sem trocar o banco
+    em uso: os checkpoints de estoque que faltam e, com backup=True, o
+    backup do turno.
+
+    Se a tarefa anterior ainda estiver rodando, esta é pulada (a seguinte
+    já vai cobrir tudo) e a função retorna None.
+    """
+    if not _tarefas_lock.acquire(blocking=False):
+        logger.warning("Tarefas da virada anterior ainda em andamento; pulando as de %s de %s.",
+                       turno.nome, turno.data)
+        return None
+
+    def tarefa() -> None:
+        try:
+            try:
+                criar_checkpoints()
+            except Exception:
+                logger.exception("Erro ao criar checkpoints de estoque")
+            if backup:
+                inicio = time.perf_counter()
+                if realizar_backup(turno=turno.nome, data=turno.data):
+                    logger.info("Backup de %s de %s concluído em segundo plano em %.2fs",
+                                turno.nome, turno.data, time.perf_counter() - inicio)
+                else:
+                    logger.error("Falha no backup de %s de %s", turno.nome, turno.data)
+        except Exception:
+            logger.exception("Erro no backup de %s de %s", turno.nome, turno.data)
+        finally:
+            fechar_conexao_da_thread()
+            _tarefas_lock.release()
+
+    thread = threading.Thread(target=tarefa, name="virada-turno", daemon=True)
+    thread.start()
+    return thread
+
+
+def virar_turno(turno: Turno) -> Optional[threading.Thread]:
+    """
+    Virada para `turno`: grava o marcador e dispara em segundo plano os
+    checkpoints de estoque e, se o turno ainda não tem backup no catálogo,
+    o backup.
+
+    Chamada pelo agendador em cada início de turno e na inicialização (onde
+    não faz backup se o sistema só foi reaberto no meio do turno).
+
+    :return: a thread das tarefas em segundo plano, se foi disparada
+    """
+    inicio = time.perf_counter()
+    try:
+        criado = registrar_marcador(turno)
+    except sqlite3.Error:
+        logger.exception("Erro ao registrar o marcador de %s de %s", turno.nome, turno.data)
+        criado = False
+    if criado:
+        logger.info("Virada para %s de %s registrada em %.1f ms",
+                    turno.nome, turno.data, (time.perf_counter() - inicio) * 1000)
+
+    feito = catalogo.do_turno(turno.data, turno.nome, ("completo", "snapshot", "delta"))
+    return tarefas_em_segundo_plano(turno, backup=not feito)
+
+
+def _modificado_em(caminho: str) -> float:
+    """Última gravação em um banco, contando o arquivo -wal (onde o WAL grava antes do checkpoint)."""
+    return max(
+        (os.path.getmtime(arquivo) for arquivo in (caminho, caminho + "-wal") if os.path.exists(arquivo)),
+        default=0.0
+    )
+
+
+def _ja_usa_marcadores(caminho: str) -> bool:
+    """Se o banco já gravou algum marcador de turno (já esteve no modo marcador)."""
+    if not os.path.exists(caminho):
+        return False
+    with closing(sqlite3.connect(caminho)) as conn:
+        try:
+            return conn.execute("SELECT 1 FROM marcadores_turno LIMIT 1").fetchone() is not None
+        except sqlite3.OperationalError:
+            return False  # Banco anterior à migração dos marcadores
+
+
+def adotar_banco_de_turno() -> Optional[str]:
+    """
+    Passagem do modo "arquivo" para o modo "marcador", uma única vez.
+
+    No modo arquivo, o banco em uso era a cópia do turno em BACKUP_DIR e o
+    banco principal ficava parado. Se a cópia completa mais recente (ainda
+    não compactada) foi alterada depois do banco principal, é ela que tem
+    os dados: passa a ser o banco principal e o antigo fica ao lado, com
+    sufixo .anterior. Deve rodar antes de qualquer conexão ao banco principal.
+
+    Depois que o banco principal grava o primeiro marcador de turno, a
+    passagem já aconteceu: a função retorna sem varrer BACKUP_DIR e sem
+    olhar os backups (que, no modo marcador, são cópias do próprio banco
+    principal e nunca devem substituí-lo).
+
+    :return: nome do backup adotado, se houve adoção
+    """
+    if _ja_usa_marcadores(config.DATABASE_CAMINHO):
+        return None
+    # A cópia criada no primeiro uso do modo arquivo nunca entrou no catálogo
+    catalogo.sincronizar()
+    ultimo = catalogo.ultimo(("completo",))
+    if ultimo is None or ultimo["compactado"]:
+        return None
+    copia = catalogo.caminho_arquivo(ultimo)
+    principal = config.DATABASE_CAMINHO
+    if not os.path.exists(copia) or _modificado_em(copia) <= _modificado_em(principal):
+        return None
+
+    mensagem = f"Banco principal passa a ser o conteúdo de '{ultimo['nome']}'"
+    if os.path.exists(principal):
+        # Leva o WAL para o arquivo principal, para que nenhum -wal antigo sobre ao lado do novo banco
+        with closing(sqlite3.connect(principal)) as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        os.replace(principal, principal + ".anterior")
+        mensagem += f" (antigo em {principal}.anterior)"
+    copiar_banco_online(copia, principal)
+    print(f"🔁 {mensagem}")
+    logger.info(mensagem)
+    return ultimo["nome"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Marcadores de turno do banco principal")
+    parser.add_argument("--quantidade", type=int, default=30)
+    args = parser.parse_args()
+    print(f"{'Turno':<20}{'início':<22}{'registrado em (UTC)':<22}{'logs':>8}")
+    for marcador in marcadores(args.quantidade):
+        print(f"{marcador['data'] + ' ' + marcador['turno']:<20}{marcador['inicio'][:16]:<22}"
+              f"{marcador['registrado_em'][:19]:<22}{marcador['logs']:>8}")
@@ -1,13 +1,16 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton,
-    QFormLayout, QMessageBox, QTableWidget, QTableWidgetItem
+    QFormLayout, QMessageBox
 )
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIntValidator
 
 from utils.movimentacoes import adicionar_ferramenta, subtrair_ferramenta, zerar_ferramenta
-from database.database import buscar_ferramenta_por_codigo, buscar_ultimas_movimentacoes
+from database.database import buscar_ferramenta_por_codigo
 from database.database_utils import buscar_estoque_ativo_usuario
+from telas.historico import TabelaHistorico
+from telas.busca_ferramentas import CampoBuscaFerramentas
+from interface.trabalhador_banco import executar_no_banco
 
 
 class TelaEstoque(QWidget):
@@ -17,10 +20,16 @@ class TelaEstoque(QWidget):
       - SUBTRACAO parcial (➖)
       - ZERAR estoque (🗑️)
     Mostra descrição, valores atuais e histórico de movimentações, além do estoque ativo dinâmico por usuário.
+    Com uma ferramenta selecionada, o histórico mostra só as movimentações dela.
+    A ferramenta pode ser escolhida pelo código ou pela busca por descrição.
+    As operações rodam no trabalhador de banco; enquanto uma está pendente,
+    os botões ficam desabilitados.
     """
     def __init__(self, navegacao):
         super().__init__()
         self.navegacao = navegacao
+        # Operação enviada ao trabalhador de banco e ainda sem resposta
+        self._pendente = False
         self._build_ui()
 
     def _build_ui(self):
@@ -41,25 +50,27 @@ class TelaEstoque(QWidget):
         self.qtde_input.setPlaceholderText("Quantidade")
         self.qtde_input.setValidator(QIntValidator(1, 1_000_000, self))
 
+        self.busca = CampoBuscaFerramentas()
+        self.busca.selecionada.connect(self._selecionar_da_busca)
+
         form.addRow("Código:", self.codigo_input)
+        form.addRow("Buscar:", self.busca)
         form.addRow("Quantidade:", self.qtde_input)
         layout.addLayout(form)
 
         # Labels descrição e estoque
         self.lbl_descricao = QLabel("🔎 Descrição: -")
         self.lbl_estoque = QLabel("📦 Almoxarifado: - | Ativo: -")
+        self.lbl_status = QLabel("")
         layout.addWidget(self.lbl_descricao)
         layout.addWidget(self.lbl_estoque)
+        layout.addWidget(self.lbl_status)
 
-        # Tabela histórico
+        # Tabela histórico (paginada)
         layout.addWidget(QLabel("📜 Últimas Movimentações:"))
-        self.tabela = QTableWidget()
-        self.tabela.setColumnCount(9)
-        self.tabela.setHorizontalHeaderLabels([
-            "Data/Hora", "Operador", "Código", "Descrição", "Tipo",
-            "Qtd", "Motivo", "Operações", "Avaliação"
-        ])
-        layout.addWidget(self.tabela)
+        self.historico = TabelaHistorico()
+        self.tabela = self.historico.tabela
+        layout.addWidget(self.historico)
 
         # Botões
         btn_add  = QPushButton("➕ Adicionar Estoque")
@@ -76,6 +87,7 @@ class TelaEstoque(QWidget):
 
         for btn in (btn_add, btn_sub, btn_zero, btn_back):
             layout.addWidget(btn)
+        self.botoes_acao = (btn_add, btn_sub, btn_zero)
 
         self.setLayout(layout)
         self.codigo_input.setFocus()
@@ -86,7 +98,7 @@ class TelaEstoque(QWidget):
         Atualiza a tela ao exibi-la: limpa campos, histórico e mantém código de barras.
         """
         self._clear_labels()
-        self._refresh_history()
+        self.historico.limpar_filtros()
 
     def _get_rfid(self):
         """Retorna o RFID do usuário atual ou exibe aviso."""
@@ -110,13 +122,7 @@ class TelaEstoque(QWidget):
         except ValueError:
             return self._msg("Erro", "Quantidade inválida.", "warning")
 
-        resp = adicionar_ferramenta(rfid, cod, q)
-        if resp.get('status'):
-            self._msg("Sucesso", resp.get('mensagem'), "info")
-            self._clear_all()
-            self._refresh_history()
-        else:
-            self._msg("Erro", resp.get('mensagem'), "warning")
+        self._enviar(adicionar_ferramenta, rfid, cod, q)
 
     def subtrair(self):
         rfid = self._get_rfid()
@@ -133,13 +139,7 @@ class TelaEstoque(QWidget):
         except ValueError:
             return self._msg("Erro", "Quantidade inválida.", "warning")
 
-        resp = subtrair_ferramenta(rfid, cod, q)
-        if resp.get('status'):
-            self._msg("Sucesso", resp.get('mensagem'), "info")
-            self._clear_all()
-            self._refresh_history()
-        else:
-            self._msg("Erro", resp.get('mensagem'), "warning")
+        self._enviar(subtrair_ferramenta, rfid, cod, q)
 
     def zerar(self):
         rfid = self._get_rfid()
@@ -149,7 +149,15 @@ class TelaEstoque(QWidget):
         if not cod:
             return self._msg("Erro", "Informe o código da ferramenta.", "warning")
 
-        resp = zerar_ferramenta(rfid, cod)
+        self._enviar(zerar_ferramenta, rfid, cod)
+
+    def _enviar(self, operacao, *args):
+        """Envia a operação de estoque ao trabalhador de banco."""
+        self._definir_pendente(True, "⏳ Registrando operação...")
+        executar_no_banco(operacao, *args, ao_concluir=self._concluir, ao_falhar=self._falha_banco)
+
+    def _concluir(self, resp):
+        self._definir_pendente(False)
         if resp.get('status'):
             self._msg("Sucesso", resp.get('mensagem'), "info")
             self._clear_all()
@@ -157,39 +165,68 @@ class TelaEstoque(QWidget):
         else:
             self._msg("Erro", resp.get('mensagem'), "warning")
 
+    def _falha_banco(self, erro):
+        self._definir_pendente(False)
+        self._msg("Erro", f"⚠️ Erro no banco de dados: {erro}", "warning")
+
+    def _definir_pendente(self, pendente, texto=""):
+        self._pendente = pendente
+        for btn in self.botoes_acao:
+            btn.setEnabled(not pendente)
+        self.codigo_input.setEnabled(not pendente)
+        self.busca.setEnabled(not pendente)
+        self.lbl_status.setText(texto)
+
     def _on_codigo_enter(self):
         cod = self.codigo_input.text().strip()
         if not cod:
             self._clear_labels()
+            self.historico.limpar_filtros()
         else:
-            dados = buscar_ferramenta_por_codigo(cod)
-            if dados:
-                # Estoque almoxarifado estático
-                est_alm = dados['estoque_almoxarifado']
-                # Calcula estoque ativo dinâmico
-                rfid = self._get_rfid()
-                ativos = buscar_estoque_ativo_usuario(rfid) if rfid else []
-                sal = next((r[3] for r in ativos if r[0] == dados['id']), 0)
-                self.lbl_descricao.setText(f"🔎 Descrição: {dados['nome']}")
-                self.lbl_estoque.setText(f"📦 Almoxarifado: {est_alm} | Ativo: {sal}")
-            else:
-                QMessageBox.warning(self, "Erro", "Ferramenta não encontrada.")
-                self._clear_labels()
-        self._refresh_history()
+            rfid = self._get_rfid()
+            self._definir_pendente(True, "⏳ Buscando ferramenta...")
+            executar_no_banco(self._consultar, cod, rfid,
+                              ao_concluir=self._exibir_dados, ao_falhar=self._falha_banco)
+
+    def _selecionar_da_busca(self, cod):
+        if self._pendente:
+            return
+        # Como se o código tivesse sido lido
+        self.codigo_input.setText(cod)
+        self._on_codigo_enter()
+
+    def _consultar(self, cod, rfid):
+        # Roda no trabalhador de banco
+        dados = buscar_ferramenta_por_codigo(cod)
+        if not dados:
+            return None, 0
+        ativos = buscar_estoque_ativo_usuario(rfid) if rfid else []
+        return dados, next((r[3] for r in ativos if r[0] == dados['id']), 0)
+
+    def _exibir_dados(self, resultado):
+        self._definir_pendente(False)
+        dados, sal = resultado
+        if dados:
+            # Estoque almoxarifado estático
+            est_alm = dados['estoque_almoxarifado']
+            self.lbl_descricao.setText(f"🔎 Descrição: {dados['nome']}")
+            self.lbl_estoque.setText(f"📦 Almoxarifado: {est_alm} | Ativo: {sal}")
+            # Histórico só da ferramenta selecionada
+            self.historico.recarregar(ferramenta_id=dados['id'])
+        else:
+            QMessageBox.warning(self, "Erro", "Ferramenta não encontrada.")
+            self._clear_labels()
+            self.historico.limpar_filtros()
 
     def _refresh_history(self):
-        registros = buscar_ultimas_movimentacoes()
-        self.tabela.setRowCount(0)
-        for linha in registros:
-            row = self.tabela.rowCount()
-            self.tabela.insertRow(row)
-            for col, val in enumerate(linha):
-                self.tabela.setItem(row, col, QTableWidgetItem(str(val)))
+        # Primeira página com os filtros atuais
+        self.historico.recarregar()
 
     def _clear_all(self):
         self.codigo_input.clear()
         self.qtde_input.clear()
         self._clear_labels()
+        self.historico.filtros = {}
 
     def _clear_labels(self):
         self.lbl_descricao.setText("🔎 Descrição: -")
@@ -9,11 +9,22 @@ if len(sys.argv) < 2:
     print("""
 # 📁 database
 python executar_modulo.py database.__init__
+python executar_modulo.py database.busca_ferramentas
+python executar_modulo.py database.backup_incremental
+python executar_modulo.py database.catalogo_backups
+python executar_modulo.py database.checkpoints_estoque
 python executar_modulo.py database.config
+python executar_modulo.py database.conexao
 python executar_modulo.py database.database
 python executar_modulo.py database.database_backup
 python executar_modulo.py database.database_utils
+python executar_modulo.py database.instrumentacao
+python executar_modulo.py database.leitura_planilha
+python executar_modulo.py database.migracoes
+python executar_modulo.py database.saldos
 python executar_modulo.py database.scheduler
+python executar_modulo.py database.turnos
+python executar_modulo.py database.virada_turno
 
 # 📁 estoque
 python executar_modulo.py estoque.__init__
@@ -21,6 +32,21 @@ python executar_modulo.py estoque.estoque
 
 # 📁 experimental
 python executar_modulo.py experimental.__init__
+python executar_modulo.py experimental.bench_backup_compactado
+python executar_modulo.py experimental.bench_backup_incremental
+python executar_modulo.py experimental.bench_busca_ferramentas
+python executar_modulo.py experimental.bench_catalogo_backups
+python executar_modulo.py experimental.bench_catalogo_ip
+python executar_modulo.py experimental.bench_conexoes
+python executar_modulo.py experimental.bench_estoque_em
+python executar_modulo.py experimental.bench_exportacao
+python executar_modulo.py experimental.bench_exportacao_incremental
+python executar_modulo.py experimental.bench_importacao_planilha
+python executar_modulo.py experimental.bench_inicializacao_gui
+python executar_modulo.py experimental.bench_leitura_planilha
+python executar_modulo.py experimental.bench_movimentacoes
+python executar_modulo.py experimental.bench_travamentos_gui
+python executar_modulo.py experimental.bench_virada_turno
 python executar_modulo.py experimental.clean
 python executar_modulo.py experimental.test
 
@@ -43,6 +69,7 @@ python executar_modulo.py telas.tela_login_rfid
 python executar_modulo.py utils.__init__
 python executar_modulo.py utils.barcode_reader
 python executar_modulo.py utils.consulta_planilha
+python executar_modulo.py utils.exportador
 python executar_modulo.py utils.rfid_reader
 
 # 📄 Arquivos principais
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+experimental/bench_backup_compactado.py
+
+Mede a compactação dos backups num ledger grande (~1 GB com o padrão):
+taxa de compressão, tempo para compactar e tempo de restauração direto do
+.gz, comparado à restauração de uma cópia sem compressão. O pico de memória
+(tracemalloc) mostra que o arquivo é processado em fluxo.
+
+Uso: python -m experimental.bench_backup_compactado [--logs N] [--nivel N]
+"""
+import os
+import time
+import logging
+import argparse
+import tempfile
+import tracemalloc
+
+import database.config as config
+from database.conexao import fechar_conexoes
+from database.database_backup import compactar_backup, copiar_banco_online, descompactar_backup
+from experimental.bench_movimentacoes import popular_banco
+
+
+def _medir(funcao, *args):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, segundos, pico / 1024 / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compactação e restauração de backups")
+    parser.add_argument("--logs", type=int, default=3_400_000, help="Logs no ledger (3,4 milhões ≈ 1 GB)")
+    parser.add_argument("--nivel", type=int, default=config.BACKUP_COMPRESSAO_NIVEL)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+    config.BACKUP_COMPRESSAO_NIVEL = args.nivel
+
+    with tempfile.TemporaryDirectory() as pasta:
+        config.DATABASE_CAMINHO = os.path.join(pasta, "quiosque.db")
+        inicio = time.perf_counter()
+        popular_banco(n_usuarios=200, n_ferramentas=5000, n_logs=args.logs)
+        fechar_conexoes()
+        print(f"Ledger gerado em {time.perf_counter() - inicio:.0f}s")
+
+        backup = os.path.join(pasta, "backup.db")
+        _, t_copia, _ = _medir(copiar_banco_online, config.DATABASE_CAMINHO, backup)
+        tamanho = os.path.getsize(backup)
+        _, t_sem_compressao, _ = _medir(copiar_banco_online, backup, os.path.join(pasta, "restaurado_db.db"))
+
+        r, t_compactar, pico_compactar = _medir(compactar_backup, backup)
+        _, t_restaurar, pico_restaurar = _medir(descompactar_backup, backup + ".gz", os.path.join(pasta, "restaurado.db"))
+        igual = os.path.getsize(os.path.join(pasta, "restaurado.db")) == tamanho
+
+        print(f"Banco: {tamanho / 1024 / 1024:.0f} MB | backup online {t_copia:.1f}s")
+        print(f"Compactado (gzip nível {args.nivel}): {r['bytes_compactado'] / 1024 / 1024:.0f} MB, "
+              f"{r['razao']:.1f}x em {t_compactar:.1f}s (com releitura do CRC), pico de memória {pico_compactar:.1f} MB")
+        print(f"Restauração do .gz: {t_restaurar:.1f}s, pico de memória {pico_restaurar:.1f} MB, "
+              f"tamanho igual ao original: {'sim' if igual else 'NÃO'}")
+        print(f"Restauração de cópia sem compressão: {t_sem_compressao:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
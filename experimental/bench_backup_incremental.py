@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+experimental/bench_backup_incremental.py
+
+Compara, para uma semana de turnos, o espaço em disco e o tempo do backup
+completo por turno (uma cópia inteira do banco a cada turno) com o modo
+incremental (snapshot semanal + delta por turno). Ao final, restaura o
+último turno a partir do snapshot e dos deltas e confere que o banco
+reconstruído é igual ao banco em uso.
+
+Uso: python -m experimental.bench_backup_incremental [--logs N] [--dias N] [--movimentos N]
+"""
+import os
+import time
+import random
+import sqlite3
+import logging
+import argparse
+import datetime
+import tempfile
+from contextlib import closing, redirect_stdout
+
+import database.config as config
+from database.conexao import fechar_conexoes
+from database.database_backup import copiar_banco_online, realizar_backup_incremental, restaurar_backup
+from database.turnos import TURNOS
+from experimental.bench_movimentacoes import popular_banco
+from utils.exportador import exportar_incremental
+from utils.movimentacoes import realizar_movimentacao
+
+# Conteúdo comparado entre o banco em uso e o restaurado
+_CONFERENCIA = {
+    "usuarios": "SELECT * FROM usuarios ORDER BY id",
+    "ferramentas": "SELECT * FROM ferramentas ORDER BY id",
+    "logs": "SELECT * FROM logs ORDER BY id",
+    "saldos_ativos": "SELECT * FROM saldos_ativos ORDER BY usuario_id, ferramenta_id",
+    "catalogo_ferramentas": "SELECT * FROM catalogo_ferramentas ORDER BY codigo_barra",
+    "marcas_exportacao": "SELECT * FROM marcas_exportacao ORDER BY destino",
+}
+
+
+def _simular_turno(rnd: random.Random, n_movimentos: int, n_usuarios: int, n_ferramentas: int, turno: str) -> None:
+    """Retiradas e devoluções do turno, mais uma ferramenta nova e ajustes de cadastro e de catálogo."""
+    for _ in range(n_movimentos):
+        rfid = f"RFID{rnd.randrange(n_usuarios):06d}"
+        codigo = f"COD{rnd.randrange(n_ferramentas):06d}"
+        realizar_movimentacao(rfid, codigo, rnd.choice(("RETIRADA", "DEVOLUCAO")))
+    with closing(sqlite3.connect(config.DATABASE_CAMINHO)) as conn, conn:
+        conn.execute(
+            "INSERT INTO ferramentas (nome, codigo_barra, estoque_almoxarifado) VALUES (?, ?, 5)",
+            (f"Nova {turno} {time.time_ns()}", f"NOVA{time.time_ns()}")
+        )
+        conn.execute("UPDATE usuarios SET nome = nome || '*' WHERE id = ?", (rnd.randrange(n_usuarios) + 1,))
+        # Como na reimportação da planilha: textos novos ou alterados e um código que saiu
+        conn.execute(
+            "INSERT INTO catalogo_ferramentas (codigo_barra, texto) VALUES (?, ?) "
+            "ON CONFLICT (codigo_barra) DO UPDATE SET texto = excluded.texto",
+            (f"COD{rnd.randrange(n_ferramentas):06d}", f"Catálogo {turno} {time.time_ns()}")
+        )
+        conn.execute("DELETE FROM catalogo_ferramentas WHERE codigo_barra = ?",
+                     (f"COD{rnd.randrange(n_ferramentas):06d}",))
+
+
+def _conteudo(caminho: str) -> dict:
+    with closing(sqlite3.connect(caminho)) as conn:
+        return {tabela: conn.execute(sql).fetchall() for tabela, sql in _CONFERENCIA.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backup completo x incremental por turno")
+    parser.add_argument("--logs", type=int, default=300_000)
+    parser.add_argument("--dias", type=int, default=7)
+    parser.add_argument("--movimentos", type=int, default=300, help="Movimentações por turno")
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+    rnd = random.Random(7)
+    n_usuarios, n_ferramentas = 200, 5000
+
+    with tempfile.TemporaryDirectory() as pasta:
+        config.DATABASE_CAMINHO = os.path.join(pasta, "quiosque.db")
+        config.BACKUP_DIR = os.path.join(pasta, "incremental")
+        completos = os.path.join(pasta, "completo")
+        os.makedirs(config.BACKUP_DIR)
+        os.makedirs(completos)
+        popular_banco(n_usuarios, n_ferramentas, args.logs)
+
+        tempo_completo = tempo_incremental = 0.0
+        inicio_semana = datetime.date.today() - datetime.timedelta(days=args.dias)
+        for dia in range(args.dias):
+            data = inicio_semana + datetime.timedelta(days=dia)
+            for turno in TURNOS:
+                _simular_turno(rnd, args.movimentos, n_usuarios, n_ferramentas, turno)
+                # Exportação do turno para o ERP (avança a marca d'água do destino)
+                exportar_incremental(os.path.join(pasta, "erp.csv"))
+
+                inicio = time.perf_counter()
+                copiar_banco_online(config.DATABASE_CAMINHO, os.path.join(completos, f"backup_{data}_{turno}.db"))
+                tempo_completo += time.perf_counter() - inicio
+
+                inicio = time.perf_counter()
+                with redirect_stdout(open(os.devnull, "w")):
+                    realizar_backup_incremental(turno, data)
+                tempo_incremental += time.perf_counter() - inicio
+        fechar_conexoes()
+
+        def tamanho(diretorio):
+            return sum(os.path.getsize(os.path.join(diretorio, f)) for f in os.listdir(diretorio))
+
+        arquivos = sorted(f for f in os.listdir(config.BACKUP_DIR) if f.startswith(("snapshot_", "delta_")))
+        n_turnos = args.dias * len(TURNOS)
+        disco_completo, disco_incremental = tamanho(completos), tamanho(config.BACKUP_DIR)
+        print(f"{n_turnos} turnos, {args.movimentos} movimentações por turno, ledger de {args.logs} logs")
+        print(f"{'':14}{'arquivos':>9}{'disco':>12}{'tempo/turno':>14}")
+        print(f"{'Completo':<14}{n_turnos:>9}{disco_completo / 1e6:>10.1f}MB"
+              f"{tempo_completo / n_turnos * 1000:>12.1f}ms")
+        print(f"{'Incremental':<14}{len(arquivos):>9}{disco_incremental / 1e6:>10.1f}MB"
+              f"{tempo_incremental / n_turnos * 1000:>12.1f}ms")
+        print(f"Disco: {disco_completo / disco_incremental:.1f}x menor | "
+              f"delta médio {sum(os.path.getsize(os.path.join(config.BACKUP_DIR, f)) for f in arquivos if f.startswith('delta_')) / max(1, len(arquivos) - 1) / 1024:.1f} KB")
+
+        restaurado = os.path.join(pasta, "restaurado.db")
+        inicio = time.perf_counter()
+        with redirect_stdout(open(os.devnull, "w")):
+            restaurar_backup(restaurado)
+        tempo_restauracao = time.perf_counter() - inicio
+        igual = _conteudo(restaurado) == _conteudo(config.DATABASE_CAMINHO)
+        print(f"Restauração do último turno: {tempo_restauracao:.2f}s "
+              f"(snapshot + {len(arquivos) - 1} deltas) | idêntica ao banco em uso: {'sim' if igual else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
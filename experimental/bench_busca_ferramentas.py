@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+experimental/bench_busca_ferramentas.py
+
+Mede a busca de ferramentas enquanto o operador digita, num cadastro com
+--itens ferramentas (a "Consulta Produtos IP.xlsx" replicada com códigos
+novos e importada com o texto do catálogo): cada prefixo de algumas
+buscas típicas ("pa", "pas", ..., "pastilha tnga 16") é consultado no
+índice FTS5 e com LIKE (o caminho sem FTS5), com as mesmas 15 linhas de
+limite da tela. Mede também a criação do índice sobre o cadastro.
+
+Uso: python -m experimental.bench_busca_ferramentas [--itens N]
+"""
+import os
+import time
+import logging
+import argparse
+import tempfile
+import warnings
+import statistics
+from contextlib import redirect_stdout
+
+import pandas as pd
+
+import database.config as config
+from database.busca_ferramentas import _buscar_fts, _buscar_like, reconstruir_indice_busca, termos_busca
+from database.conexao import fechar_conexoes, obter_conexao
+from database.database import criar_tabelas
+from database.data_setup import importar_ferramentas
+
+PLANILHA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Consulta Produtos IP.xlsx")
+
+BUSCAS = ["pastilha tnga 16", "alargador 22", "inserto fresamento", "ip0123", "disco flap gr60", "100123"]
+
+
+def _cadastro(itens: int) -> pd.DataFrame:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        base = pd.read_excel(PLANILHA)
+    df = pd.concat([base] * (itens // len(base) + 1), ignore_index=True).head(itens)
+    df["Ref. Sistema"] = [f"IP{i:06d}" for i in range(itens)]
+    df["Código"] = range(100_000, 100_000 + itens)
+    return df
+
+
+def _medir(buscar, conn, textos, limite=15):
+    tempos = []
+    for texto in textos:
+        termos = termos_busca(texto)
+        inicio = time.perf_counter()
+        buscar(conn, termos, limite)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), max(tempos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Busca de ferramentas: FTS5 x LIKE")
+    parser.add_argument("--itens", type=int, default=50_000)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        config.DATABASE_CAMINHO = os.path.join(pasta, "busca.db")
+        with redirect_stdout(open(os.devnull, "w")):
+            criar_tabelas()
+        importar_ferramentas(_cadastro(args.itens))
+        conn = obter_conexao()
+        inicio = time.perf_counter()
+        indexadas = reconstruir_indice_busca()
+        criacao = time.perf_counter() - inicio
+
+        # Cada busca digitada letra a letra, a partir de 2 caracteres
+        prefixos = [busca[:n] for busca in BUSCAS for n in range(2, len(busca) + 1) if busca[n - 1] != " "]
+        print(f"{indexadas} ferramentas indexadas em {criacao:.2f}s; {len(prefixos)} consultas (prefixos digitados)")
+        print(f"{'':10}{'mediana':>12}{'pior':>12}")
+        for nome, buscar in (("FTS5", _buscar_fts), ("LIKE", _buscar_like)):
+            _medir(buscar, conn, prefixos[:3])
+            mediana, pior = _medir(buscar, conn, prefixos)
+            print(f"{nome:<10}{mediana:>10.2f}ms{pior:>10.2f}ms")
+        for busca in BUSCAS:
+            primeira = _buscar_fts(conn, termos_busca(busca), 1)
+            print(f"  {busca!r:<22} -> {primeira[0][2] + ' ' + primeira[0][1] if primeira else '-'}")
+        fechar_conexoes()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+experimental/bench_catalogo_backups.py
+
+Compara, num diretório com muitos backups, a busca do último backup e a
+seleção dos vencidos feitas antes (os.listdir + getmtime / strptime em
+cada nome) com as consultas ao catálogo de backups.
+
+Uso: python -m experimental.bench_catalogo_backups [--dias N]
+"""
+import os
+import time
+import sqlite3
+import argparse
+import datetime
+import tempfile
+from contextlib import closing
+
+import database.config as config
+from database import catalogo_backups as catalogo
+from database.turnos import TURNOS
+
+
+def _ultimo_por_varredura():
+    backups = sorted(
+        [f for f in os.listdir(config.BACKUP_DIR) if f.startswith("backup_") and f.endswith(".db")],
+        key=lambda f: os.path.getmtime(os.path.join(config.BACKUP_DIR, f)),
+        reverse=True
+    )
+    return backups[0]
+
+
+def _vencidos_por_varredura(hoje):
+    vencidos = []
+    for filename in os.listdir(config.BACKUP_DIR):
+        if not filename.endswith(".db"):
+            continue
+        partes = filename.replace("backup_", "").replace(".db", "").split("_")
+        try:
+            data = datetime.datetime.strptime(partes[0], "%Y-%m-%d").date()
+        except ValueError:
+            continue
+        if (hoje - data).days > 90:
+            vencidos.append(filename)
+    return vencidos
+
+
+def _medir(funcao, *args, repeticoes=20):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao(*args)
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Varredura do diretório x catálogo de backups")
+    parser.add_argument("--dias", type=int, default=365, help="Dias de backups (3 por dia) no diretório")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        config.BACKUP_DIR = pasta
+        hoje = datetime.date.today()
+        for dia in range(args.dias):
+            data = hoje - datetime.timedelta(days=args.dias - dia)
+            for turno in TURNOS:
+                caminho = os.path.join(pasta, f"backup_{data}_{turno}.db")
+                with closing(sqlite3.connect(caminho)) as conn:
+                    conn.execute("CREATE TABLE t (x)")
+                momento = datetime.datetime.combine(data, TURNOS[turno]).timestamp()
+                os.utime(caminho, (momento, momento))
+        n = args.dias * len(TURNOS)
+
+        inicio = time.perf_counter()
+        catalogo.sincronizar()
+        importacao = time.perf_counter() - inicio
+        limite = hoje - datetime.timedelta(days=90)
+        assert catalogo.ultimo(("completo",))["nome"] == _ultimo_por_varredura()
+        assert sorted(b["nome"] for b in catalogo.vencidos(limite)) == sorted(_vencidos_por_varredura(hoje))
+
+        print(f"{n} backups no diretório (importação única para o catálogo: {importacao:.2f}s)")
+        print(f"{'':24}{'varredura':>12}{'catálogo':>12}")
+        print(f"{'Último backup':<24}{_medir(_ultimo_por_varredura):>10.2f}ms"
+              f"{_medir(catalogo.ultimo, ('completo',)):>10.2f}ms")
+        print(f"{'Backups vencidos':<24}{_medir(_vencidos_por_varredura, hoje):>10.2f}ms"
+              f"{_medir(catalogo.vencidos, limite):>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+experimental/bench_catalogo_ip.py
+
+Compara a consulta de produtos por Ref. Sistema feita antes (pd.read_excel
+da planilha inteira a cada consulta) com o catálogo de
+utils/consulta_planilha: primeira consulta (lê a planilha e persiste a
+tabela), consultas seguintes (dicionário em memória) e primeira consulta
+num novo início do sistema (carrega a tabela persistida).
+
+Uso: python -m experimental.bench_catalogo_ip [--linhas N N ...] [--consultas N]
+"""
+import os
+import time
+import random
+import logging
+import argparse
+import tempfile
+import warnings
+
+import pandas as pd
+
+from utils.consulta_planilha import CatalogoIP
+
+PLANILHA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Consulta Produtos IP.xlsx")
+
+
+def _buscar_lendo_planilha(caminho: str, ref_sistema: str):
+    """A consulta antiga: a planilha inteira lida a cada chamada."""
+    df = pd.read_excel(caminho)
+    resultado = df[df["Ref. Sistema"] == ref_sistema.upper()]
+    return None if resultado.empty else resultado.iloc[0].get("Descrição", "")
+
+
+def _medir(n_linhas: int, n_consultas: int, base: pd.DataFrame, pasta: str) -> dict:
+    planilha = os.path.join(pasta, f"produtos_{n_linhas}.xlsx")
+    persistido = os.path.join(pasta, f"catalogo_{n_linhas}.db")
+    df = pd.concat([base] * (n_linhas // len(base) + 1), ignore_index=True).head(n_linhas)
+    df["Ref. Sistema"] = [f"IP{i:06d}" for i in range(n_linhas)]
+    df.to_excel(planilha, index=False)
+    refs = [f"ip{random.randrange(n_linhas):06d}" for _ in range(n_consultas)]
+
+    inicio = time.perf_counter()
+    antigas = [_buscar_lendo_planilha(planilha, ref) for ref in refs[:3]]
+    antiga = (time.perf_counter() - inicio) / 3
+
+    catalogo = CatalogoIP(planilha, persistir=True, caminho_persistido=persistido)
+    inicio = time.perf_counter()
+    assert catalogo.buscar(refs[0])["descricao"] == antigas[0]
+    primeira = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for ref in refs:
+        catalogo.buscar(ref)
+    seguintes = (time.perf_counter() - inicio) / n_consultas
+
+    novo_inicio = CatalogoIP(planilha, persistir=True, caminho_persistido=persistido)
+    inicio = time.perf_counter()
+    assert novo_inicio.buscar(refs[1])["descricao"] == antigas[1]
+    reinicio = time.perf_counter() - inicio
+    assert novo_inicio.leituras_planilha == 0
+    return {"linhas": n_linhas, "antiga": antiga, "primeira": primeira, "seguintes": seguintes, "reinicio": reinicio}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="read_excel por consulta x catálogo em memória")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[1096, 20_000])
+    parser.add_argument("--consultas", type=int, default=10_000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    warnings.simplefilter("ignore")
+    base = pd.read_excel(PLANILHA)
+
+    print(f"{'linhas':>8}{'read_excel/consulta':>21}{'1ª consulta':>13}{'seguintes':>12}{'novo início':>13}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for n_linhas in args.linhas:
+            r = _medir(n_linhas, args.consultas, base, pasta)
+            print(f"{r['linhas']:>8}{r['antiga'] * 1000:>19.0f}ms{r['primeira'] * 1000:>11.0f}ms"
+                  f"{r['seguintes'] * 1e6:>10.1f}µs{r['reinicio'] * 1000:>11.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
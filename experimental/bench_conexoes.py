@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+experimental/bench_conexoes.py
+
+Compara a latência por query de executar_query abrindo uma conexão nova a
+cada comando (comportamento antigo) com o gerenciador de conexões persistentes.
+
+Uso: python -m experimental.bench_conexoes [--queries N] [--ferramentas N]
+"""
+import os
+import time
+import sqlite3
+import argparse
+import tempfile
+import statistics
+
+import database.config as config
+from database.conexao import fechar_conexoes
+from database.database_utils import executar_query
+
+
+def _preparar_banco(caminho: str, n_ferramentas: int) -> None:
+    with sqlite3.connect(caminho) as conn:
+        conn.execute(
+            "CREATE TABLE ferramentas (id INTEGER PRIMARY KEY AUTOINCREMENT, nome TEXT NOT NULL, "
+            "codigo_barra TEXT UNIQUE NOT NULL, estoque_almoxarifado INTEGER NOT NULL, "
+            "consumivel TEXT NOT NULL DEFAULT 'NÃO')"
+        )
+        conn.executemany(
+            "INSERT INTO ferramentas (nome, codigo_barra, estoque_almoxarifado) VALUES (?, ?, ?)",
+            ((f"Ferramenta {i}", f"COD{i:06d}", 10) for i in range(n_ferramentas))
+        )
+
+
+def _query_antiga(caminho: str, codigo: str):
+    """Reproduz o executar_query original: uma conexão por comando."""
+    with sqlite3.connect(caminho) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id, nome, estoque_almoxarifado, consumivel FROM ferramentas WHERE codigo_barra = ?",
+            (codigo,)
+        )
+        return cursor.fetchall()
+
+
+def _query_nova(codigo: str):
+    return executar_query(
+        "SELECT id, nome, estoque_almoxarifado, consumivel FROM ferramentas WHERE codigo_barra = ?",
+        (codigo,),
+        fetch=True
+    )
+
+
+def _medir(funcao, codigos):
+    tempos = []
+    for codigo in codigos:
+        inicio = time.perf_counter()
+        funcao(codigo)
+        tempos.append((time.perf_counter() - inicio) * 1e6)
+    return tempos
+
+
+def _resumo(nome, tempos):
+    tempos = sorted(tempos)
+    p95 = tempos[int(len(tempos) * 0.95) - 1]
+    print(f"{nome:<28} média {statistics.mean(tempos):8.1f} µs | "
+          f"mediana {statistics.median(tempos):8.1f} µs | p95 {p95:8.1f} µs")
+    return statistics.mean(tempos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de conexões SQLite")
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--ferramentas", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "bench.db")
+        _preparar_banco(caminho, args.ferramentas)
+        config.DATABASE_CAMINHO = caminho
+        codigos = [f"COD{(i * 7919) % args.ferramentas:06d}" for i in range(args.queries)]
+
+        print(f"📊 {args.queries} buscas por código em {args.ferramentas} ferramentas")
+        antes = _resumo("Conexão por query (antigo)", _medir(lambda c: _query_antiga(caminho, c), codigos))
+        depois = _resumo("Conexão persistente (novo)", _medir(_query_nova, codigos))
+        print(f"⚡ Ganho: {antes / depois:.1f}x por query")
+        fechar_conexoes()
+
+
+if __name__ == "__main__":
+    main()
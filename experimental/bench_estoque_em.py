@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+experimental/bench_estoque_em.py
+
+Compara, para ledgers de tamanhos crescentes, a consulta "como estava o
+estoque em T" feita varrendo o ledger (saldos somados desde o primeiro log
+e estoque de almoxarifado desfeito a partir do atual) com estoque_em /
+saldos_em, que partem do checkpoint mais próximo. Confere que as duas
+respostas são iguais em cada momento sorteado.
+
+Uso: python -m experimental.bench_estoque_em [--logs N N ...] [--consultas N]
+"""
+import os
+import time
+import random
+import logging
+import sqlite3
+import argparse
+import datetime
+import tempfile
+from contextlib import closing, redirect_stdout
+
+import database.config as config
+from database.checkpoints_estoque import (
+    DELTA_ALMOXARIFADO, criar_checkpoints, data_hora_utc, estoque_em, saldos_em
+)
+from database.conexao import fechar_conexoes
+from database.saldos import DELTA_SALDO
+from experimental.bench_movimentacoes import popular_banco
+
+
+def _por_varredura(conn: sqlite3.Connection, momento: datetime.datetime):
+    limite = data_hora_utc(momento)
+    saldos = {
+        (u, f): s for u, f, s in conn.execute(
+            f"SELECT usuario_id, ferramenta_id, SUM({DELTA_SALDO}) AS s FROM logs "
+            f"WHERE data_hora <= ? GROUP BY usuario_id, ferramenta_id HAVING s <> 0",
+            (limite,)
+        )
+    }
+    estoque = dict(conn.execute("SELECT id, estoque_almoxarifado FROM ferramentas"))
+    for fid, delta in conn.execute(
+        f"SELECT ferramenta_id, SUM({DELTA_ALMOXARIFADO}) FROM logs WHERE data_hora > ? GROUP BY ferramenta_id",
+        (limite,)
+    ):
+        estoque[fid] -= delta
+    return estoque, saldos
+
+
+def _por_checkpoints(momento: datetime.datetime):
+    estoque = {fid: almoxarifado for fid, _, _, almoxarifado, _ in estoque_em(momento)}
+    saldos = {(uid, fid): saldo for uid, _, fid, _, _, saldo in saldos_em(momento)}
+    return estoque, saldos
+
+
+def _medir(n_logs: int, n_consultas: int, pasta: str) -> dict:
+    config.DATABASE_CAMINHO = os.path.join(pasta, f"ledger_{n_logs}.db")
+    with redirect_stdout(open(os.devnull, "w")):
+        popular_banco(200, 5000, n_logs)
+    inicio = time.perf_counter()
+    criados = criar_checkpoints()
+    criacao = time.perf_counter() - inicio
+
+    rnd = random.Random(11)
+    with closing(sqlite3.connect(config.DATABASE_CAMINHO)) as conn:
+        ultimo = conn.execute("SELECT MAX(id) FROM logs").fetchone()[0]
+        momentos = []
+        for _ in range(n_consultas):
+            data_hora = conn.execute("SELECT data_hora FROM logs WHERE id = ?", (rnd.randint(1, ultimo),)).fetchone()[0]
+            utc = datetime.datetime.fromisoformat(data_hora).replace(tzinfo=datetime.timezone.utc)
+            momentos.append(utc.astimezone().replace(tzinfo=None))
+
+        tempo_varredura = tempo_checkpoints = 0.0
+        for momento in momentos:
+            inicio = time.perf_counter()
+            esperado = _por_varredura(conn, momento)
+            tempo_varredura += time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            obtido = _por_checkpoints(momento)
+            tempo_checkpoints += time.perf_counter() - inicio
+            assert obtido == esperado, f"divergência em {momento}"
+    fechar_conexoes()
+    return {
+        "logs": ultimo,
+        "checkpoints": criados,
+        "criacao_s": criacao,
+        "varredura_ms": tempo_varredura / n_consultas * 1000,
+        "checkpoints_ms": tempo_checkpoints / n_consultas * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Estoque em T: varredura do ledger x checkpoints")
+    parser.add_argument("--logs", type=int, nargs="+", default=[100_000, 300_000, 1_000_000],
+                        help="Retiradas geradas por ledger (cada uma com ~90%% de chance de devolução)")
+    parser.add_argument("--consultas", type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        print(f"Intervalo entre checkpoints: {config.CHECKPOINT_INTERVALO_LOGS} logs; "
+              f"{args.consultas} momentos sorteados por ledger (respostas conferidas)")
+        print(f"{'logs':>10}{'checkpoints':>13}{'criação':>10}{'varredura':>12}{'checkpoints':>13}")
+        for n_logs in args.logs:
+            r = _medir(n_logs, args.consultas, pasta)
+            print(f"{r['logs']:>10}{r['checkpoints']:>13}{r['criacao_s']:>9.2f}s"
+                  f"{r['varredura_ms']:>10.1f}ms{r['checkpoints_ms']:>11.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+experimental/bench_exportacao.py
+
+Compara a exportação antiga de uma tabela (pd.read_sql_query + to_excel,
+com a tabela inteira na memória) com a exportação em fluxo de
+utils/exportador.py, em .xlsx (openpyxl write_only) e em .csv, sobre um
+ledger de milhões de linhas. Cada exportação roda num processo separado
+para medir o pico de memória (RSS) só dela.
+
+O método antigo só é medido num recorte de --comparacao linhas: acima de
+1.048.576 linhas, to_excel recusa a planilha. As exportações em fluxo
+também gravam o ledger inteiro (no .xlsx, dividido em abas).
+
+Uso: python -m experimental.bench_exportacao [--logs N] [--comparacao N]
+"""
+import os
+import sys
+import time
+import logging
+import sqlite3
+import argparse
+import tempfile
+import multiprocessing
+from contextlib import closing, redirect_stdout
+
+import database.config as config
+from database.conexao import fechar_conexoes
+from experimental.bench_movimentacoes import popular_banco
+
+try:
+    import resource
+except ImportError:  # Windows: sem getrusage
+    resource = None
+
+
+def _pico_rss_mb() -> float:
+    if resource is None:
+        return float("nan")
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KB no Linux, bytes no macOS
+    return pico / 1024 / 1024 if sys.platform == "darwin" else pico / 1024
+
+
+def _exportar(metodo: str, banco: str, destino: str, limite, fila) -> None:
+    config.DATABASE_CAMINHO = banco
+    import pandas as pd
+    from utils.exportador import exportar_consulta
+    sql = "SELECT * FROM logs ORDER BY rowid" + (f" LIMIT {limite}" if limite else "")
+    base = _pico_rss_mb()
+    inicio = time.perf_counter()
+    if metodo == "pandas":
+        with closing(sqlite3.connect(banco)) as conn:
+            df = pd.read_sql_query(sql, conn)
+        df.to_excel(destino, index=False, engine="openpyxl")
+        linhas = len(df)
+    elif metodo == "nada":
+        linhas = 0
+    else:
+        chamadas = []
+        linhas = exportar_consulta(sql, destino, nome_planilha="logs",
+                                   progresso=lambda feitas, total: chamadas.append(feitas))
+        assert chamadas and chamadas[-1] == linhas
+    fila.put((linhas, time.perf_counter() - inicio, base, _pico_rss_mb()))
+
+
+def _medir(metodo: str, banco: str, destino: str, limite=None) -> dict:
+    fila = multiprocessing.Queue()
+    processo = multiprocessing.Process(target=_exportar, args=(metodo, banco, destino, limite, fila))
+    processo.start()
+    linhas, segundos, base, pico = fila.get()
+    processo.join()
+    tamanho = os.path.getsize(destino) / 1e6 if os.path.exists(destino) else 0.0
+    return {"linhas": linhas, "segundos": segundos, "base": base, "pico": pico, "mb": tamanho}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Exportação com DataFrame x em fluxo")
+    parser.add_argument("--logs", type=int, default=1_100_000,
+                        help="Retiradas geradas (cada uma com ~90%% de chance de devolução)")
+    parser.add_argument("--comparacao", type=int, default=500_000,
+                        help="Linhas do recorte exportado pelos três métodos")
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        banco = config.DATABASE_CAMINHO = os.path.join(pasta, "ledger.db")
+        with redirect_stdout(open(os.devnull, "w")):
+            popular_banco(200, 5000, args.logs)
+        fechar_conexoes()
+        with closing(sqlite3.connect(banco)) as conn:
+            total = conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+
+        vazio = _medir("nada", banco, os.path.join(pasta, "nada"))
+        print(f"Ledger de {total} linhas; processo sem exportar: {vazio['pico']:.0f} MB de RSS")
+        print(f"{'':30}{'linhas':>10}{'tempo':>10}{'pico RSS':>11}{'arquivo':>10}")
+        casos = [
+            ("DataFrame + to_excel", "pandas", "antigo.xlsx", args.comparacao),
+            ("Fluxo .xlsx", "xlsx", "recorte.xlsx", args.comparacao),
+            ("Fluxo .csv", "csv", "recorte.csv", args.comparacao),
+            ("Fluxo .xlsx (ledger inteiro)", "xlsx", "inteiro.xlsx", None),
+            ("Fluxo .csv (ledger inteiro)", "csv", "inteiro.csv", None),
+        ]
+        for descricao, metodo, arquivo, limite in casos:
+            r = _medir(metodo, banco, os.path.join(pasta, arquivo), limite)
+            print(f"{descricao:<30}{r['linhas']:>10}{r['segundos']:>9.1f}s"
+                  f"{r['pico']:>8.0f} MB{r['mb']:>7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+experimental/bench_exportacao_incremental.py
+
+Compara, para ledgers de tamanhos crescentes, a exportação diária para o
+ERP feita como antes (o ledger inteiro, com os nomes, regravado a cada
+dia) com exportar_incremental, que grava só os logs posteriores à marca
+d'água do destino. O "dia" são os últimos --dia logs do ledger.
+
+Uso: python -m experimental.bench_exportacao_incremental [--logs N N ...] [--dia N]
+"""
+import os
+import time
+import logging
+import sqlite3
+import argparse
+import tempfile
+from contextlib import closing, redirect_stdout
+
+import database.config as config
+from database.conexao import fechar_conexoes
+from experimental.bench_movimentacoes import popular_banco
+from utils.exportador import SELECT_LOGS_DETALHADOS, definir_marca, exportar_consulta, exportar_incremental
+
+
+def _medir(n_logs: int, dia: int, pasta: str) -> dict:
+    config.DATABASE_CAMINHO = os.path.join(pasta, f"ledger_{n_logs}.db")
+    with redirect_stdout(open(os.devnull, "w")):
+        popular_banco(200, 5000, n_logs)
+    fechar_conexoes()
+    with closing(sqlite3.connect(config.DATABASE_CAMINHO)) as conn:
+        total = conn.execute("SELECT MAX(id) FROM logs").fetchone()[0]
+
+    inicio = time.perf_counter()
+    completa = exportar_consulta(SELECT_LOGS_DETALHADOS, os.path.join(pasta, "completa.csv"),
+                                 parametros=(0, total))
+    tempo_completa = time.perf_counter() - inicio
+
+    destino = os.path.join(pasta, f"erp_{n_logs}.csv")
+    definir_marca(destino, total - dia)  # Exportação de ontem já feita
+    inicio = time.perf_counter()
+    incremental, _ = exportar_incremental(destino)
+    tempo_incremental = time.perf_counter() - inicio
+    assert completa == total and incremental == dia
+    return {"logs": total, "completa": tempo_completa, "incremental": tempo_incremental}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Exportação do ledger inteiro x incremental")
+    parser.add_argument("--logs", type=int, nargs="+", default=[100_000, 300_000, 1_000_000],
+                        help="Retiradas geradas em cada ledger (cada uma com ~90%% de chance de devolução)")
+    parser.add_argument("--dia", type=int, default=3000, help="Logs novos desde a última exportação")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    print(f"Exportação diária de {args.dia} logs novos para um .csv")
+    print(f"{'logs':>10}{'ledger inteiro':>16}{'incremental':>14}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for n_logs in args.logs:
+            r = _medir(n_logs, args.dia, pasta)
+            print(f"{r['logs']:>10}{r['completa']:>15.2f}s{r['incremental'] * 1000:>12.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+experimental/bench_importacao_planilha.py
+
+Compara, numa planilha de ferramentas com --linhas linhas (a "Consulta
+Produtos IP.xlsx" replicada com códigos novos), a carga feita antes (uma
+chamada a executar_query por linha, cada uma com o seu commit) com
+importar_ferramentas (validação vetorizada e executemany numa transação).
+Mede também a reimportação sem mudanças e com 10% das descrições alteradas.
+A leitura do .xlsx fica fora das medidas.
+
+Uso: python -m experimental.bench_importacao_planilha [--linhas N]
+"""
+import os
+import time
+import logging
+import argparse
+import tempfile
+import warnings
+
+import pandas as pd
+
+import database.config as config
+from database.conexao import fechar_conexoes
+from database.database import criar_tabelas
+from database.database_utils import executar_query
+from database.data_setup import importar_ferramentas
+
+PLANILHA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Consulta Produtos IP.xlsx")
+
+
+def _planilha(linhas: int) -> pd.DataFrame:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        base = pd.read_excel(PLANILHA)
+    df = pd.concat([base] * (linhas // len(base) + 1), ignore_index=True).head(linhas)
+    df["Ref. Sistema"] = [f"IP{i:06d}" for i in range(linhas)]
+    return df
+
+
+def _importar_linha_a_linha(df: pd.DataFrame) -> None:
+    """A carga antiga: INSERT OR IGNORE e commit para cada linha."""
+    for linha in df.to_dict("records"):
+        ref_sistema = str(linha.get("Ref. Sistema", "")).strip()
+        descricao = str(linha.get("Descrição", "")).strip()
+        consumivel_flag = "SIM" if str(linha.get("Consumível", "")).strip().upper().startswith("S") else "NÃO"
+        if not (ref_sistema and descricao):
+            continue
+        executar_query(
+            "INSERT OR IGNORE INTO ferramentas (nome, codigo_barra, estoque_almoxarifado, consumivel) "
+            "VALUES (?, ?, ?, ?)",
+            (descricao, ref_sistema, 0, consumivel_flag)
+        )
+
+
+def _novo_banco(pasta: str, nome: str) -> None:
+    fechar_conexoes()
+    config.DATABASE_CAMINHO = os.path.join(pasta, nome)
+    criar_tabelas()
+
+
+def _medir(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return time.perf_counter() - inicio, resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Importação linha a linha x em lote")
+    parser.add_argument("--linhas", type=int, default=20_000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    df = _planilha(args.linhas)
+    alterada = df.copy()
+    alterada.loc[alterada.sample(frac=0.1, random_state=1).index, "Descrição"] += " (REV)"
+
+    with tempfile.TemporaryDirectory() as pasta:
+        _novo_banco(pasta, "antigo.db")
+        antigo, _ = _medir(_importar_linha_a_linha, df)
+        _novo_banco(pasta, "novo.db")
+        carga, r_carga = _medir(importar_ferramentas, df)
+        repetida, r_repetida = _medir(importar_ferramentas, df)
+        mudancas, r_mudancas = _medir(importar_ferramentas, alterada)
+        fechar_conexoes()
+
+    print(f"Planilha com {args.linhas} linhas")
+    print(f"{'Carga linha a linha (antiga)':<42}{antigo:>8.2f}s")
+    print(f"{'Carga em lote':<42}{carga:>8.2f}s  {r_carga}")
+    print(f"{'Reimportação sem mudanças':<42}{repetida:>8.2f}s  {r_repetida}")
+    print(f"{'Reimportação com 10% alteradas':<42}{mudancas:>8.2f}s  {r_mudancas}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+experimental/bench_inicializacao_gui.py
+
+Mede o tempo do lançamento do processo até a janela de login visível,
+com todas as telas importadas e criadas antes de mostrar a janela (o
+comportamento antigo de Navegacao e de main.py) e com as telas criadas
+sob demanda. No modo sob demanda, mede também quanto o pré-aquecimento
+em segundo plano leva para preparar as demais telas e o maior travamento
+da interface enquanto isso (um QTimer de 5 ms marca o "batimento").
+
+Cada medida roda num processo novo (os imports são parte do custo).
+
+Uso: python -m experimental.bench_inicializacao_gui [--repeticoes N]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from contextlib import redirect_stdout
+
+MARCADOR = "@@"
+
+
+def _filho(modo: str) -> None:
+    """Roda no processo medido: prepara a janela como main.py e informa os tempos."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    import logging
+    logging.disable(logging.WARNING)
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+    import main  # noqa: F401 (os imports do ponto de entrada fazem parte da medida)
+    import database.config as config
+    from interface.navegacao import Navegacao, TELAS, _classe
+    from interface.trabalhador_banco import parar_trabalhador
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    with redirect_stdout(open(os.devnull, "w")):
+        if modo == "antigo":
+            # main.py importava data_setup e Navegacao importava e criava todas as telas
+            import database.data_setup  # noqa: F401
+            for nome in TELAS:
+                _classe(nome)
+            janela = Navegacao(pre_aquecer=False)
+            for nome in janela.fabricas:
+                janela.tela(nome)
+        else:
+            janela = Navegacao(pre_aquecer=True)
+    janela.show()
+    app.processEvents()
+    print(f"{MARCADOR}visivel", flush=True)
+    if modo == "antigo":
+        parar_trabalhador()
+        return
+
+    inicio = time.perf_counter()
+    batimentos = [inicio]
+    batimento = QTimer()
+    batimento.timeout.connect(lambda: batimentos.append(time.perf_counter()))
+    batimento.start(5)
+
+    def conferir():
+        if all(nome in janela.telas for nome in janela.fabricas):
+            pronto = time.perf_counter()
+            # Travamentos só a partir do início do pré-aquecimento
+            gatilho = inicio + config.PRE_AQUECER_ESPERA_MS / 1000
+            intervalos = [b - a for a, b in zip(batimentos, batimentos[1:]) if b > gatilho]
+            # stdout do loop de eventos vai para /dev/null (mensagens de troca de tela)
+            print(f"{MARCADOR}aquecido {pronto - gatilho:.3f} {max(intervalos, default=0) * 1000:.1f}",
+                  file=sys.__stdout__, flush=True)
+            app.quit()
+
+    verificacao = QTimer()
+    verificacao.timeout.connect(conferir)
+    verificacao.start(20)
+    with redirect_stdout(open(os.devnull, "w")):
+        app.exec_()
+    parar_trabalhador()
+
+
+def _medir(modo: str, ambiente: dict) -> dict:
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "experimental.bench_inicializacao_gui", "--filho", modo],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, env=ambiente
+    )
+    resultado = {}
+    for linha in processo.stdout:
+        if not linha.startswith(MARCADOR):
+            continue
+        campos = linha[len(MARCADOR):].split()
+        if campos[0] == "visivel":
+            resultado["visivel"] = time.perf_counter() - inicio
+        else:
+            resultado["aquecido"], resultado["travamento_ms"] = float(campos[1]), float(campos[2])
+    processo.wait()
+    return resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lançamento até o login: telas criadas antes x sob demanda")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--filho", choices=("antigo", "sob_demanda"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.filho:
+        _filho(args.filho)
+        return
+
+    with tempfile.TemporaryDirectory() as pasta:
+        raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ambiente = dict(os.environ, APPDATA=pasta, QT_QPA_PLATFORM="offscreen",
+                        PYTHONPATH=os.pathsep.join(filter(None, [raiz, os.environ.get("PYTHONPATH")])))
+        # Banco já migrado, como num quiosque em uso
+        subprocess.run([sys.executable, "-m", "database.migracoes"], env=ambiente, cwd=raiz,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+        medidas = {modo: [_medir(modo, ambiente) for _ in range(args.repeticoes)]
+                   for modo in ("antigo", "sob_demanda")}
+
+    print(f"Lançamento até o login visível (mediana de {args.repeticoes} processos):")
+    for modo, descricao in (("antigo", "Todas as telas antes"), ("sob_demanda", "Telas sob demanda")):
+        print(f"  {descricao:<24}{statistics.median(m['visivel'] for m in medidas[modo]) * 1000:>8.0f} ms")
+    aquecidos = medidas["sob_demanda"]
+    print(f"Pré-aquecimento das demais telas: {statistics.median(m['aquecido'] for m in aquecidos) * 1000:.0f} ms; "
+          f"maior travamento da interface: {statistics.median(m['travamento_ms'] for m in aquecidos):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
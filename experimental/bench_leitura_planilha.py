@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+experimental/bench_leitura_planilha.py
+
+Compara, numa planilha com --linhas linhas (a "Consulta Produtos IP.xlsx"
+replicada com códigos novos), a leitura inteira com pd.read_excel com a
+leitura em lotes de database/leitura_planilha.py, nos dois consumidores:
+a importação de ferramentas e o catálogo IP. Cada caso roda num processo
+separado para medir o pico de memória (RSS) só dele.
+
+Uso: python -m experimental.bench_leitura_planilha [--linhas N]
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import warnings
+import multiprocessing
+from contextlib import redirect_stdout
+
+from openpyxl import Workbook
+
+import database.config as config
+from database.leitura_planilha import ler_planilha_em_lotes
+
+try:
+    import resource
+except ImportError:  # Windows: sem getrusage
+    resource = None
+
+PLANILHA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Consulta Produtos IP.xlsx")
+
+
+def _pico_rss_mb() -> float:
+    if resource is None:
+        return float("nan")
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KB no Linux, bytes no macOS
+    return pico / 1024 / 1024 if sys.platform == "darwin" else pico / 1024
+
+
+def _gerar_planilha(destino: str, linhas: int) -> None:
+    base = next(ler_planilha_em_lotes(PLANILHA, lote=10**9))
+    coluna_ref = base.columns.get_loc("Ref. Sistema")
+    registros = base.astype(object).where(base.notna(), None).values.tolist()
+    pasta = Workbook(write_only=True)
+    planilha = pasta.create_sheet("Planilha1")
+    planilha.append(list(base.columns))
+    for i in range(linhas):
+        registro = list(registros[i % len(registros)])
+        registro[coluna_ref] = f"IP{i:06d}"
+        planilha.append(registro)
+    pasta.save(destino)
+
+
+def _executar(caso: str, planilha: str, pasta: str, fila) -> None:
+    logging.disable(logging.ERROR)
+    warnings.simplefilter("ignore")
+    config.DATABASE_CAMINHO = os.path.join(pasta, f"{caso}.db")
+    import pandas as pd
+    from database.database import criar_tabelas
+    from database.data_setup import import_tools_from_excel, importar_ferramentas
+    from utils.consulta_planilha import CatalogoIP, catalogo_de_planilha
+    with redirect_stdout(open(os.devnull, "w")):
+        criar_tabelas()
+
+    base = _pico_rss_mb()
+    inicio = time.perf_counter()
+    if caso == "nada":
+        linhas = 0
+    elif caso == "pandas_importacao":
+        linhas = importar_ferramentas(pd.read_excel(planilha))["inseridas"]
+    elif caso == "fluxo_importacao":
+        linhas = import_tools_from_excel(planilha)["inseridas"]
+    elif caso == "pandas_catalogo":
+        linhas = len(catalogo_de_planilha(pd.read_excel(planilha)))
+    else:
+        linhas = len(CatalogoIP(planilha, persistir=False))
+    fila.put((linhas, time.perf_counter() - inicio, base, _pico_rss_mb()))
+
+
+def _medir(caso: str, planilha: str, pasta: str) -> dict:
+    fila = multiprocessing.Queue()
+    processo = multiprocessing.Process(target=_executar, args=(caso, planilha, pasta, fila))
+    processo.start()
+    linhas, segundos, base, pico = fila.get()
+    processo.join()
+    return {"linhas": linhas, "segundos": segundos, "base": base, "pico": pico}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Leitura da planilha com pd.read_excel x em lotes")
+    parser.add_argument("--linhas", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        planilha = os.path.join(pasta, "produtos.xlsx")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            _gerar_planilha(planilha, args.linhas)
+
+        vazio = _medir("nada", planilha, pasta)
+        print(f"Planilha de {args.linhas} linhas ({os.path.getsize(planilha) / 1e6:.1f} MB); "
+              f"processo sem ler: {vazio['pico']:.0f} MB de RSS (lote: {config.PLANILHA_LOTE_LINHAS} linhas)")
+        print(f"{'':34}{'linhas':>10}{'tempo':>10}{'pico RSS':>11}")
+        casos = [
+            ("Importação: read_excel", "pandas_importacao"),
+            ("Importação: em lotes", "fluxo_importacao"),
+            ("Catálogo IP: read_excel", "pandas_catalogo"),
+            ("Catálogo IP: em lotes", "fluxo_catalogo"),
+        ]
+        for descricao, caso in casos:
+            r = _medir(caso, planilha, pasta)
+            print(f"{descricao:<34}{r['linhas']:>10}{r['segundos']:>9.1f}s{r['pico']:>8.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
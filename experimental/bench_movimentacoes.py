@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+experimental/bench_movimentacoes.py
+
+Mede movimentações por segundo contra um ledger grande.
+
+Compara o pipeline antigo (busca de usuário, busca de ferramenta, SUM do
+saldo, INSERT e UPDATE como comandos autocommit separados) com
+realizar_movimentacao, que roda tudo numa única transação. Também executa
+o pipeline novo em duas threads, simulando os dois quiosques do almoxarifado,
+e compara um carrinho de início de turno registrado item a item com o
+mesmo carrinho em modo lote (uma transação).
+
+Uso: python -m experimental.bench_movimentacoes [--logs N] [--movimentos N]
+"""
+import os
+import time
+import random
+import shutil
+import logging
+import sqlite3
+import argparse
+import tempfile
+import threading
+from contextlib import closing
+
+import database.config as config
+from database.conexao import fechar_conexoes
+from database.database import criar_tabelas
+from database.database_utils import executar_query, buscar_estoque_ativo_usuario
+from utils.movimentacoes import realizar_movimentacao, realizar_movimentacoes_em_lote
+
+
+def popular_banco(n_usuarios: int, n_ferramentas: int, n_logs: int, semente: int = 42) -> None:
+    """
+    Cria o esquema em config.DATABASE_CAMINHO e gera usuários, ferramentas e
+    um ledger sintético de retiradas/devoluções com saldos coerentes.
+    """
+    criar_tabelas()
+    rnd = random.Random(semente)
+    with closing(sqlite3.connect(config.DATABASE_CAMINHO)) as conn, conn:
+        conn.executemany(
+            "INSERT INTO usuarios (nome, senha, rfid, tipo) VALUES (?, ?, ?, ?)",
+            ((f"usuario{i}", "senha", f"RFID{i:06d}", "operador") for i in range(n_usuarios))
+        )
+        conn.executemany(
+            "INSERT INTO ferramentas (nome, codigo_barra, estoque_almoxarifado, consumivel) "
+            "VALUES (?, ?, ?, ?)",
+            ((f"Ferramenta {i}", f"COD{i:06d}", 1_000_000, "NÃO") for i in range(n_ferramentas))
+        )
+
+        def gerar():
+            for i in range(n_logs):
+                usuario = rnd.randrange(n_usuarios) + 1
+                ferramenta = rnd.randrange(n_ferramentas) + 1
+                segundos = i * 30
+                data_hora = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(1_600_000_000 + segundos))
+                yield (usuario, ferramenta, "RETIRADA", 1, data_hora)
+                if rnd.random() < 0.9:
+                    yield (usuario, ferramenta, "DEVOLUCAO", 1, data_hora)
+
+        conn.executemany(
+            "INSERT INTO logs (usuario_id, ferramenta_id, acao, quantidade, data_hora) "
+            "VALUES (?, ?, ?, ?, ?)",
+            gerar()
+        )
+
+
+def _movimentacao_antiga(rfid: str, codigo: str, acao: str, quantidade: int = 1) -> bool:
+    """Pipeline anterior: cada etapa é um comando autocommit separado."""
+    usuario = executar_query("SELECT id FROM usuarios WHERE rfid = ?", (rfid,), fetch=True)
+    ferramenta = executar_query(
+        "SELECT id, nome, estoque_almoxarifado, consumivel FROM ferramentas WHERE codigo_barra = ?",
+        (codigo,), fetch=True
+    )
+    uid, fid = usuario[0][0], ferramenta[0][0]
+    if acao == "DEVOLUCAO":
+        saldo = executar_query(
+            "SELECT COALESCE(SUM(CASE WHEN acao = 'RETIRADA' THEN quantidade "
+            "WHEN acao = 'DEVOLUCAO' THEN -quantidade ELSE 0 END), 0) "
+            "FROM logs WHERE usuario_id = ? AND ferramenta_id = ?",
+            (uid, fid), fetch_one=True
+        )
+        if quantidade > saldo[0]:
+            return False
+    executar_query(
+        "INSERT INTO logs (usuario_id, ferramenta_id, acao, quantidade) VALUES (?, ?, ?, ?)",
+        (uid, fid, acao, quantidade)
+    )
+    ajuste = "-" if acao == "RETIRADA" else "+"
+    executar_query(
+        f"UPDATE ferramentas SET estoque_almoxarifado = estoque_almoxarifado {ajuste} ? WHERE codigo_barra = ?",
+        (quantidade, codigo)
+    )
+    return True
+
+
+def _movimentacao_nova(rfid: str, codigo: str, acao: str, quantidade: int = 1) -> bool:
+    return realizar_movimentacao(rfid, codigo, acao, quantidade)["status"]
+
+
+def _estoque_ativo_pelo_ledger(rfid: str):
+    """Consulta anterior de buscar_estoque_ativo_usuario: SUM sobre o ledger do usuário."""
+    usuario = executar_query("SELECT id FROM usuarios WHERE rfid = ?", (rfid,), fetch_one=True)
+    return executar_query(
+        "SELECT l.ferramenta_id, f.nome, f.codigo_barra, "
+        "SUM(CASE WHEN l.acao = 'RETIRADA' THEN l.quantidade "
+        "WHEN l.acao = 'DEVOLUCAO' THEN -l.quantidade ELSE 0 END) AS saldo "
+        "FROM logs l JOIN ferramentas f ON l.ferramenta_id = f.id "
+        "WHERE l.usuario_id = ? GROUP BY l.ferramenta_id HAVING saldo > 0",
+        (usuario[0],), fetch=True
+    )
+
+
+def _latencia_ms(funcao, argumentos) -> float:
+    inicio = time.perf_counter()
+    for arg in argumentos:
+        funcao(arg)
+    return (time.perf_counter() - inicio) * 1000 / len(argumentos)
+
+
+def _roteiro(n_movimentos: int, n_usuarios: int, n_ferramentas: int, semente: int):
+    """Pares retirada/devolução do mesmo item, como no uso real do balcão."""
+    rnd = random.Random(semente)
+    for _ in range(n_movimentos // 2):
+        rfid = f"RFID{rnd.randrange(n_usuarios):06d}"
+        codigo = f"COD{rnd.randrange(n_ferramentas):06d}"
+        yield rfid, codigo, "RETIRADA"
+        yield rfid, codigo, "DEVOLUCAO"
+
+
+def _medir(funcao, roteiro) -> float:
+    passos = list(roteiro)
+    inicio = time.perf_counter()
+    for rfid, codigo, acao in passos:
+        funcao(rfid, codigo, acao)
+    return len(passos) / (time.perf_counter() - inicio)
+
+
+def _medir_em_threads(funcao, roteiros):
+    """Retorna (mov/s, falhas) rodando cada roteiro numa thread própria."""
+    listas = [list(r) for r in roteiros]
+    falhas = []
+
+    def executar(passos):
+        falhas.extend(p for p in passos if not funcao(*p))
+
+    threads = [threading.Thread(target=executar, args=(passos,)) for passos in listas]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(len(p) for p in listas) / (time.perf_counter() - inicio), len(falhas)
+
+
+def _medir_carrinhos(n_carrinhos: int, tamanho: int, n_usuarios: int, n_ferramentas: int,
+                     em_lote: bool) -> float:
+    """ms por item para retirar e devolver n_carrinhos carrinhos de `tamanho` itens."""
+    rnd = random.Random(7)
+    carrinhos = [
+        (f"RFID{rnd.randrange(n_usuarios):06d}",
+         [(f"COD{c:06d}", 1) for c in rnd.sample(range(n_ferramentas), tamanho)])
+        for _ in range(n_carrinhos)
+    ]
+    inicio = time.perf_counter()
+    for rfid, itens in carrinhos:
+        for acao in ("RETIRADA", "DEVOLUCAO"):
+            if em_lote:
+                realizar_movimentacoes_em_lote(rfid, itens, acao)
+            else:
+                for codigo, quantidade in itens:
+                    realizar_movimentacao(rfid, codigo, acao, quantidade)
+    return (time.perf_counter() - inicio) * 1000 / (n_carrinhos * tamanho * 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de movimentações")
+    parser.add_argument("--usuarios", type=int, default=200)
+    parser.add_argument("--ferramentas", type=int, default=5000)
+    parser.add_argument("--logs", type=int, default=500_000)
+    parser.add_argument("--movimentos", type=int, default=2000)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        modelo = os.path.join(pasta, "modelo.db")
+        config.DATABASE_CAMINHO = modelo
+        inicio = time.perf_counter()
+        popular_banco(args.usuarios, args.ferramentas, args.logs)
+        total_logs = executar_query("SELECT COUNT(*) FROM logs", fetch_one=True)[0]
+        fechar_conexoes()
+        print(f"📦 Ledger com {total_logs} linhas criado em {time.perf_counter() - inicio:.1f}s")
+
+        def banco_novo(nome):
+            # Cada cenário parte de uma cópia idêntica do ledger
+            config.DATABASE_CAMINHO = os.path.join(pasta, nome)
+            shutil.copy(modelo, config.DATABASE_CAMINHO)
+
+        n = args.movimentos
+        banco_novo("antigo.db")
+        antigo = _medir(_movimentacao_antiga, _roteiro(n, args.usuarios, args.ferramentas, 1))
+        banco_novo("novo.db")
+        novo = _medir(_movimentacao_nova, _roteiro(n, args.usuarios, args.ferramentas, 1))
+        banco_novo("quiosques.db")
+        duas, falhas = _medir_em_threads(
+            _movimentacao_nova,
+            [_roteiro(n // 2, args.usuarios, args.ferramentas, s) for s in (3, 4)]
+        )
+        print(f"Pipeline antigo (5 autocommits)    {antigo:8.1f} mov/s")
+        print(f"Transação única                    {novo:8.1f} mov/s")
+        print(f"Transação única, 2 quiosques       {duas:8.1f} mov/s ({falhas} recusadas)")
+
+        banco_novo("carrinho_itens.db")
+        itens = _medir_carrinhos(20, 20, args.usuarios, args.ferramentas, em_lote=False)
+        banco_novo("carrinho_lote.db")
+        lote = _medir_carrinhos(20, 20, args.usuarios, args.ferramentas, em_lote=True)
+        print(f"Carrinho de 20 itens, item a item  {itens:8.3f} ms/item")
+        print(f"Carrinho de 20 itens, em lote      {lote:8.3f} ms/item")
+
+        rfids = [f"RFID{i:06d}" for i in range(min(args.usuarios, 50))]
+        print(f"Estoque ativo via SUM no ledger    {_latencia_ms(_estoque_ativo_pelo_ledger, rfids):8.2f} ms/consulta")
+        print(f"Estoque ativo via saldos_ativos    {_latencia_ms(buscar_estoque_ativo_usuario, rfids):8.2f} ms/consulta")
+        fechar_conexoes()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+experimental/bench_travamentos_gui.py
+
+Mede quanto tempo a thread da interface fica travada enquanto o quiosque
+registra movimentações com o banco ocupado por outro processo (como na
+cópia do backup de turno).
+
+Um QTimer de 5 ms marca o "batimento" da interface; cada atraso entre
+batimentos é um travamento. A cada 50 ms uma leitura simulada busca a
+ferramenta e registra uma retirada/devolução, enquanto outra conexão segura
+o lock de escrita por alguns centésimos de segundo de tempos em tempos.
+Compara a chamada direta na thread da interface (comportamento antigo) com
+o envio ao trabalhador de banco.
+
+Uso: python -m experimental.bench_travamentos_gui [--segundos N] [--lock-ms N]
+"""
+import os
+import sys
+import time
+import sqlite3
+import logging
+import argparse
+import tempfile
+import threading
+import statistics
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QTimer, QEventLoop
+from PyQt5.QtWidgets import QApplication
+
+import database.config as config
+from database.conexao import fechar_conexoes
+from database.database import buscar_ferramenta_por_codigo
+from experimental.bench_movimentacoes import popular_banco
+from interface.trabalhador_banco import executar_no_banco, parar_trabalhador
+from utils.movimentacoes import realizar_movimentacao
+
+
+def _segurar_lock(parar: threading.Event, lock_ms: int, intervalo_ms: int) -> None:
+    """Outra conexão reserva a escrita por lock_ms a cada intervalo_ms."""
+    conn = sqlite3.connect(config.DATABASE_CAMINHO, isolation_level=None)
+    try:
+        while not parar.wait(intervalo_ms / 1000):
+            conn.execute("BEGIN IMMEDIATE")
+            time.sleep(lock_ms / 1000)
+            conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def _leitura(i: int):
+    """Uma leitura do quiosque: busca a ferramenta e movimenta."""
+    codigo = f"COD{i % 50:06d}"
+    buscar_ferramenta_por_codigo(codigo)
+    return realizar_movimentacao("RFID000001", codigo, "RETIRADA" if i % 2 == 0 else "DEVOLUCAO")
+
+
+def _executar_cenario(app: QApplication, assincrono: bool, segundos: float,
+                      lock_ms: int, intervalo_ms: int) -> dict:
+    atrasos = []
+    ultimo = [time.perf_counter()]
+    concluidas = [0]
+
+    def batimento():
+        agora = time.perf_counter()
+        atrasos.append((agora - ultimo[0]) * 1000)
+        ultimo[0] = agora
+
+    contador = iter(range(10 ** 9))
+
+    def ler():
+        i = next(contador)
+        if assincrono:
+            executar_no_banco(_leitura, i, ao_concluir=lambda _: concluidas.__setitem__(0, concluidas[0] + 1))
+        else:
+            _leitura(i)
+            concluidas[0] += 1
+
+    parar = threading.Event()
+    bloqueador = threading.Thread(target=_segurar_lock, args=(parar, lock_ms, intervalo_ms), daemon=True)
+    t_batimento, t_leitura = QTimer(), QTimer()
+    t_batimento.timeout.connect(batimento)
+    t_leitura.timeout.connect(ler)
+
+    bloqueador.start()
+    t_batimento.start(5)
+    t_leitura.start(50)
+    loop = QEventLoop()
+    QTimer.singleShot(int(segundos * 1000), loop.quit)
+    ultimo[0] = time.perf_counter()
+    loop.exec_()
+    t_leitura.stop()
+    t_batimento.stop()
+    parar.set()
+    bloqueador.join()
+
+    # Espera as leituras ainda na fila do trabalhador
+    enviadas = next(contador)
+    while assincrono and concluidas[0] < enviadas:
+        app.processEvents()
+        time.sleep(0.001)
+
+    atrasos.sort()
+    return {
+        "leituras": concluidas[0],
+        "maximo": atrasos[-1],
+        "p99": atrasos[int(len(atrasos) * 0.99)],
+        "mediana": statistics.median(atrasos),
+        "acima_100ms": sum(1 for a in atrasos if a > 100),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Travamentos da interface com o banco ocupado")
+    parser.add_argument("--segundos", type=float, default=5)
+    parser.add_argument("--lock-ms", type=int, default=300, help="Duração de cada lock externo")
+    parser.add_argument("--intervalo-ms", type=int, default=1000, help="Intervalo entre locks externos")
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as pasta:
+        config.DATABASE_CAMINHO = os.path.join(pasta, "quiosque.db")
+        popular_banco(n_usuarios=20, n_ferramentas=50, n_logs=20_000)
+
+        print(f"Lock externo de {args.lock_ms} ms a cada {args.intervalo_ms} ms, {args.segundos:g}s por cenário")
+        print(f"{'':28}{'leituras':>9}{'mediana':>10}{'p99':>10}{'máximo':>10}{'>100ms':>8}")
+        for nome, assincrono in (("Thread da interface (antigo)", False), ("Trabalhador de banco", True)):
+            r = _executar_cenario(app, assincrono, args.segundos, args.lock_ms, args.intervalo_ms)
+            print(f"{nome:<28}{r['leituras']:>9}{r['mediana']:>8.1f}ms{r['p99']:>8.1f}ms"
+                  f"{r['maximo']:>8.1f}ms{r['acima_100ms']:>8}")
+        parar_trabalhador()
+        fechar_conexoes()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+experimental/bench_virada_turno.py
+
+Compara a virada de turno por arquivo (cópia do banco inteiro e troca de
+config.DATABASE_CAMINHO) com a virada por marcador (uma linha em
+marcadores_turno e o backup em segundo plano), com um operador registrando
+movimentações sem parar durante as viradas, como na fila do almoxarifado.
+
+Para cada modo mede o tempo da virada em si, a latência das movimentações
+registradas enquanto ela (e o backup) acontece e quantas movimentações
+ficaram fora do banco em uso depois da virada.
+
+Uso: python -m experimental.bench_virada_turno [--logs N] [--viradas N]
+"""
+import os
+import time
+import random
+import shutil
+import logging
+import sqlite3
+import argparse
+import tempfile
+import threading
+import statistics
+from contextlib import closing, redirect_stdout
+
+import database.config as config
+from database.conexao import fechar_conexoes
+from database.scheduler import _backup_e_troca
+from database.turnos import proximos_inicios
+from database.virada_turno import virar_turno
+from experimental.bench_movimentacoes import popular_banco
+from utils.movimentacoes import realizar_movimentacao
+
+
+def _operador(parar: threading.Event, latencias: list, gravadas: list,
+              n_usuarios: int, n_ferramentas: int) -> None:
+    rnd = random.Random(3)
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        resultado = realizar_movimentacao(
+            f"RFID{rnd.randrange(n_usuarios):06d}", f"COD{rnd.randrange(n_ferramentas):06d}", "RETIRADA"
+        )
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        if resultado["status"]:
+            gravadas.append(1)
+        time.sleep(0.002)
+    fechar_conexoes()
+
+
+def _contar_logs() -> int:
+    with closing(sqlite3.connect(config.DATABASE_CAMINHO)) as conn:
+        return conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+
+
+def _medir(modo: str, modelo: str, pasta: str, n_viradas: int, n_usuarios: int, n_ferramentas: int) -> dict:
+    config.VIRADA_DE_TURNO = modo
+    config.DATABASE_CAMINHO = os.path.join(pasta, f"{modo}.db")
+    config.BACKUP_DIR = os.path.join(pasta, f"backups_{modo}")
+    os.makedirs(config.BACKUP_DIR)
+    shutil.copyfile(modelo, config.DATABASE_CAMINHO)
+    logs_iniciais = _contar_logs()
+
+    parar, latencias, gravadas = threading.Event(), [], []
+    operador = threading.Thread(target=_operador, args=(parar, latencias, gravadas, n_usuarios, n_ferramentas))
+    operador.start()
+    time.sleep(0.2)
+
+    viradas, durante = [], []
+    with redirect_stdout(open(os.devnull, "w")):
+        for turno in proximos_inicios(n_viradas):
+            antes = len(latencias)
+            inicio = time.perf_counter()
+            if modo == "arquivo":
+                _backup_e_troca(turno.nome, turno.data)
+                viradas.append(time.perf_counter() - inicio)
+            else:
+                backup = virar_turno(turno)
+                viradas.append(time.perf_counter() - inicio)
+                if backup:
+                    backup.join()
+            durante.extend(latencias[antes:])
+            time.sleep(0.2)
+    parar.set()
+    operador.join()
+    fechar_conexoes()
+
+    return {
+        "virada_ms": statistics.median(viradas) * 1000,
+        "p99_ms": statistics.quantiles(durante, n=100)[98] if len(durante) >= 2 else 0.0,
+        "max_ms": max(durante, default=0.0),
+        "perdidas": logs_iniciais + len(gravadas) - _contar_logs(),
+        "gravadas": len(gravadas),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Virada de turno por arquivo x por marcador")
+    parser.add_argument("--logs", type=int, default=300_000)
+    parser.add_argument("--viradas", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+    n_usuarios, n_ferramentas = 200, 5000
+    config.BACKUP_COMPACTAR = False
+
+    with tempfile.TemporaryDirectory() as pasta:
+        modelo = os.path.join(pasta, "modelo.db")
+        config.DATABASE_CAMINHO = modelo
+        popular_banco(n_usuarios, n_ferramentas, args.logs)
+        fechar_conexoes()
+        with closing(sqlite3.connect(modelo)) as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        tamanho = os.path.getsize(modelo) / 1e6
+
+        resultados = {modo: _medir(modo, modelo, pasta, args.viradas, n_usuarios, n_ferramentas)
+                      for modo in ("arquivo", "marcador")}
+
+    print(f"Banco de {tamanho:.1f} MB ({args.logs} logs), {args.viradas} viradas com um operador registrando")
+    print(f"{'':12}{'virada':>12}{'p99 mov.':>12}{'máx mov.':>12}{'gravadas':>10}{'fora do banco':>15}")
+    for modo, r in resultados.items():
+        print(f"{modo.capitalize():<12}{r['virada_ms']:>10.1f}ms{r['p99_ms']:>10.1f}ms{r['max_ms']:>10.1f}ms"
+              f"{r['gravadas']:>10}{r['perdidas']:>15}")
+    print(f"Virada {resultados['arquivo']['virada_ms'] / resultados['marcador']['virada_ms']:.0f}x mais rápida "
+          f"por marcador (o backup segue em segundo plano)")
+
+
+if __name__ == "__main__":
+    main()
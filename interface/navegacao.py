@@ -3,57 +3,158 @@
 interface/navegacao.py
 
 Gerencia a navegação entre telas no sistema de controle de ferramentas.
+
+As telas são registradas como fábricas: o módulo de cada uma só é
+importado, e a tela só é criada (com as consultas do seu construtor), no
+primeiro mostrar_tela. Assim a janela de login aparece sem esperar pelas
+telas de exportação e administração, que trazem pandas e openpyxl.
+
+Com config.PRE_AQUECER_TELAS, depois que o login aparece os módulos das
+demais telas são importados numa thread à parte e as telas são criadas
+uma por vez, quando o loop de eventos está ocioso.
 """
+import time
+import logging
+import importlib
+import threading
+from typing import Callable, Dict, Optional
+
+from PyQt5.QtCore import QTimer, pyqtSignal
+from PyQt5.QtWidgets import QMessageBox, QStackedWidget, QWidget
 
-from PyQt5.QtWidgets import QStackedWidget
+import database.config as config
+from database.instrumentacao import definir_contexto
 
-# Imports relativos para módulos dentro de 'interface'
-from .telalogin import TelaLogin
-from .painel import PainelPrincipal
+logger = logging.getLogger(__name__)
 
-# Imports absolutos para módulos externos
-from telas.movimentacao import TelaMovimentacao
-from telas.admin import Admin
-from telas.exportacao import TelaExportacao
-from telas.cadastro import TelaCadastros
-from estoque.estoque import TelaEstoque
-from telas.tela_login_rfid import TelaLoginRFID
-from telas.tela_login_manual import TelaLoginManual
+# Tela -> (módulo, classe); importados só quando a tela é criada
+TELAS = {
+    "login": ("interface.telalogin", "TelaLogin"),
+    "login_rfid": ("telas.tela_login_rfid", "TelaLoginRFID"),
+    "login_manual": ("telas.tela_login_manual", "TelaLoginManual"),
+    "painel": ("interface.painel", "PainelPrincipal"),
+    "export": ("telas.exportacao", "TelaExportacao"),
+    "cadastro": ("telas.cadastro", "TelaCadastros"),
+    "estoque": ("estoque.estoque", "TelaEstoque"),
+    "admin": ("telas.admin", "Admin"),
+    "movimentacao": ("telas.movimentacao", "TelaMovimentacao"),
+}
+
+
+def _classe(nome_tela: str) -> type:
+    modulo, classe = TELAS[nome_tela]
+    return getattr(importlib.import_module(modulo), classe)
 
 
 class Navegacao(QStackedWidget):
     """Gerencia a navegação entre telas no sistema."""
 
-    def __init__(self):
+    # Emitido pela thread de pré-aquecimento quando os módulos das telas foram importados
+    _modulos_importados = pyqtSignal()
+
+    def __init__(self, pre_aquecer: Optional[bool] = None):
         super().__init__()
         self.telas = {}
+        self.fabricas: Dict[str, Callable[[], QWidget]] = {}
         self.perfil_atual = None
         self.rfid_usuario = None
+        self._modulos_importados.connect(self._criar_proxima_tela)
+        self._pendentes = []
 
         try:
-            self._inicializar_telas()
+            self._registrar_telas()
             self.mostrar_tela("login")  # Tela inicial
         except Exception as e:
             print(f"❌ Erro ao carregar as telas: {e}")
+            return
 
-    def _inicializar_telas(self):
-        """Inicializa e registra as telas do sistema."""
-        self.telas = {
-            "login": TelaLogin(self, self.definir_perfil),
-            "login_rfid": TelaLoginRFID(self, self.definir_perfil),
-            "login_manual": TelaLoginManual(self, self.definir_perfil),
-            "painel": PainelPrincipal(self),
-            "export": TelaExportacao(self),
-            "cadastro": TelaCadastros(self),
-            "estoque": TelaEstoque(self),
-            "admin": Admin()
+        if config.PRE_AQUECER_TELAS if pre_aquecer is None else pre_aquecer:
+            # Só depois que o login for desenhado e o loop de eventos estiver livre
+            QTimer.singleShot(config.PRE_AQUECER_ESPERA_MS, self.pre_aquecer)
+
+    def _registrar_telas(self):
+        """Registra as fábricas das telas do sistema (nenhuma é criada aqui)."""
+        self.fabricas = {
+            "login": lambda: _classe("login")(self, self.definir_perfil),
+            "login_rfid": lambda: _classe("login_rfid")(self, self.definir_perfil),
+            "login_manual": lambda: _classe("login_manual")(self, self.definir_perfil),
+            "painel": lambda: _classe("painel")(self),
+            "export": lambda: _classe("export")(self),
+            "cadastro": lambda: _classe("cadastro")(self),
+            "estoque": lambda: _classe("estoque")(self),
+            "admin": lambda: _classe("admin")(),
         }
-        for tela in self.telas.values():
-            self.addWidget(tela)
+
+    def tela(self, nome_tela: str, avisar: bool = True):
+        """
+        Tela já criada, ou criada agora pela sua fábrica; None se não estiver
+        registrada ou se a criação falhar.
+
+        A criação roda dentro dos slots dos botões: um erro no construtor (banco,
+        import) é registrado e, com avisar, mostrado ao operador, em vez de
+        escapar do slot e encerrar o quiosque.
+        """
+        if nome_tela not in self.telas:
+            fabrica = self.fabricas.get(nome_tela)
+            if fabrica is None:
+                return None
+            return self._criar(nome_tela, fabrica, avisar)
+        return self.telas[nome_tela]
+
+    def _criar(self, nome_tela: str, fabrica: Callable[[], QWidget], avisar: bool = True):
+        inicio = time.perf_counter()
+        try:
+            tela = fabrica()
+        except Exception as e:
+            logger.exception("Erro ao criar a tela '%s'", nome_tela)
+            if avisar:
+                QMessageBox.warning(self, "Erro", f"Não foi possível abrir a tela '{nome_tela}': {e}")
+            return None
+        self.telas[nome_tela] = tela
+        self.addWidget(tela)
+        logger.info("Tela '%s' criada em %.0f ms", nome_tela, (time.perf_counter() - inicio) * 1000)
+        return tela
+
+    def pre_aquecer(self):
+        """
+        Importa numa thread os módulos das telas ainda não criadas e depois
+        cria essas telas, uma por iteração do loop de eventos.
+        """
+        pendentes = [nome for nome in self.fabricas if nome not in self.telas]
+        if not pendentes:
+            return
+
+        def importar():
+            inicio = time.perf_counter()
+            try:
+                for nome in pendentes:
+                    _classe(nome)
+                # Usada por cada login, mas recriada a cada vez: só o módulo
+                _classe("movimentacao")
+            except Exception:
+                logger.exception("Erro ao importar os módulos das telas")
+                return
+            logger.info("Módulos das telas importados em %.2fs", time.perf_counter() - inicio)
+            self._modulos_importados.emit()
+
+        self._pendentes = pendentes
+        threading.Thread(target=importar, name="pre-aquecer-telas", daemon=True).start()
+
+    def _criar_proxima_tela(self):
+        # Uma tela por vez, para que um toque no login não espere por todas
+        while self._pendentes:
+            nome = self._pendentes.pop(0)
+            if nome not in self.telas:
+                # Em segundo plano: um erro só vai para o log (e se repete ao abrir a tela)
+                self.tela(nome, avisar=False)
+                break
+        if self._pendentes:
+            QTimer.singleShot(0, self._criar_proxima_tela)
 
     def mostrar_tela(self, nome_tela: str, rfid_usuario: str = None):
         """
-        Exibe a tela especificada; para movimentação, injeta o RFID do usuário.
+        Exibe a tela especificada, criando-a no primeiro uso; para
+        movimentação, injeta o RFID do usuário.
 
         :param nome_tela: chave da tela a ser exibida
         :param rfid_usuario: RFID do usuário, se aplicável
@@ -61,18 +162,23 @@ class Navegacao(QStackedWidget):
         if nome_tela == "movimentacao":
             if rfid_usuario:
                 self.rfid_usuario = rfid_usuario
-            # Cria dinamicamente TelaMovimentacao com RFID
-            self.telas["movimentacao"] = TelaMovimentacao(self, self.rfid_usuario)
-            self.addWidget(self.telas["movimentacao"])
-
-        tela = self.telas.get(nome_tela)
+            # Cria dinamicamente TelaMovimentacao com RFID, no lugar da do usuário anterior
+            anterior = self.telas.pop("movimentacao", None)
+            if anterior is not None:
+                self.removeWidget(anterior)
+                anterior.deleteLater()
+            tela = self._criar("movimentacao", lambda: _classe("movimentacao")(self, self.rfid_usuario))
+        else:
+            tela = self.tela(nome_tela)
         if tela:
+            # As queries a partir daqui são contabilizadas para esta tela
+            definir_contexto(nome_tela)
             if hasattr(tela, "atualizar_tela"):
                 tela.atualizar_tela()
             self.setCurrentWidget(tela)
             print(f"📌 Mudando para a tela: {nome_tela}")
         else:
-            print(f"⚠️ Erro: Tela '{nome_tela}' não encontrada!")
+            print(f"⚠️ Erro: Tela '{nome_tela}' não encontrada ou não pôde ser criada!")
 
     def definir_perfil(self, perfil: str, rfid_usuario: str):
         """
@@ -83,6 +189,6 @@ class Navegacao(QStackedWidget):
         """
         self.perfil_atual = perfil
         self.rfid_usuario = rfid_usuario
-        painel = self.telas.get("painel")
+        painel = self.tela("painel")
         if painel and hasattr(painel, "configurar_por_perfil"):
             painel.configurar_por_perfil(perfil)
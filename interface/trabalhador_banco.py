@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+interface/trabalhador_banco.py
+
+Thread dedicada ao banco de dados para as telas Qt.
+
+As telas enviam funções de banco com executar_no_banco(); elas rodam, em
+ordem de chegada, numa QThread com a sua própria conexão persistente, e o
+resultado volta por sinal para callbacks executados na thread da interface.
+Assim, um banco travado (por exemplo, durante a cópia do backup de turno)
+atrasa apenas a resposta, nunca o loop de eventos do quiosque.
+"""
+import queue
+import logging
+import itertools
+from typing import Callable, Dict, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+logger = logging.getLogger(__name__)
+
+Callback = Optional[Callable[[object], None]]
+
+
+class TrabalhadorBanco(QThread):
+    """Executa as tarefas de banco da fila, uma por vez, fora da thread da interface."""
+
+    concluida = pyqtSignal(int, object)
+    falhou = pyqtSignal(int, object)
+
+    def __init__(self):
+        super().__init__()
+        self._fila: "queue.Queue[Optional[Tuple[int, Callable, tuple, dict]]]" = queue.Queue()
+        self._ids = itertools.count(1)
+        self._callbacks: Dict[int, Tuple[Callback, Callback]] = {}
+        self._receptor = _Receptor(self)
+        self.concluida.connect(self._receptor.ao_concluir)
+        self.falhou.connect(self._receptor.ao_falhar)
+
+    def enviar(self, funcao: Callable, *args, ao_concluir: Callback = None,
+               ao_falhar: Callback = None, **kwargs) -> int:
+        """
+        Enfileira funcao(*args, **kwargs); ao terminar, ao_concluir(resultado)
+        ou ao_falhar(excecao) é chamado na thread da interface.
+
+        :return: identificador da tarefa
+        """
+        tarefa_id = next(self._ids)
+        self._callbacks[tarefa_id] = (ao_concluir, ao_falhar)
+        self._fila.put((tarefa_id, funcao, args, kwargs))
+        return tarefa_id
+
+    def pendentes(self) -> int:
+        """Tarefas enviadas cujo callback ainda não rodou."""
+        return len(self._callbacks)
+
+    def parar(self, espera_ms: int = 5000) -> None:
+        """Termina as tarefas já enfileiradas e encerra a thread."""
+        self._fila.put(None)
+        self.wait(espera_ms)
+
+    def run(self) -> None:
+        while True:
+            item = self._fila.get()
+            if item is None:
+                return
+            tarefa_id, funcao, args, kwargs = item
+            try:
+                resultado = funcao(*args, **kwargs)
+            except Exception as e:
+                logger.exception("Falha em tarefa de banco %s", getattr(funcao, "__name__", funcao))
+                self.falhou.emit(tarefa_id, e)
+            else:
+                self.concluida.emit(tarefa_id, resultado)
+
+
+class _Receptor(QObject):
+    """Vive na thread da interface e repassa os resultados aos callbacks."""
+
+    def __init__(self, trabalhador: TrabalhadorBanco):
+        super().__init__()
+        self._trabalhador = trabalhador
+
+    @pyqtSlot(int, object)
+    def ao_concluir(self, tarefa_id, resultado):
+        callback, _ = self._trabalhador._callbacks.pop(tarefa_id, (None, None))
+        if callback:
+            callback(resultado)
+
+    @pyqtSlot(int, object)
+    def ao_falhar(self, tarefa_id, erro):
+        _, callback = self._trabalhador._callbacks.pop(tarefa_id, (None, None))
+        if callback:
+            callback(erro)
+
+
+_trabalhador: Optional[TrabalhadorBanco] = None
+
+
+def obter_trabalhador() -> TrabalhadorBanco:
+    """Trabalhador único do processo, iniciado no primeiro uso."""
+    global _trabalhador
+    if _trabalhador is None:
+        _trabalhador = TrabalhadorBanco()
+        _trabalhador.start()
+    return _trabalhador
+
+
+def executar_no_banco(funcao: Callable, *args, ao_concluir: Callback = None,
+                      ao_falhar: Callback = None, **kwargs) -> int:
+    """Atalho para obter_trabalhador().enviar(...)."""
+    return obter_trabalhador().enviar(
+        funcao, *args, ao_concluir=ao_concluir, ao_falhar=ao_falhar, **kwargs
+    )
+
+
+def parar_trabalhador() -> None:
+    """Encerra o trabalhador (fim do aplicativo), se tiver sido iniciado."""
+    global _trabalhador
+    if _trabalhador is not None:
+        _trabalhador.parar()
+        _trabalhador = None
@@ -10,21 +10,25 @@ import sys
 import os
 import logging
 import argparse
+import multiprocessing
 from typing import Optional
 
 from PyQt5.QtWidgets import QApplication
 
 import database.config as config
 from database.database_utils import executar_query
+from database.conexao import fechar_conexoes
 from database.database import (
     criar_tabelas,
     registrar_movimentacao as db_registrar_movimentacao,
     buscar_ferramenta_por_codigo
 )
 from database.database_backup import verificar_backup
-from database.scheduler import iniciar_agendador_em_thread
-from database.data_setup import seed_test_data, import_tools_from_excel
+from database.scheduler import iniciar_agendador_em_thread, stop_agendador
+from database.turnos import turno_em
+from database.virada_turno import adotar_banco_de_turno, virar_turno
 from interface.navegacao import Navegacao
+from interface.trabalhador_banco import parar_trabalhador
 
 
 from utils.movimentacoes import realizar_movimentacao
@@ -47,18 +51,33 @@ logging.basicConfig(
 
 def init_database() -> None:
     """
-    1) Recupera/cria backup do turno atual.
+    1) Prepara o banco do turno atual. Com a virada por marcador (padrão), o
+       banco principal continua em uso: aplica as migrações, grava o marcador
+       do turno e, se o turno ainda não tem backup, faz o backup em segundo
+       plano. Com a virada por arquivo, recupera/cria a cópia do turno atual
+       e passa a usá-la.
     2) Inicia o agendador de backups.
-    3) Se for primeira execução, cria esquema e importa dados iniciais.
+    3) Aplica as migrações de esquema pendentes (só lê a versão se já estiver atualizado).
+    4) Se for primeira execução, importa dados iniciais.
     """
     base_db = config.DATABASE_CAMINHO
     try:
-        novo_path = verificar_backup()
-        config.DATABASE_CAMINHO = novo_path
-        iniciar_agendador_em_thread()
-        if not os.path.exists(base_db):
-            logger.info("Primeiro uso: criando esquema e importando dados iniciais…")
+        if config.VIRADA_DE_TURNO == "marcador":
+            adotar_banco_de_turno()
+            primeiro_uso = not os.path.exists(base_db)
             criar_tabelas()
+            virar_turno(turno_em())
+            iniciar_agendador_em_thread()
+        else:
+            novo_path = verificar_backup()
+            config.DATABASE_CAMINHO = novo_path
+            iniciar_agendador_em_thread()
+            criar_tabelas()
+            primeiro_uso = not os.path.exists(base_db)
+        if primeiro_uso:
+            logger.info("Primeiro uso: importando dados iniciais…")
+            # pandas/openpyxl só são carregados quando há planilha a importar
+            from database.data_setup import seed_test_data, import_tools_from_excel
             import_tools_from_excel()
             seed_test_data()
         else:
@@ -82,6 +101,7 @@ def main() -> int:
 
     init_database()
     if args.setup:
+        from database.data_setup import seed_test_data, import_tools_from_excel
         seed_test_data()
         import_tools_from_excel()
 
@@ -90,7 +110,13 @@ def main() -> int:
     janela.setWindowTitle("Controle de Ferramentas")
     janela.resize(800, 600)
     janela.show()
-    return app.exec_()
+    codigo = app.exec_()
+    stop_agendador()
+    parar_trabalhador()
+    fechar_conexoes()
+    return codigo
 
 if __name__ == "__main__":
+    # Processos da exportação paralela no executável congelado (PyInstaller)
+    multiprocessing.freeze_support()
     sys.exit(main())
@@ -6,7 +6,8 @@ Tela de administração: gerencia usuários, máquinas e ferramentas.
 """
 
 from PyQt5.QtWidgets import (
-    QWidget, QLabel, QVBoxLayout, QPushButton, QLineEdit, QFormLayout, QMessageBox
+    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit, QFormLayout,
+    QMessageBox, QDialog, QPlainTextEdit, QFileDialog
 )
 from PyQt5.QtGui import QFont, QIntValidator
 from PyQt5.QtCore import Qt
@@ -14,6 +15,12 @@ from PyQt5.QtCore import Qt
 from utils.registro import registrar_usuario
 from utils.registro import registrar_ferramenta
 from utils.registro import registrar_maquina
+from database.instrumentacao import estatisticas, relatorio, salvar_estatisticas
+from database.cache_ferramentas import estatisticas_cache_ferramentas
+from database.scheduler import proximas_execucoes
+from database.config import PLANILHA_IP_CAMINHO
+from database.data_setup import import_tools_from_excel
+from interface.trabalhador_banco import executar_no_banco
 
 
 class Admin(QWidget):
@@ -26,9 +33,9 @@ class Admin(QWidget):
         self.build_user_section(main_layout)
         self.build_machine_section(main_layout)
         self.build_tool_section(main_layout)
+        self.build_diagnostic_section(main_layout)
 
         self.setLayout(main_layout)
-        self.showMaximized()
 
     def build_user_section(self, layout):
         label_usuarios = QLabel("🔹 Gerenciar Usuários")
@@ -83,6 +90,91 @@ class Admin(QWidget):
         adicionar_ferramenta_btn.clicked.connect(self.adicionar_ferramenta)
         layout.addWidget(adicionar_ferramenta_btn)
 
+        self.importar_planilha_btn = QPushButton("📥 Importar Planilha de Ferramentas")
+        self.importar_planilha_btn.clicked.connect(self.importar_planilha)
+        layout.addWidget(self.importar_planilha_btn)
+
+    def importar_planilha(self):
+        """Importa (ou atualiza) o cadastro de ferramentas a partir da planilha escolhida."""
+        caminho, _ = QFileDialog.getOpenFileName(
+            self, "Planilha de ferramentas", PLANILHA_IP_CAMINHO, "Excel (*.xlsx)"
+        )
+        if not caminho:
+            return
+        self.importar_planilha_btn.setEnabled(False)
+        self.importar_planilha_btn.setText("⏳ Importando…")
+        executar_no_banco(
+            import_tools_from_excel, caminho,
+            ao_concluir=self._importacao_concluida, ao_falhar=self._importacao_falhou
+        )
+
+    def _importacao_concluida(self, resumo):
+        self._liberar_botao_importacao()
+        if resumo is None:
+            self.show_message("Erro", "⚠️ Não foi possível ler a planilha (veja o log).", info=False)
+            return
+        self.show_message(
+            "Importação Concluída",
+            "✅ Planilha importada:\n"
+            f"{resumo['inseridas']} inseridas, {resumo['atualizadas']} atualizadas, "
+            f"{resumo['inalteradas']} inalteradas, {resumo['ignoradas']} ignoradas."
+        )
+
+    def _importacao_falhou(self, erro):
+        self._liberar_botao_importacao()
+        self.show_message("Erro", f"⚠️ Erro ao importar a planilha: {erro}", info=False)
+
+    def _liberar_botao_importacao(self):
+        self.importar_planilha_btn.setEnabled(True)
+        self.importar_planilha_btn.setText("📥 Importar Planilha de Ferramentas")
+
+    def build_diagnostic_section(self, layout):
+        label_diagnostico = QLabel("🔹 Diagnóstico")
+        label_diagnostico.setAlignment(Qt.AlignCenter)
+        label_diagnostico.setFont(QFont("Arial", 16, QFont.Bold))
+        layout.addWidget(label_diagnostico)
+
+        estatisticas_btn = QPushButton("📊 Estatísticas do Banco")
+        estatisticas_btn.clicked.connect(self.mostrar_estatisticas)
+        layout.addWidget(estatisticas_btn)
+
+    def mostrar_estatisticas(self):
+        """Mostra as queries mais custosas, o peso de cada tela e as queries lentas."""
+        dialogo = QDialog(self)
+        dialogo.setWindowTitle("Estatísticas do Banco")
+        dialogo.resize(1000, 600)
+        layout = QVBoxLayout(dialogo)
+
+        texto = QPlainTextEdit(self._texto_estatisticas())
+        texto.setReadOnly(True)
+        texto.setFont(QFont("Courier New", 10))
+        layout.addWidget(texto)
+
+        botoes = QHBoxLayout()
+        salvar_btn = QPushButton("💾 Salvar")
+        salvar_btn.clicked.connect(lambda: salvar_estatisticas())
+        limpar_btn = QPushButton("🗑️ Limpar")
+        limpar_btn.clicked.connect(lambda: (estatisticas.limpar(), texto.setPlainText(self._texto_estatisticas())))
+        fechar_btn = QPushButton("Fechar")
+        fechar_btn.clicked.connect(dialogo.accept)
+        for botao in (salvar_btn, limpar_btn, fechar_btn):
+            botoes.addWidget(botao)
+        layout.addLayout(botoes)
+        dialogo.exec_()
+
+    def _texto_estatisticas(self):
+        cache = estatisticas_cache_ferramentas()
+        agendados = " | ".join(
+            f"{turno.nome} {turno.inicio:%d/%m %H:%M}" for turno in proximas_execucoes()
+        )
+        return (
+            f"🗂️ Cache de ferramentas: {cache['itens']}/{cache['tamanho']} itens | "
+            f"acertos {cache['acertos']} | falhas {cache['falhas']} "
+            f"({cache['taxa_acerto']:.0%} de acerto) | descartes {cache['descartes']} | "
+            f"invalidações {cache['invalidacoes']}\n"
+            f"🕒 Próximos backups: {agendados or 'agendador parado'}\n\n{relatorio()}"
+        )
+
     def validate_fields(self, fields):
         for name, field in fields:
             if not field.text().strip():
@@ -0,0 +1,112 @@
+"""
+telas/busca_ferramentas.py
+
+Campo de busca de ferramentas por descrição ou código, com resultados
+enquanto o operador digita, usado pelas telas de movimentação e de
+estoque quando não há etiqueta para escanear. As buscas rodam no
+trabalhador de banco sobre o índice FTS5 (database/busca_ferramentas.py).
+"""
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QListWidget, QListWidgetItem
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+
+from database.database import buscar_ferramentas
+from interface.trabalhador_banco import executar_no_banco
+
+
+class CampoBuscaFerramentas(QWidget):
+    """
+    Busca após uma pausa na digitação (espera_ms) e lista as ferramentas
+    mais relevantes; escolher uma (ativar o item, ou Enter no campo para a
+    primeira) emite `selecionada` com o código de barras. Um Enter antes de
+    a busca do texto atual terminar espera por ela, em vez de escolher a
+    primeira linha de uma busca anterior.
+    """
+    selecionada = pyqtSignal(str)
+
+    def __init__(self, limite: int = 15, espera_ms: int = 200, minimo: int = 2, parent=None):
+        super().__init__(parent)
+        self.limite = limite
+        self.minimo = minimo
+        # Respostas de uma busca anterior à última digitação são descartadas
+        self._geracao = 0
+        # Geração da lista exibida e Enter aguardando a busca do texto atual
+        self._exibida = 0
+        self._escolher_ao_exibir = False
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.campo = QLineEdit()
+        self.campo.setPlaceholderText("🔍 Sem etiqueta? Digite parte da descrição ou do código")
+        self.campo.setClearButtonEnabled(True)
+        self.campo.textChanged.connect(self._ao_digitar)
+        self.campo.returnPressed.connect(self._escolher_primeira)
+        layout.addWidget(self.campo)
+
+        self.resultados = QListWidget()
+        self.resultados.setMaximumHeight(180)
+        self.resultados.setVisible(False)
+        self.resultados.itemActivated.connect(self._escolher)
+        layout.addWidget(self.resultados)
+        self.setLayout(layout)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(espera_ms)
+        self._timer.timeout.connect(self._buscar)
+
+    def limpar(self):
+        self._geracao += 1
+        self._escolher_ao_exibir = False
+        self._timer.stop()
+        self.campo.clear()
+        self._exibir(self._geracao, [])
+
+    def _ao_digitar(self, texto):
+        self._geracao += 1
+        self._escolher_ao_exibir = False
+        if len(texto.strip()) < self.minimo:
+            self._timer.stop()
+            self._exibir(self._geracao, [])
+        else:
+            self._timer.start()
+
+    def _buscar(self):
+        geracao = self._geracao
+        executar_no_banco(
+            buscar_ferramentas, self.campo.text(), self.limite,
+            ao_concluir=lambda encontradas: self._exibir(geracao, encontradas),
+            ao_falhar=lambda erro: self._exibir(geracao, [])
+        )
+
+    def _exibir(self, geracao, encontradas):
+        if geracao != self._geracao:
+            return
+        self._exibida = geracao
+        self.resultados.clear()
+        for ferramenta in encontradas:
+            item = QListWidgetItem(
+                f"{ferramenta['codigo_barra']}  —  {ferramenta['nome']}  "
+                f"(📦 {ferramenta['estoque_almoxarifado']})"
+            )
+            item.setData(Qt.UserRole, ferramenta['codigo_barra'])
+            self.resultados.addItem(item)
+        self.resultados.setVisible(bool(encontradas))
+        if self._escolher_ao_exibir:
+            self._escolher_ao_exibir = False
+            self._escolher_primeira()
+
+    def _escolher_primeira(self):
+        if self._exibida != self._geracao:
+            # A lista é de um texto anterior: busca agora (sem esperar a pausa) e escolhe ao chegar
+            self._escolher_ao_exibir = True
+            if self._timer.isActive():
+                self._timer.stop()
+                self._buscar()
+            return
+        if self.resultados.count():
+            self._escolher(self.resultados.item(0))
+
+    def _escolher(self, item):
+        codigo = item.data(Qt.UserRole)
+        self.limpar()
+        self.selecionada.emit(codigo)
@@ -10,6 +10,8 @@ from PyQt5.QtCore import Qt
 
 from utils.registro import registrar_usuario, registrar_ferramenta, registrar_maquina
 from database.database_utils import executar_query
+from database.cache_ferramentas import invalidar_ferramenta
+from database.diretorio_usuarios import recarregar_usuarios
 
 def hash_senha(senha):
     return hashlib.sha256(senha.encode('utf-8')).hexdigest()
@@ -175,6 +177,7 @@ class TelaCadastros(QWidget):
             return
 
         executar_query("DELETE FROM usuarios WHERE nome = ?", (nome,))
+        recarregar_usuarios()
         self.show_message("Sucesso", f"Usuário '{nome}' removido com sucesso.")
 
     def adicionar_ferramenta(self):
@@ -228,6 +231,7 @@ class TelaCadastros(QWidget):
             return
 
         executar_query("DELETE FROM ferramentas WHERE codigo_barra = ?", (codigo,))
+        invalidar_ferramenta(codigo_barra=codigo)
         self.show_message("Sucesso", f"Ferramenta com código '{codigo}' removida com sucesso.")
 
     def adicionar_maquina(self):
@@ -1,40 +1,154 @@
 import os
 import sqlite3
+import threading
+from itertools import islice
+
 import pandas as pd
-import datetime
 
-from database.config import DATABASE_CAMINHO  # Note que não usamos mais EXPORT_DIR fixo
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QPushButton, QLabel, QMessageBox,
-    QLineEdit, QFormLayout, QFileDialog
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QMessageBox, QCheckBox, QDialog, QProgressBar,
+    QComboBox, QLineEdit, QFormLayout, QFileDialog, QDateEdit, QDateTimeEdit
+)
+from PyQt5.QtCore import Qt, QDate, QDateTime, QThread, pyqtSignal
+
+from database.database import estoque_em, iterar_movimentacoes, saldos_em
+from database.turnos import turno_em
+from interface.trabalhador_banco import executar_no_banco
+from utils.exportador import (
+    LOTE_PADRAO, ExportacaoCancelada, exportar_incremental, exportar_lotes, exportar_tabela, exportar_tabelas,
+    listar_tabelas, marcas_exportacao
 )
-from PyQt5.QtCore import Qt
-
-# Lógica para definição dos turnos
-TURNOS = {
-    "1turno": datetime.time(6, 0),
-    "2turno": datetime.time(14, 0),
-    "3turno": datetime.time(22, 0),
-}
-
-def get_turno_atual():
-    agora = datetime.datetime.now().time()
-    # Itera em ordem reversa para encontrar o turno apropriado
-    for nome, hora in reversed(list(TURNOS.items())):
-        if agora >= hora:
-            return nome
-    return "1turno"
-
-def get_export_filename(nome_tabela, data=None, turno=None):
+
+def get_export_filename(nome_tabela, data=None, turno=None, extensao="xlsx"):
     """
     Gera o nome do arquivo de exportação conforme o padrão:
-    [nome_da_tabela]_[YYYY-MM-DD]_[turno].xlsx
+    [nome_da_tabela]_[YYYY-MM-DD]_[turno].[extensao]
+
+    Sem data/turno, vale o turno em andamento (o 3º turno fica com a data
+    em que começou, mesmo depois da meia-noite).
     """
+    atual = turno_em()
     if data is None:
-        data = datetime.date.today()
+        data = atual.data
     if turno is None:
-        turno = get_turno_atual()
-    return f"{nome_tabela}_{data}_{turno}.xlsx"
+        turno = atual.nome
+    return f"{nome_tabela}_{data}_{turno}.{extensao}"
+
+
+def _exportar_periodo(data_inicio, data_fim, caminho) -> int:
+    """Grava em `caminho` as movimentações de [data_inicio, data_fim) (dias locais); roda no trabalhador de banco."""
+    # Percorre o histórico em páginas pelo cursor (data_hora, id) e grava em fluxo;
+    # buscar_movimentacoes converte os dias locais para o UTC de logs.data_hora
+    linhas = iterar_movimentacoes(lote=LOTE_PADRAO, data_inicio=data_inicio, data_fim=data_fim, crescente=True)
+    return exportar_lotes(
+        iter(lambda: list(islice(linhas, LOTE_PADRAO)), []),
+        ["data_hora", "usuario", "codigo_barra", "ferramenta", "acao",
+         "quantidade", "motivo", "operacoes", "avaliacao"],
+        caminho,
+        nome_planilha="movimentacoes"
+    )
+
+
+def _exportar_estoque_em(momento, caminho):
+    """
+    Grava em `caminho` o estoque e os saldos com usuários em `momento`; roda no
+    trabalhador de banco.
+
+    :return: (ferramentas, itens com usuários)
+    """
+    # Parte do checkpoint mais próximo e reaplica só os logs até o momento
+    estoque = pd.DataFrame(estoque_em(momento), columns=[
+        "ferramenta_id", "codigo_barra", "ferramenta", "estoque_almoxarifado", "estoque_ativo"
+    ])
+    saldos = pd.DataFrame(saldos_em(momento), columns=[
+        "usuario_id", "usuario", "ferramenta_id", "codigo_barra", "ferramenta", "saldo"
+    ])
+    with pd.ExcelWriter(caminho, engine='openpyxl') as planilha:
+        estoque.to_excel(planilha, sheet_name="estoque", index=False)
+        saldos.to_excel(planilha, sheet_name="com_usuarios", index=False)
+    return len(estoque), len(saldos)
+
+
+class TrabalhoExportacao(QThread):
+    """Roda exportar_tabelas() (que bloqueia até o fim do pool) fora da thread da interface."""
+
+    progresso = pyqtSignal(str, int, object)
+    concluida = pyqtSignal(object)
+
+    def __init__(self, destinos):
+        super().__init__()
+        self.destinos = destinos
+        self.cancelar = threading.Event()
+
+    def run(self):
+        try:
+            resultados = exportar_tabelas(self.destinos, progresso=self.progresso.emit, cancelar=self.cancelar)
+        except Exception as e:
+            resultados = {tabela: e for tabela in self.destinos}
+        self.concluida.emit(resultados)
+
+
+class DialogoExportacao(QDialog):
+    """
+    Acompanha a exportação de várias tabelas em paralelo: uma barra de
+    progresso por tabela e um botão para cancelar. Fechar a janela durante
+    a exportação também cancela; ela só fecha quando o pool terminar.
+    """
+    def __init__(self, destinos, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Exportando Tabelas")
+        self.setModal(True)
+        self.resultados = {}
+        self.barras = {}
+        self.init_ui(destinos)
+        self.trabalho = TrabalhoExportacao(destinos)
+        self.trabalho.progresso.connect(self.atualizar_progresso)
+        self.trabalho.concluida.connect(self.concluir)
+        self.trabalho.start()
+
+    def init_ui(self, destinos):
+        self.layout = QVBoxLayout(self)
+        form = QFormLayout()
+        for tabela in destinos:
+            barra = QProgressBar()
+            barra.setRange(0, 0)  # Indeterminada até o primeiro lote gravado
+            self.barras[tabela] = barra
+            form.addRow(tabela, barra)
+        self.layout.addLayout(form)
+        self.btn_cancelar = QPushButton("Cancelar")
+        self.btn_cancelar.clicked.connect(self.reject)
+        self.layout.addWidget(self.btn_cancelar)
+
+    def atualizar_progresso(self, tabela, escritas, total):
+        barra = self.barras[tabela]
+        barra.setRange(0, max(total or escritas, 1))
+        barra.setValue(escritas)
+
+    def concluir(self, resultados):
+        self.resultados = resultados
+        for tabela, resultado in resultados.items():
+            barra = self.barras[tabela]
+            barra.setRange(0, 1)
+            if isinstance(resultado, ExportacaoCancelada):
+                barra.setValue(0)
+                barra.setFormat("cancelada")
+            elif isinstance(resultado, Exception):
+                barra.setValue(0)
+                barra.setFormat("erro")
+            else:
+                barra.setValue(1)
+                barra.setFormat(f"{resultado} linhas")
+        self.btn_cancelar.setText("Fechar")
+        self.btn_cancelar.setEnabled(True)
+
+    def reject(self):
+        if self.trabalho.isRunning():
+            self.trabalho.cancelar.set()
+            self.btn_cancelar.setText("Cancelando…")
+            self.btn_cancelar.setEnabled(False)
+            return
+        super().reject()
+
 
 class TelaExportacao(QWidget):
     def __init__(self, navegacao):
@@ -55,7 +169,14 @@ class TelaExportacao(QWidget):
         layout = QVBoxLayout()
         layout.addWidget(self._criar_label_titulo())
         layout.addLayout(self._criar_painel_listagem_tabelas())
+        layout.addWidget(self._criar_opcao_csv())
         layout.addWidget(self._criar_btn_exportar_todas())
+        layout.addLayout(self._criar_formulario_periodo())
+        layout.addWidget(self._criar_btn_exportar_periodo())
+        layout.addLayout(self._criar_formulario_estoque_em())
+        layout.addWidget(self._criar_btn_exportar_estoque_em())
+        layout.addLayout(self._criar_formulario_incremental())
+        layout.addWidget(self._criar_btn_exportar_incremental())
         #layout.addLayout(self._criar_formulario_especifica())
         #layout.addWidget(self._criar_btn_exportar_especifica())
         layout.addWidget(self._criar_btn_abrir_pasta_export())
@@ -87,11 +208,93 @@ class TelaExportacao(QWidget):
             painel.addWidget(label_colunas)
         return painel
 
+    def _criar_opcao_csv(self):
+        self.csv_input = QCheckBox("Exportar tabelas e movimentações em CSV (mais rápido, sem limite de linhas)")
+        return self.csv_input
+
+    def _extensao(self):
+        return "csv" if self.csv_input.isChecked() else "xlsx"
+
     def _criar_btn_exportar_todas(self):
         btn = QPushButton("Exportar Todas as Tabelas")
         btn.clicked.connect(self.exportar_todas_tabelas)
         return btn
 
+    def _criar_formulario_periodo(self):
+        form = QFormLayout()
+        hoje = QDate.currentDate()
+        self.data_inicio_input = QDateEdit(hoje.addMonths(-1))
+        self.data_fim_input = QDateEdit(hoje)
+        for campo in (self.data_inicio_input, self.data_fim_input):
+            campo.setCalendarPopup(True)
+            campo.setDisplayFormat("dd/MM/yyyy")
+        form.addRow("Movimentações de:", self.data_inicio_input)
+        form.addRow("até:", self.data_fim_input)
+        return form
+
+    def _criar_btn_exportar_periodo(self):
+        self.btn_exportar_periodo = QPushButton("Exportar Movimentações do Período")
+        self.btn_exportar_periodo.clicked.connect(self.exportar_movimentacoes_periodo)
+        return self.btn_exportar_periodo
+
+    def _criar_formulario_estoque_em(self):
+        form = QFormLayout()
+        self.estoque_em_input = QDateTimeEdit(QDateTime.currentDateTime())
+        self.estoque_em_input.setCalendarPopup(True)
+        self.estoque_em_input.setDisplayFormat("dd/MM/yyyy HH:mm")
+        form.addRow("Estoque em:", self.estoque_em_input)
+        return form
+
+    def _criar_btn_exportar_estoque_em(self):
+        self.btn_exportar_estoque_em = QPushButton("Exportar Estoque na Data/Hora")
+        self.btn_exportar_estoque_em.clicked.connect(self.exportar_estoque_em)
+        return self.btn_exportar_estoque_em
+
+    def _criar_formulario_incremental(self):
+        form = QFormLayout()
+        linha = QHBoxLayout()
+        self.destino_incremental_input = QComboBox()
+        self.destino_incremental_input.setEditable(True)
+        self.destino_incremental_input.currentTextChanged.connect(self._mostrar_marca_incremental)
+        btn_escolher = QPushButton("Escolher…")
+        btn_escolher.clicked.connect(self.escolher_destino_incremental)
+        linha.addWidget(self.destino_incremental_input, 1)
+        linha.addWidget(btn_escolher)
+        form.addRow("Destino incremental (ERP):", linha)
+        self.marca_incremental_label = QLabel()
+        form.addRow("", self.marca_incremental_label)
+        self._carregar_destinos_incrementais()
+        return form
+
+    def _criar_btn_exportar_incremental(self):
+        self.btn_exportar_incremental = QPushButton("Exportar Movimentações Novas para o Destino")
+        self.btn_exportar_incremental.clicked.connect(self.exportar_movimentacoes_incrementais)
+        return self.btn_exportar_incremental
+
+    def _carregar_destinos_incrementais(self):
+        """Preenche o campo de destino com os destinos que já têm marca d'água."""
+        try:
+            self._marcas_incrementais = {marca["destino"]: marca for marca in marcas_exportacao()}
+        except sqlite3.Error:
+            self._marcas_incrementais = {}  # Banco ainda sem a migração das marcas
+        atual = self.destino_incremental_input.currentText()
+        self.destino_incremental_input.blockSignals(True)
+        self.destino_incremental_input.clear()
+        self.destino_incremental_input.addItems(list(self._marcas_incrementais))
+        self.destino_incremental_input.blockSignals(False)
+        self.destino_incremental_input.setCurrentText(atual or next(iter(self._marcas_incrementais), ""))
+        self._mostrar_marca_incremental(self.destino_incremental_input.currentText())
+
+    def _mostrar_marca_incremental(self, destino):
+        marca = self._marcas_incrementais.get(os.path.normcase(os.path.abspath(destino))) if destino else None
+        if marca:
+            self.marca_incremental_label.setText(
+                f"Último log enviado: {marca['ultimo_log_id']} (em {marca['exportado_em']} UTC, "
+                f"{marca['linhas']} linhas no total)"
+            )
+        else:
+            self.marca_incremental_label.setText("Destino novo: a primeira exportação envia o histórico inteiro.")
+
     def _criar_formulario_especifica(self):
         form = QFormLayout()
         self.tabela_input = QLineEdit()
@@ -140,12 +343,182 @@ class TelaExportacao(QWidget):
 
     def exportar_todas_tabelas(self):
         """
-        Exporta todas as tabelas do banco de dados para arquivos Excel individuais.
+        Exporta todas as tabelas do banco de dados para arquivos individuais,
+        em paralelo (um processo por tabela), com progresso e cancelamento.
         """
-        if self.exportar_todas_tabelas_para_excel():
-            self._exibir_mensagem("Sucesso", "Todas as tabelas foram exportadas com sucesso!", "info")
-        else:
-            self._exibir_mensagem("Erro", "Falha ao exportar tabelas!", "warning")
+        pasta_destino = self.selecionar_pasta_export()
+        if not pasta_destino:
+            self._exibir_mensagem("Exportação Cancelada", "Nenhuma pasta selecionada.", "warning")
+            return
+        try:
+            os.makedirs(pasta_destino, exist_ok=True)
+            tabelas = listar_tabelas()
+        except Exception as e:
+            print(f"❌ Erro ao listar as tabelas: {e}")
+            self._exibir_mensagem("Erro", f"Falha ao exportar tabelas: {e}", "warning")
+            return
+        if not tabelas:
+            self._exibir_mensagem("Erro", "Nenhuma tabela encontrada.", "warning")
+            return
+        destinos = {
+            tabela: os.path.join(pasta_destino, get_export_filename(tabela, extensao=self._extensao()))
+            for tabela in tabelas
+        }
+        dialogo = DialogoExportacao(destinos, self)
+        dialogo.exec_()
+        self._resumir_exportacao(dialogo.resultados, destinos)
+
+    def _resumir_exportacao(self, resultados, destinos):
+        """Remove os arquivos de tabelas vazias e mostra o resultado da exportação de todas as tabelas."""
+        exportadas, vazias, canceladas, erros = [], [], [], []
+        for tabela, resultado in resultados.items():
+            if isinstance(resultado, ExportacaoCancelada):
+                canceladas.append(tabela)
+            elif isinstance(resultado, Exception):
+                erros.append(f"{tabela}: {resultado}")
+                print(f"❌ Erro ao exportar tabela '{tabela}': {resultado}")
+            elif resultado == 0:
+                vazias.append(tabela)
+                os.remove(destinos[tabela])
+            else:
+                exportadas.append(tabela)
+                print(f"✅ Tabela '{tabela}' exportada com sucesso em {destinos[tabela]} ({resultado} linhas).")
+        mensagem = f"{len(exportadas)} tabela(s) exportada(s)."
+        if vazias:
+            mensagem += f"\nVazias (sem arquivo): {', '.join(vazias)}"
+        if canceladas:
+            mensagem += f"\nCanceladas: {', '.join(canceladas)}"
+        if erros:
+            mensagem += "\nErros:\n" + "\n".join(erros)
+        self._exibir_mensagem("Exportação de Tabelas", mensagem, "warning" if erros or canceladas else "info")
+
+    def escolher_destino_incremental(self):
+        caminho, _ = QFileDialog.getSaveFileName(
+            self, "Arquivo de destino da exportação incremental", "", "CSV (*.csv);;Excel (*.xlsx)",
+            options=QFileDialog.DontConfirmOverwrite  # O CSV recebe as linhas novas no fim
+        )
+        if caminho:
+            self.destino_incremental_input.setCurrentText(caminho)
+
+    def exportar_movimentacoes_incrementais(self):
+        """
+        Exporta para o destino escolhido só as movimentações que ainda não
+        foram para ele (acrescentadas ao CSV ou num .xlsx novo ao lado), no
+        trabalhador de banco, sem travar a interface.
+        """
+        destino = self.destino_incremental_input.currentText().strip()
+        if not destino:
+            self._exibir_mensagem("Erro", "Escolha o arquivo de destino.", "warning")
+            return
+        self.btn_exportar_incremental.setEnabled(False)
+        self.btn_exportar_incremental.setText("⏳ Exportando…")
+        executar_no_banco(
+            exportar_incremental, destino,
+            ao_concluir=self._exportacao_incremental_concluida,
+            ao_falhar=self._exportacao_incremental_falhou
+        )
+
+    def _exportacao_incremental_concluida(self, resultado):
+        linhas, arquivo = resultado
+        self._liberar_botao_incremental()
+        self._carregar_destinos_incrementais()
+        if not arquivo:
+            self._exibir_mensagem("Aviso", "Nenhuma movimentação nova para este destino.", "info")
+            return
+        print(f"✅ {linhas} movimentações novas exportadas em {arquivo}.")
+        self._exibir_mensagem("Sucesso", f"{linhas} movimentações novas exportadas em {arquivo}.", "info")
+
+    def _exportacao_incremental_falhou(self, erro):
+        self._liberar_botao_incremental()
+        print(f"❌ Erro na exportação incremental: {erro}")
+        self._exibir_mensagem("Erro", f"Erro na exportação incremental: {erro}", "warning")
+
+    def _liberar_botao_incremental(self):
+        self.btn_exportar_incremental.setEnabled(True)
+        self.btn_exportar_incremental.setText("Exportar Movimentações Novas para o Destino")
+
+    def exportar_movimentacoes_periodo(self):
+        """
+        Exporta o histórico de movimentações do período escolhido (datas
+        inclusivas), no trabalhador de banco, sem travar a interface.
+        """
+        inicio = self.data_inicio_input.date()
+        fim = self.data_fim_input.date()
+        if inicio > fim:
+            self._exibir_mensagem("Erro", "A data inicial é posterior à final.", "warning")
+            return
+        pasta_destino = self.selecionar_pasta_export()
+        if not pasta_destino:
+            self._exibir_mensagem("Exportação Cancelada", "Nenhuma pasta selecionada.", "warning")
+            return
+        nome = (f"movimentacoes_{inicio.toString('yyyy-MM-dd')}_a_{fim.toString('yyyy-MM-dd')}"
+                f".{self._extensao()}")
+        caminho = os.path.join(pasta_destino, nome)
+        self.btn_exportar_periodo.setEnabled(False)
+        self.btn_exportar_periodo.setText("⏳ Exportando…")
+        executar_no_banco(
+            _exportar_periodo, inicio.toPyDate(), fim.addDays(1).toPyDate(), caminho,
+            ao_concluir=lambda exportadas: self._exportacao_periodo_concluida(exportadas, caminho),
+            ao_falhar=self._exportacao_periodo_falhou
+        )
+
+    def _exportacao_periodo_concluida(self, exportadas, caminho):
+        self._liberar_botao_periodo()
+        if not exportadas:
+            os.remove(caminho)
+            self._exibir_mensagem("Aviso", "Nenhuma movimentação no período.", "warning")
+            return
+        print(f"✅ {exportadas} movimentações exportadas em {caminho}.")
+        self._exibir_mensagem("Sucesso", f"{exportadas} movimentações exportadas!", "info")
+
+    def _exportacao_periodo_falhou(self, erro):
+        self._liberar_botao_periodo()
+        print(f"❌ Erro ao exportar movimentações: {erro}")
+        self._exibir_mensagem("Erro", f"Erro ao exportar movimentações: {erro}", "warning")
+
+    def _liberar_botao_periodo(self):
+        self.btn_exportar_periodo.setEnabled(True)
+        self.btn_exportar_periodo.setText("Exportar Movimentações do Período")
+
+    def exportar_estoque_em(self):
+        """
+        Exporta o estoque de cada ferramenta e o que estava com cada usuário
+        na data/hora escolhida (abas 'estoque' e 'com_usuarios'), no
+        trabalhador de banco, sem travar a interface.
+        """
+        momento = self.estoque_em_input.dateTime().toPyDateTime().replace(second=59, microsecond=0)
+        pasta_destino = self.selecionar_pasta_export()
+        if not pasta_destino:
+            self._exibir_mensagem("Exportação Cancelada", "Nenhuma pasta selecionada.", "warning")
+            return
+        caminho = os.path.join(pasta_destino, f"estoque_em_{momento:%Y-%m-%d_%H%M}.xlsx")
+        self.btn_exportar_estoque_em.setEnabled(False)
+        self.btn_exportar_estoque_em.setText("⏳ Exportando…")
+        executar_no_banco(
+            _exportar_estoque_em, momento, caminho,
+            ao_concluir=lambda linhas: self._exportacao_estoque_em_concluida(linhas, momento, caminho),
+            ao_falhar=self._exportacao_estoque_em_falhou
+        )
+
+    def _exportacao_estoque_em_concluida(self, linhas, momento, caminho):
+        self._liberar_botao_estoque_em()
+        ferramentas, com_usuarios = linhas
+        print(f"✅ Estoque em {momento:%d/%m/%Y %H:%M} exportado em {caminho}.")
+        self._exibir_mensagem(
+            "Sucesso",
+            f"Estoque em {momento:%d/%m/%Y %H:%M} exportado: {ferramentas} ferramentas, "
+            f"{com_usuarios} itens com usuários.",
+            "info"
+        )
+
+    def _exportacao_estoque_em_falhou(self, erro):
+        self._liberar_botao_estoque_em()
+        print(f"❌ Erro ao exportar estoque: {erro}")
+        self._exibir_mensagem("Erro", f"Erro ao exportar estoque: {erro}", "warning")
+
+    def _liberar_botao_estoque_em(self):
+        self.btn_exportar_estoque_em.setEnabled(True)
+        self.btn_exportar_estoque_em.setText("Exportar Estoque na Data/Hora")
 
     def exportar_tabela_especifica(self):
         """
@@ -159,7 +532,7 @@ class TelaExportacao(QWidget):
         if not pasta_destino:
             self._exibir_mensagem("Exportação Cancelada", "Nenhuma pasta selecionada.", "warning")
             return
-        caminho_exportacao = os.path.join(pasta_destino, get_export_filename(nome_tabela))
+        caminho_exportacao = os.path.join(pasta_destino, get_export_filename(nome_tabela, extensao=self._extensao()))
         if self.exportar_tabela_para_excel(nome_tabela, caminho_exportacao):
             self._exibir_mensagem("Sucesso", f"Tabela '{nome_tabela}' exportada com sucesso!", "info")
         else:
@@ -167,7 +540,9 @@ class TelaExportacao(QWidget):
 
     def exportar_tabela_para_excel(self, nome_tabela, caminho_arquivo):
         """
-        Exporta uma tabela específica para um arquivo Excel.
+        Exporta uma tabela específica para um arquivo Excel (ou CSV, pela
+        extensão), em fluxo: as linhas vão do banco para o arquivo em lotes,
+        sem carregar a tabela inteira na memória.
         
         Parâmetros:
             nome_tabela (str): Nome da tabela a ser exportada.
@@ -176,57 +551,15 @@ class TelaExportacao(QWidget):
         Retorna:
             bool: True se a exportação foi bem-sucedida; caso contrário, False.
         """
-        conexao = None
         try:
             os.makedirs(os.path.dirname(caminho_arquivo), exist_ok=True)
-            conexao = sqlite3.connect(DATABASE_CAMINHO)
-            query = f"SELECT * FROM {nome_tabela}"
-            df = pd.read_sql_query(query, conexao)
-            if df.empty:
+            linhas = exportar_tabela(nome_tabela, caminho_arquivo)
+            if not linhas:
+                os.remove(caminho_arquivo)
                 print(f"⚠️ A tabela '{nome_tabela}' está vazia.")
                 return False
-            df.to_excel(caminho_arquivo, index=False, engine='openpyxl')
-            print(f"✅ Tabela '{nome_tabela}' exportada com sucesso em {caminho_arquivo}.")
+            print(f"✅ Tabela '{nome_tabela}' exportada com sucesso em {caminho_arquivo} ({linhas} linhas).")
             return True
         except Exception as e:
             print(f"❌ Erro ao exportar tabela '{nome_tabela}': {e}")
             return False
-        finally:
-            if conexao:
-                conexao.close()
-
-    def exportar_todas_tabelas_para_excel(self):
-        """
-        Exporta todas as tabelas do banco de dados para arquivos Excel individuais.
-        
-        Retorna:
-            bool: True se pelo menos uma tabela foi exportada com sucesso; caso contrário, False.
-        """
-        pasta_destino = self.selecionar_pasta_export()
-        if not pasta_destino:
-            self._exibir_mensagem("Exportação Cancelada", "Nenhuma pasta selecionada.", "warning")
-            return False
-
-        conexao = None
-        try:
-            os.makedirs(pasta_destino, exist_ok=True)
-            conexao = sqlite3.connect(DATABASE_CAMINHO)
-            cursor = conexao.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tabelas = cursor.fetchall()
-            if not tabelas:
-                print("⚠️ Nenhuma tabela encontrada.")
-                return False
-            sucesso = False
-            for tabela in tabelas:
-                nome_tabela = tabela[0]
-                caminho = os.path.join(pasta_destino, get_export_filename(nome_tabela))
-                if self.exportar_tabela_para_excel(nome_tabela, caminho):
-                    sucesso = True
-            return sucesso
-        except Exception as e:
-            print(f"❌ Erro ao exportar todas as tabelas: {e}")
-            return False
-        finally:
-            if conexao:
-                conexao.close()
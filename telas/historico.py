@@ -0,0 +1,101 @@
+"""
+telas/historico.py
+
+Tabela de histórico de movimentações com paginação por cursor, usada pelas
+telas de movimentação e de estoque. As páginas são buscadas pelo
+trabalhador de banco, sem bloquear a interface.
+"""
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem
+
+from database.database import buscar_movimentacoes
+from interface.trabalhador_banco import executar_no_banco
+
+COLUNAS_HISTORICO = [
+    "Data/Hora", "Operador", "Código", "Descrição", "Tipo",
+    "Qtd", "Motivo", "Operações", "Avaliação"
+]
+
+
+class TabelaHistorico(QWidget):
+    """
+    Mostra uma página do histórico por vez; "Carregar mais" busca a página
+    seguinte a partir do cursor (data_hora, id) da última linha exibida.
+    Se a busca falhar, o erro aparece abaixo da tabela e o botão continua
+    ativo para tentar a mesma página de novo.
+    """
+    def __init__(self, tamanho_pagina: int = 50, parent=None):
+        super().__init__(parent)
+        self.tamanho_pagina = tamanho_pagina
+        self.filtros = {}
+        self._cursor = None
+        # Respostas de uma recarga anterior à atual são descartadas
+        self._geracao = 0
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.tabela = QTableWidget()
+        self.tabela.setColumnCount(len(COLUNAS_HISTORICO))
+        self.tabela.setHorizontalHeaderLabels(COLUNAS_HISTORICO)
+        layout.addWidget(self.tabela)
+
+        self.lbl_erro = QLabel()
+        self.lbl_erro.setStyleSheet("color:red;")
+        self.lbl_erro.setVisible(False)
+        layout.addWidget(self.lbl_erro)
+
+        self.btn_mais = QPushButton("⬇️ Carregar mais")
+        self.btn_mais.clicked.connect(self.carregar_mais)
+        layout.addWidget(self.btn_mais)
+        self.setLayout(layout)
+
+    def recarregar(self, **filtros):
+        """
+        Volta à primeira página (as movimentações mais recentes).
+
+        :param filtros: filtros de buscar_movimentacoes (usuario_id,
+                        ferramenta_id, acoes, data_inicio, data_fim); sem
+                        argumentos, mantém os filtros atuais
+        """
+        if filtros:
+            self.filtros = {k: v for k, v in filtros.items() if v is not None}
+        self._cursor = None
+        self._geracao += 1
+        self.tabela.setRowCount(0)
+        self.carregar_mais()
+
+    def limpar_filtros(self):
+        self.filtros = {}
+        self.recarregar()
+
+    def carregar_mais(self):
+        self.btn_mais.setEnabled(False)
+        self.btn_mais.setText("⏳ Carregando...")
+        geracao = self._geracao
+        executar_no_banco(
+            buscar_movimentacoes,
+            apos=self._cursor, limite=self.tamanho_pagina, **self.filtros,
+            ao_concluir=lambda pagina: self._exibir_pagina(geracao, pagina),
+            ao_falhar=lambda erro: self._exibir_falha(geracao, erro)
+        )
+
+    def _exibir_falha(self, geracao, erro):
+        if geracao != self._geracao:
+            return
+        # O cursor não muda: "Carregar mais" tenta a mesma página
+        self.lbl_erro.setText(f"⚠️ Erro ao carregar o histórico: {erro}")
+        self.lbl_erro.setVisible(True)
+        self.btn_mais.setText("🔄 Tentar de novo")
+        self.btn_mais.setEnabled(True)
+
+    def _exibir_pagina(self, geracao, pagina):
+        if geracao != self._geracao:
+            return
+        linhas, self._cursor = pagina
+        self.lbl_erro.setVisible(False)
+        self.btn_mais.setText("⬇️ Carregar mais")
+        for linha in linhas:
+            r = self.tabela.rowCount()
+            self.tabela.insertRow(r)
+            for c, item in enumerate(linha):
+                self.tabela.setItem(r, c, QTableWidgetItem("" if item is None else str(item)))
+        self.btn_mais.setEnabled(self._cursor is not None)
@@ -1,13 +1,16 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton, QLineEdit, QFormLayout,
     QMessageBox, QSpinBox, QTableWidget, QTableWidgetItem, QDialog,
-    QDialogButtonBox, QHeaderView
+    QDialogButtonBox, QHeaderView, QCheckBox, QHBoxLayout
 )
 from PyQt5.QtCore import Qt
 
-from utils.movimentacoes import realizar_movimentacao
-from database.database import buscar_ferramenta_por_codigo, buscar_ultimas_movimentacoes
+from utils.movimentacoes import realizar_movimentacao, realizar_movimentacoes_em_lote
+from database.database import buscar_ferramenta_por_codigo
 from database.database_utils import buscar_estoque_ativo_usuario
+from telas.historico import TabelaHistorico
+from telas.busca_ferramentas import CampoBuscaFerramentas
+from interface.trabalhador_banco import executar_no_banco
 
 
 class DialogoConsumo(QDialog):
@@ -235,12 +238,25 @@ class TelaMovimentacao(QWidget):
     """
     Tela de movimentação de ferramentas.
     Permite retirada, devolução e consumo, exibe últimas movimentações e estoque ativo do usuário.
+    As consultas e gravações rodam no trabalhador de banco; enquanto uma
+    operação está pendente, os botões de ação ficam desabilitados.
+
+    No modo lote, cada leitura só acrescenta o código ao carrinho (sem ir
+    ao banco); Retirar/Devolver validam e gravam o carrinho inteiro numa
+    única transação e as tabelas são atualizadas uma vez.
+
+    Sem etiqueta, a ferramenta pode ser escolhida pela busca por descrição
+    (telas/busca_ferramentas.py), como se o código tivesse sido escaneado.
     """
     def __init__(self, navegacao, rfid_usuario):
         super().__init__()
         self.navegacao = navegacao
         self.rfid_usuario = rfid_usuario
         self.dados_ferramenta = None
+        self.saldo_ativo = 0
+        self.carrinho = {}
+        # Operação enviada ao trabalhador de banco e ainda sem resposta
+        self._pendente = False
         self._init_ui()
 
 
@@ -254,6 +270,7 @@ class TelaMovimentacao(QWidget):
         self.layout.addWidget(self._criar_label_titulo())
         self.layout.addLayout(self._criar_formulario())
         self.layout.addLayout(self._criar_botoes())
+        self.layout.addWidget(self._criar_carrinho())
         self.layout.addWidget(QLabel("📜 Últimas Movimentações:"))
         self.layout.addWidget(self._criar_tabela_logs())
         self.layout.addWidget(QLabel("🎒 Estoque Ativo do Usuário:"))
@@ -271,8 +288,14 @@ class TelaMovimentacao(QWidget):
         form = QFormLayout()
         self.codigo_input = QLineEdit()
         self.codigo_input.setPlaceholderText("🔹 Escaneie o código de barras")
-        self.codigo_input.returnPressed.connect(self.buscar_dados_peca)
+        self.codigo_input.returnPressed.connect(self._ao_escanear)
         form.addRow("Código de Barras:", self.codigo_input)
+        self.busca = CampoBuscaFerramentas()
+        self.busca.selecionada.connect(self._selecionar_da_busca)
+        form.addRow("Buscar:", self.busca)
+        self.chk_lote = QCheckBox("🛒 Modo lote (carrinho)")
+        self.chk_lote.toggled.connect(self._alternar_modo_lote)
+        form.addRow(self.chk_lote)
         self.lbl_descricao = QLabel("🔎 Descrição: -")
         self.lbl_estoque = QLabel("📦 Almoxarifado: - | Ativo: -")
         self.lbl_consumivel = QLabel("🔁 Consumível: -")
@@ -289,12 +312,12 @@ class TelaMovimentacao(QWidget):
 
     def _criar_botoes(self):
         v = QVBoxLayout()
-        btn_r = QPushButton("🔴 Retirar")
-        btn_r.clicked.connect(lambda: self._executar_acao('RETIRADA'))
-        v.addWidget(btn_r)
-        btn_d = QPushButton("🟢 Devolver")
-        btn_d.clicked.connect(lambda: self._executar_acao('DEVOLUCAO'))
-        v.addWidget(btn_d)
+        self.btn_r = QPushButton("🔴 Retirar")
+        self.btn_r.clicked.connect(lambda: self._executar_acao('RETIRADA'))
+        v.addWidget(self.btn_r)
+        self.btn_d = QPushButton("🟢 Devolver")
+        self.btn_d.clicked.connect(lambda: self._executar_acao('DEVOLUCAO'))
+        v.addWidget(self.btn_d)
         self.btn_c = QPushButton("🔶 Consumir")
         self.btn_c.clicked.connect(lambda: self._executar_acao('CONSUMO'))
         self.btn_c.setEnabled(False)
@@ -304,14 +327,30 @@ class TelaMovimentacao(QWidget):
         v.addWidget(btn_volt)
         return v
 
+    def _criar_carrinho(self):
+        self.painel_carrinho = QWidget()
+        v = QVBoxLayout(self.painel_carrinho)
+        v.setContentsMargins(0, 0, 0, 0)
+        v.addWidget(QLabel("🛒 Carrinho:"))
+        self.table_carrinho = QTableWidget()
+        self.table_carrinho.setColumnCount(2)
+        self.table_carrinho.setHorizontalHeaderLabels(["Código","Qtd"])
+        v.addWidget(self.table_carrinho)
+        h = QHBoxLayout()
+        btn_rem = QPushButton("➖ Remover item")
+        btn_rem.clicked.connect(self._remover_do_carrinho)
+        h.addWidget(btn_rem)
+        btn_limpar = QPushButton("🗑️ Limpar carrinho")
+        btn_limpar.clicked.connect(self._limpar_carrinho)
+        h.addWidget(btn_limpar)
+        v.addLayout(h)
+        self.painel_carrinho.setVisible(False)
+        return self.painel_carrinho
+
     def _criar_tabela_logs(self):
-        self.table_logs = QTableWidget()
-        self.table_logs.setColumnCount(9)
-        self.table_logs.setHorizontalHeaderLabels([
-            "Data/Hora","Operador","Código","Descrição",
-            "Tipo","Qtd","Motivo","Operações","Avaliação"
-        ])
-        return self.table_logs
+        self.historico = TabelaHistorico()
+        self.table_logs = self.historico.tabela
+        return self.historico
 
     def _criar_tabela_estoque_ativo(self):
         self.table_ativo = QTableWidget()
@@ -332,17 +371,132 @@ class TelaMovimentacao(QWidget):
             return None
         return cod
 
+    def _definir_pendente(self, pendente, texto=""):
+        # Estado de espera enquanto o trabalhador de banco processa a operação; o carrinho,
+        # a busca e o modo lote ficam travados para não mudar o que está sendo registrado
+        self._pendente = pendente
+        self.codigo_input.setEnabled(not pendente)
+        self.busca.setEnabled(not pendente)
+        self.chk_lote.setEnabled(not pendente)
+        self.painel_carrinho.setEnabled(not pendente)
+        self.btn_r.setEnabled(not pendente)
+        self.btn_d.setEnabled(not pendente)
+        consumivel = (not self.chk_lote.isChecked() and bool(self.dados_ferramenta)
+                      and self.dados_ferramenta['consumivel']=='SIM')
+        self.btn_c.setEnabled(not pendente and consumivel)
+        self.label_status.setStyleSheet("color:gray;font-weight:normal;")
+        self.label_status.setText(texto)
+
+    def _falha_banco(self, erro):
+        self._definir_pendente(False)
+        self._aplicar_feedback_erro(f"⚠️ Erro no banco de dados: {erro}")
+
+    def _ao_escanear(self):
+        if self.chk_lote.isChecked():
+            self._adicionar_ao_carrinho()
+        else:
+            self.buscar_dados_peca()
+
+    def _selecionar_da_busca(self, cod):
+        if self._pendente:
+            return
+        # Como se a etiqueta tivesse sido escaneada
+        self.codigo_input.setText(cod)
+        self._ao_escanear()
+
+    def _alternar_modo_lote(self, ativo):
+        self.painel_carrinho.setVisible(ativo)
+        self._limpar_campos()
+        self.dados_ferramenta = None
+        self.btn_r.setText("🔴 Retirar carrinho" if ativo else "🔴 Retirar")
+        self.btn_d.setText("🟢 Devolver carrinho" if ativo else "🟢 Devolver")
+        self._definir_pendente(False)
+        self.codigo_input.setFocus()
+
+    def _adicionar_ao_carrinho(self):
+        # Só a leitura: a validação fica para o envio do lote
+        cod = self.validar_campos()
+        if not cod: return
+        self.carrinho[cod] = self.carrinho.get(cod, 0) + self.spin_qtd.value()
+        self.codigo_input.clear()
+        self.spin_qtd.setValue(1)
+        self._exibir_carrinho()
+
+    def _remover_do_carrinho(self):
+        r = self.table_carrinho.currentRow()
+        if r < 0: return
+        self.carrinho.pop(self.table_carrinho.item(r,0).text(), None)
+        self._exibir_carrinho()
+
+    def _limpar_carrinho(self):
+        self.carrinho.clear()
+        self._exibir_carrinho()
+
+    def _exibir_carrinho(self):
+        self.table_carrinho.setRowCount(0)
+        for cod,q in self.carrinho.items():
+            r=self.table_carrinho.rowCount()
+            self.table_carrinho.insertRow(r)
+            self.table_carrinho.setItem(r,0,QTableWidgetItem(cod))
+            self.table_carrinho.setItem(r,1,QTableWidgetItem(str(q)))
+        total=sum(self.carrinho.values())
+        self.label_status.setStyleSheet("color:black;font-weight:normal;")
+        self.label_status.setText(f"🛒 {len(self.carrinho)} itens, {total} unidades no carrinho" if self.carrinho else "")
+
+    def _executar_lote(self, acao):
+        if not self.carrinho:
+            self._aplicar_feedback_erro("Carrinho vazio.")
+            return
+        self._definir_pendente(True, f"⏳ Registrando {len(self.carrinho)} itens...")
+        enviados = list(self.carrinho.items())
+        executar_no_banco(realizar_movimentacoes_em_lote, self.rfid_usuario, enviados, acao,
+                          ao_concluir=lambda resp: self._concluir_lote(resp, enviados),
+                          ao_falhar=self._falha_banco)
+
+    def _concluir_lote(self, resp, enviados):
+        self._definir_pendente(False)
+        if resp.get('status'):
+            # Só o que foi registrado sai do carrinho
+            for cod, q in enviados:
+                restante = self.carrinho.get(cod, 0) - q
+                if restante > 0:
+                    self.carrinho[cod] = restante
+                else:
+                    self.carrinho.pop(cod, None)
+            self._exibir_carrinho()
+            self._resetar_feedback_visual()
+            self.label_status.setText(resp.get('mensagem'))
+            self.carregar_ultimas_movimentacoes()
+            self.carregar_estoque_ativo()
+        else:
+            # O carrinho é mantido para o operador corrigir os itens recusados
+            self._aplicar_feedback_erro(resp.get('mensagem'))
+            if resp.get('erros'):
+                self._exibir_mensagem("Lote recusado","\n".join(resp['erros']),'warning')
+
     def buscar_dados_peca(self):
         cod = self.validar_campos()
         if not cod: return
+        self._definir_pendente(True, "⏳ Buscando ferramenta...")
+        executar_no_banco(self._consultar_peca, cod,
+                          ao_concluir=self._exibir_dados_peca, ao_falhar=self._falha_banco)
+
+    def _consultar_peca(self, cod):
+        # Roda no trabalhador de banco
         d = buscar_ferramenta_por_codigo(cod)
+        if not d: return None, 0
+        ativos = buscar_estoque_ativo_usuario(self.rfid_usuario)
+        return d, next((r[3] for r in ativos if r[0]==d['id']),0)
+
+    def _exibir_dados_peca(self, resultado):
+        d, sal = resultado
+        self._definir_pendente(False)
         if not d:
             self._exibir_mensagem("Erro","Ferramenta não encontrada.",'warning')
             self._limpar_campos()
             return
         self.dados_ferramenta = {'id':d['id'],'nome':d['nome'],'estoque_almoxarifado':d['estoque_almoxarifado'],'consumivel':d['consumivel']}
-        ativos = buscar_estoque_ativo_usuario(self.rfid_usuario)
-        sal = next((r[3] for r in ativos if r[0]==d['id']),0)
+        self.saldo_ativo = sal
         self.lbl_descricao.setText(f"🔎 Descrição: {d['nome']}")
         self.lbl_estoque.setText(f"📦 Almoxarifado: {d['estoque_almoxarifado']} | Ativo: {sal}")
         self.lbl_consumivel.setText(d['consumivel'])
@@ -350,14 +504,17 @@ class TelaMovimentacao(QWidget):
         self.btn_c.setEnabled(d['consumivel']=='SIM')
 
     def _executar_acao(self, acao):
+        if self.chk_lote.isChecked():
+            self._executar_lote(acao)
+            return
         cod = self.validar_campos()
         if not cod or not self.dados_ferramenta:
             self._aplicar_feedback_erro("Nenhuma ferramenta selecionada.")
             return
         q = self.spin_qtd.value()
+        # Pré-validação com os dados da última consulta; o banco valida de novo na transação
         disp = self.dados_ferramenta['estoque_almoxarifado']
-        ativos = buscar_estoque_ativo_usuario(self.rfid_usuario)
-        saldo = next((r[3] for r in ativos if r[0]==self.dados_ferramenta['id']),0)
+        saldo = self.saldo_ativo
         if acao=='RETIRADA' and q>disp:
             self._aplicar_feedback_erro("Estoque insuficiente.")
             return
@@ -372,12 +529,19 @@ class TelaMovimentacao(QWidget):
             dlg=DialogoConsumo(self)
             if dlg.exec_()!=QDialog.Accepted: return
             motivo,ops,aval=dlg.get_values()
-            resp=realizar_movimentacao(self.rfid_usuario,cod,acao,q,motivo,ops,aval)
+            args=(self.rfid_usuario,cod,acao,q,motivo,ops,aval)
         else:
-            resp=realizar_movimentacao(self.rfid_usuario,cod,acao,q)
+            args=(self.rfid_usuario,cod,acao,q)
+        self._definir_pendente(True, "⏳ Registrando movimentação...")
+        executar_no_banco(realizar_movimentacao, *args,
+                          ao_concluir=self._concluir_acao, ao_falhar=self._falha_banco)
+
+    def _concluir_acao(self, resp):
+        self._definir_pendente(False)
         ok=resp.get('status') if isinstance(resp,dict) else False
         msg=resp.get('mensagem') if isinstance(resp,dict) else str(resp)
         if ok:
+            self._resetar_feedback_visual()
             self.label_status.setText(msg)
             self._limpar_campos()
             self.carregar_ultimas_movimentacoes()
@@ -403,16 +567,14 @@ class TelaMovimentacao(QWidget):
         self.spin_qtd.setValue(1)
 
     def carregar_ultimas_movimentacoes(self):
-        dados=buscar_ultimas_movimentacoes()
-        self.table_logs.setRowCount(0)
-        for linha in dados:
-            r=self.table_logs.rowCount()
-            self.table_logs.insertRow(r)
-            for c,item in enumerate(linha):
-                self.table_logs.setItem(r,c,QTableWidgetItem(str(item)))
+        # Só a primeira página; as demais vêm pelo "Carregar mais"
+        self.historico.recarregar()
 
     def carregar_estoque_ativo(self):
-        dados=buscar_estoque_ativo_usuario(self.rfid_usuario)
+        executar_no_banco(buscar_estoque_ativo_usuario, self.rfid_usuario,
+                          ao_concluir=self._exibir_estoque_ativo)
+
+    def _exibir_estoque_ativo(self, dados):
         self.table_ativo.setRowCount(0)
         for fid,nome,cod,sal in dados:
             r=self.table_ativo.rowCount()
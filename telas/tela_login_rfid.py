@@ -2,7 +2,7 @@ from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QMessageBox, QLineEdit
 from PyQt5.QtCore import QDateTime, Qt
 import os
 from database.config import DATABASE_CAMINHO
-from database.database_utils import executar_query
+from database.diretorio_usuarios import buscar_usuario_por_rfid
 
 class TelaLoginRFID(QWidget):
     def __init__(self, navegacao, definir_perfil_callback):
@@ -67,12 +67,11 @@ class TelaLoginRFID(QWidget):
         # Limpa o campo para permitir nova leitura, se necessário
         self.input_rfid.clear()
 
-        # Consulta o banco de dados para verificar o usuário
-        query = "SELECT tipo, nome FROM usuarios WHERE rfid = ?"
-        resultado = executar_query(query, (rfid_code,), fetch_one=True)
+        # Verifica o usuário no diretório em memória
+        usuario = buscar_usuario_por_rfid(rfid_code)
 
-        if resultado:
-            tipo, nome = resultado
+        if usuario:
+            tipo, nome = usuario["tipo"], usuario["nome"]
             print(f"Usuário encontrado: {nome} (Tipo: {tipo})")
             self.definir_perfil_callback(tipo, rfid_code)
             self.navegacao.mostrar_tela("painel")
@@ -1,4 +1,4 @@
-from database.database_utils import executar_query
+from database.database import buscar_ferramenta_por_codigo
 
 def read_barcode():
     """
@@ -16,13 +16,9 @@ def search_item_by_barcode(barcode):
     """
     Busca no banco de dados o item correspondente ao código de barras informado.
     Retorna um dicionário com os dados do item ou None se não for encontrado.
+    A consulta passa pelo cache de ferramentas, como nas telas.
     """
-    query = "SELECT id, nome, estoque_almoxarifado FROM ferramentas WHERE codigo_barra = ?"
-    resultado = executar_query(query, (barcode,), fetch=True)
-    if resultado and resultado[0]:
-        item_id, nome, estoque_almoxarifado = resultado[0]
-        return {"id": item_id, "nome": nome, "estoque_almoxarifado": estoque_almoxarifado}
-    return None
+    return buscar_ferramenta_por_codigo(barcode)
 
 def get_item_from_barcode():
     """
@@ -1,43 +1,205 @@
+#!/usr/bin/env python3
+"""
+utils/consulta_planilha.py
+
+Consulta de produtos na planilha "Consulta Produtos IP.xlsx" por Ref. Sistema.
+
+A planilha é lida uma única vez, em lotes (database/leitura_planilha),
+para um dicionário em memória, indexado
+pela referência em maiúsculas. Cada consulta só confere a data de
+modificação e o tamanho do arquivo (os.stat) e relê a planilha quando um
+deles muda.
+
+Com config.CATALOGO_IP_PERSISTIR, o catálogo lido é gravado numa tabela
+SQLite (config.CATALOGO_IP_CAMINHO, chave primária na referência) junto
+com a assinatura da planilha; enquanto a planilha não mudar, os próximos
+inícios do sistema carregam a tabela em vez de abrir o Excel.
+
+    python -m utils.consulta_planilha IP0001 [IP0002 ...]
+"""
 import os
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from contextlib import closing
+from typing import Dict, Optional, Tuple
+
 import pandas as pd
 
+import database.config as config
+from database.leitura_planilha import ler_planilha_em_lotes
+
+logger = logging.getLogger(__name__)
+
+# Coluna da planilha -> chave do registro retornado
+COLUNAS = {
+    "Descrição": "descricao",
+    "Código": "codigo",
+    "Un. Estoque": "un_estoque",
+    "Tipo": "tipo",
+    "Classificação": "classificacao",
+    "Consumível": "consumivel",
+}
+
+DDL_CATALOGO = [
+    """
+    CREATE TABLE IF NOT EXISTS origem (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        caminho TEXT NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        tamanho INTEGER NOT NULL
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS produtos_ip (
+        ref_sistema TEXT PRIMARY KEY,
+        {", ".join(f"{chave} TEXT" for chave in COLUNAS.values())}
+    ) WITHOUT ROWID
+    """,
+]
+
+Assinatura = Tuple[str, int, int]
+
+
+def catalogo_de_planilha(df: pd.DataFrame) -> Dict[str, dict]:
+    """Converte a planilha no dicionário {Ref. Sistema em maiúsculas: registro}."""
+    tabela = pd.DataFrame({
+        chave: df[coluna].astype("string").str.strip() if coluna in df.columns else ""
+        for coluna, chave in COLUNAS.items()
+    }).fillna("")
+    tabela["consumivel"] = tabela["consumivel"].str.upper()
+    tabela.index = df["Ref. Sistema"].astype("string").str.strip().str.upper()
+    tabela = tabela[tabela.index.notna() & (tabela.index != "")]
+    # Referência repetida: vale a última linha, como na importação de ferramentas
+    tabela = tabela[~tabela.index.duplicated(keep="last")]
+    return tabela.to_dict("index")
+
+
+class CatalogoIP:
+    """Catálogo da planilha em memória, recarregado quando o arquivo muda."""
+
+    def __init__(self, caminho: Optional[str] = None, persistir: Optional[bool] = None,
+                 caminho_persistido: Optional[str] = None):
+        self.caminho = caminho or config.PLANILHA_IP_CAMINHO
+        self.persistir = config.CATALOGO_IP_PERSISTIR if persistir is None else persistir
+        self.caminho_persistido = caminho_persistido or config.CATALOGO_IP_CAMINHO
+        self._lock = threading.Lock()
+        self._itens: Dict[str, dict] = {}
+        self._assinatura: Optional[Assinatura] = None
+        self._conferido = False
+        self.consultas = 0
+        self.leituras_planilha = 0
+        self.leituras_persistidas = 0
+
+    def _assinatura_atual(self) -> Optional[Assinatura]:
+        try:
+            estado = os.stat(self.caminho)
+        except OSError:
+            return None
+        return os.path.abspath(self.caminho), estado.st_mtime_ns, estado.st_size
+
+    def _carregar_persistido(self, assinatura: Assinatura) -> Optional[Dict[str, dict]]:
+        if not os.path.exists(self.caminho_persistido):
+            return None
+        try:
+            with closing(sqlite3.connect(self.caminho_persistido)) as conn:
+                origem = conn.execute("SELECT caminho, mtime_ns, tamanho FROM origem WHERE id = 1").fetchone()
+                if origem != assinatura:
+                    return None
+                colunas = ", ".join(COLUNAS.values())
+                linhas = conn.execute(f"SELECT ref_sistema, {colunas} FROM produtos_ip").fetchall()
+        except sqlite3.Error:
+            logger.exception("Catálogo persistido ilegível em %s; relendo a planilha", self.caminho_persistido)
+            return None
+        return {ref: dict(zip(COLUNAS.values(), valores)) for ref, *valores in linhas}
+
+    def _persistir(self, assinatura: Assinatura, itens: Dict[str, dict]) -> None:
+        try:
+            with closing(sqlite3.connect(self.caminho_persistido)) as conn, conn:
+                for ddl in DDL_CATALOGO:
+                    conn.execute(ddl)
+                conn.execute("DELETE FROM produtos_ip")
+                conn.executemany(
+                    f"INSERT INTO produtos_ip VALUES (?, {', '.join('?' * len(COLUNAS))})",
+                    ((ref, *registro.values()) for ref, registro in itens.items())
+                )
+                conn.execute("INSERT OR REPLACE INTO origem VALUES (1, ?, ?, ?)", assinatura)
+        except sqlite3.Error:
+            logger.exception("Falha ao gravar o catálogo em %s", self.caminho_persistido)
+
+    def _atualizar(self) -> None:
+        assinatura = self._assinatura_atual()
+        if self._conferido and assinatura == self._assinatura:
+            return
+        self._conferido = True
+        if assinatura is None:
+            logger.warning("Planilha de consulta não encontrada: %s", self.caminho)
+            self._itens, self._assinatura = {}, None
+            return
+
+        inicio = time.perf_counter()
+        itens = self._carregar_persistido(assinatura) if self.persistir else None
+        if itens is not None:
+            self.leituras_persistidas += 1
+            origem = "tabela persistida"
+        else:
+            # Lote a lote: só o dicionário final fica na memória, não a planilha inteira
+            itens = {}
+            for lote in ler_planilha_em_lotes(self.caminho, colunas=("Ref. Sistema", *COLUNAS)):
+                itens.update(catalogo_de_planilha(lote))
+            self.leituras_planilha += 1
+            origem = "planilha"
+            if self.persistir:
+                self._persistir(assinatura, itens)
+        self._itens, self._assinatura = itens, assinatura
+        logger.info("Catálogo IP carregado da %s: %d produtos em %.0f ms",
+                    origem, len(itens), (time.perf_counter() - inicio) * 1000)
+
+    def buscar(self, ref_sistema: str) -> Optional[dict]:
+        """Registro da referência (sem diferenciar maiúsculas), ou None."""
+        with self._lock:
+            self.consultas += 1
+            self._atualizar()
+            registro = self._itens.get(str(ref_sistema).strip().upper())
+        return dict(registro) if registro is not None else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._atualizar()
+            return len(self._itens)
+
+
+catalogo_ip = CatalogoIP()
+
+
 def buscar_ferramenta_por_ip(ip_codigo: str) -> dict | None:
     """
-    Busca na planilha 'Consulta Produtos IP.xlsx' os dados correspondentes ao código de IP informado.
+    Busca no catálogo da planilha 'Consulta Produtos IP.xlsx' os dados correspondentes ao código de IP informado.
 
     Args:
         ip_codigo (str): Código de referência a ser buscado (a busca é feita em caixa alta).
 
     Returns:
-        dict: Dados do produto encontrados com as chaves "descricao", "codigo", "un_estoque", "tipo" e "classificacao".
+        dict: Dados do produto encontrados com as chaves "descricao", "codigo", "un_estoque", "tipo",
+              "classificacao" e "consumivel".
         None: Caso a planilha não seja encontrada, ocorra erro na leitura ou nenhum resultado seja encontrado.
     """
-    # Define o caminho até a planilha
-    pasta_dados = os.path.join(os.path.dirname(__file__), 'dados')
-    caminho_planilha = os.path.join(pasta_dados, "Consulta Produtos IP.xlsx")
-
-    if not os.path.exists(caminho_planilha):
-        print("⚠️ Planilha de consulta não encontrada.")
-        return None
-
     try:
-        df = pd.read_excel(caminho_planilha)
+        return catalogo_ip.buscar(ip_codigo)
     except Exception as e:
         print(f"❌ Erro ao ler a planilha: {e}")
         return None
 
-    # Realiza a busca filtrando o DataFrame pelo código de IP convertido para maiúsculas
-    resultado = df[df['Ref. Sistema'] == ip_codigo.upper()]
-    
-    if not resultado.empty:
-        info = resultado.iloc[0]
-        return {
-            "descricao": info.get("Descrição", ""),
-            "codigo": info.get("Código", ""),
-            "un_estoque": info.get("Un. Estoque", ""),
-            "tipo": info.get("Tipo", ""),
-            "classificacao": info.get("Classificação", ""),
-            "consumivel": str(info.get("Consumível", "")).strip().upper()
-        }
-    else:
-        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consulta produtos da planilha IP por Ref. Sistema")
+    parser.add_argument("referencias", nargs="+")
+    parser.add_argument("--planilha", help="Planilha a consultar (padrão: config.PLANILHA_IP_CAMINHO)")
+    args = parser.parse_args()
+    if args.planilha:
+        catalogo_ip = CatalogoIP(args.planilha)
+    for referencia in args.referencias:
+        produto = catalogo_ip.buscar(referencia)
+        print(f"✅ {referencia.upper()}: {produto}" if produto else f"⚠️ {referencia.upper()}: não encontrada")
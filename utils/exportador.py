@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+utils/exportador.py
+
+Exportação em fluxo para Excel (.xlsx) ou CSV.
+
+As linhas saem do cursor em lotes (fetchmany) e vão direto para o arquivo:
+no .xlsx, por uma pasta de trabalho do openpyxl em modo write_only; no
+.csv, pelo módulo csv. A memória fica constante qualquer que seja o
+tamanho da tabela, ao contrário de pd.read_sql_query + DataFrame.to_excel,
+que monta a tabela inteira na memória antes de gravar o primeiro byte.
+
+Uma planilha do Excel aceita 1.048.576 linhas; tabelas maiores continuam
+em novas abas (logs, logs_2, …). O CSV não tem limite.
+
+O arquivo é gravado com sufixo .tmp e renomeado no fim, então uma
+exportação interrompida não deixa arquivo pela metade no destino.
+
+exportar_tabelas() exporta várias tabelas ao mesmo tempo, uma por processo
+(a montagem do .xlsx ocupa a CPU e, em threads, ficaria presa ao GIL), com
+progresso por tabela e cancelamento.
+
+exportar_incremental() grava num destino só os logs ainda não enviados a
+ele (marca d'água por destino em marcas_exportacao): a exportação diária
+para o ERP custa o movimento do dia, não o histórico inteiro.
+
+    python -m utils.exportador logs /caminho/logs.xlsx
+    python -m utils.exportador --todas /caminho/pasta
+    python -m utils.exportador --incremental /caminho/erp.csv
+"""
+import os
+import csv
+import queue
+import sqlite3
+import logging
+import argparse
+import threading
+import multiprocessing
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from openpyxl import Workbook
+
+import database.config as config
+
+logger = logging.getLogger(__name__)
+
+# Linhas lidas do banco por vez
+LOTE_PADRAO = 5000
+
+# Linhas de dados por aba do .xlsx (o limite do Excel, menos o cabeçalho)
+LINHAS_POR_PLANILHA = 1_048_575
+
+# CSV para o Excel em português: separador ';' e BOM para os acentos
+CSV_DELIMITADOR = ";"
+CSV_CODIFICACAO = "utf-8-sig"
+
+Progresso = Callable[[int, Optional[int]], None]
+ProgressoTabela = Callable[[str, int, Optional[int]], None]
+
+
+class ExportacaoCancelada(Exception):
+    """Exportação interrompida a pedido do usuário."""
+
+
+def _gravar_xlsx(destino: str, cabecalho: Sequence[str], lotes: Iterable[Sequence[tuple]],
+                 nome_planilha: str, progresso: Optional[Progresso], total: Optional[int]) -> int:
+    pasta = Workbook(write_only=True)
+    planilha, linhas_na_planilha, abas, escritas = None, LINHAS_POR_PLANILHA, 0, 0
+    try:
+        for lote in lotes:
+            for linha in lote:
+                if linhas_na_planilha == LINHAS_POR_PLANILHA:
+                    abas += 1
+                    planilha = pasta.create_sheet(nome_planilha if abas == 1 else f"{nome_planilha}_{abas}")
+                    planilha.append(list(cabecalho))
+                    linhas_na_planilha = 0
+                planilha.append(linha)
+                linhas_na_planilha += 1
+            escritas += len(lote)
+            if progresso:
+                progresso(escritas, total)
+    except BaseException:
+        # Fecha os arquivos temporários das abas já abertas antes de desistir
+        for aba in pasta.worksheets:
+            if not aba.closed:
+                aba.close()
+        raise
+    if planilha is None:
+        pasta.create_sheet(nome_planilha).append(list(cabecalho))
+    pasta.save(destino)
+    return escritas
+
+
+def _gravar_csv(destino: str, cabecalho: Sequence[str], lotes: Iterable[Sequence[tuple]],
+                progresso: Optional[Progresso], total: Optional[int]) -> int:
+    escritas = 0
+    with open(destino, "w", newline="", encoding=CSV_CODIFICACAO) as arquivo:
+        escritor = csv.writer(arquivo, delimiter=CSV_DELIMITADOR)
+        escritor.writerow(cabecalho)
+        for lote in lotes:
+            escritor.writerows(lote)
+            escritas += len(lote)
+            if progresso:
+                progresso(escritas, total)
+    return escritas
+
+
+def exportar_lotes(lotes: Iterable[Sequence[tuple]], cabecalho: Sequence[str], caminho: str,
+                   nome_planilha: str = "dados", progresso: Optional[Progresso] = None,
+                   total: Optional[int] = None) -> int:
+    """
+    Grava os lotes de linhas em `caminho` (.csv ou .xlsx, pela extensão).
+
+    :param progresso: chamado após cada lote com (linhas gravadas, total)
+    :param total: total de linhas esperado, repassado ao progresso (ou None)
+    :return: número de linhas gravadas
+    """
+    temporario = caminho + ".tmp"
+    try:
+        if caminho.lower().endswith(".csv"):
+            escritas = _gravar_csv(temporario, cabecalho, lotes, progresso, total)
+        else:
+            escritas = _gravar_xlsx(temporario, cabecalho, lotes, nome_planilha[:31], progresso, total)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    return escritas
+
+
+def exportar_consulta(sql: str, caminho: str, parametros: Sequence = (), nome_planilha: str = "dados",
+                      lote: int = LOTE_PADRAO, progresso: Optional[Progresso] = None,
+                      contar: bool = True) -> int:
+    """
+    Exporta o resultado de `sql` em fluxo, com os nomes das colunas no cabeçalho.
+
+    Usa uma conexão própria em config.DATABASE_CAMINHO: a leitura longa não
+    ocupa a conexão da thread e enxerga um único instante do banco (a
+    transação de leitura dura a exportação inteira; com WAL, as gravações
+    do quiosque seguem normalmente).
+
+    :param contar: faz um COUNT(*) antes, para o progresso ter o total
+    :return: número de linhas gravadas
+    """
+    with closing(sqlite3.connect(config.DATABASE_CAMINHO, timeout=30, isolation_level=None)) as conn:
+        conn.execute("BEGIN")
+        total = conn.execute(f"SELECT COUNT(*) FROM ({sql})", parametros).fetchone()[0] if contar else None
+        cursor = conn.execute(sql, parametros)
+        cabecalho = [coluna[0] for coluna in cursor.description]
+        lotes = iter(lambda: cursor.fetchmany(lote), [])
+        escritas = exportar_lotes(lotes, cabecalho, caminho, nome_planilha, progresso, total)
+        conn.execute("COMMIT")
+    logger.info("%d linha(s) exportada(s) em %s", escritas, caminho)
+    return escritas
+
+
+def exportar_tabela(nome_tabela: str, caminho: str, lote: int = LOTE_PADRAO,
+                    progresso: Optional[Progresso] = None) -> int:
+    """Exporta uma tabela inteira (na ordem do rowid, quando houver) para `caminho`."""
+    with closing(sqlite3.connect(config.DATABASE_CAMINHO)) as conn:
+        existe = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (nome_tabela,)
+        ).fetchone()
+    if existe is None:
+        raise ValueError(f"Tabela inexistente: {nome_tabela}")
+    ordem = "" if "WITHOUT ROWID" in (existe[0] or "").upper() else " ORDER BY rowid"
+    return exportar_consulta(f'SELECT * FROM "{nome_tabela}"{ordem}', caminho,
+                             nome_planilha=nome_tabela, lote=lote, progresso=progresso)
+
+
+# Ledger com os nomes, na ordem dos ids, para as exportações incrementais. LEFT JOIN:
+# um usuário ou ferramenta excluído não pode sumir com a linha enquanto a marca avança
+SELECT_LOGS_DETALHADOS = """
+    SELECT l.id AS log_id, l.data_hora, l.usuario_id, u.nome AS usuario, f.codigo_barra,
+           f.nome AS ferramenta, l.acao, l.quantidade, l.motivo, l.operacoes, l.avaliacao
+    FROM logs l
+    LEFT JOIN usuarios u ON u.id = l.usuario_id
+    LEFT JOIN ferramentas f ON f.id = l.ferramenta_id
+    WHERE l.id > ? AND l.id <= ?
+    ORDER BY l.id
+"""
+
+
+def _chave_destino(destino: str) -> str:
+    """O mesmo arquivo sempre com a mesma marca, qualquer que seja a grafia do caminho."""
+    return os.path.normcase(os.path.abspath(destino))
+
+
+def _anexar_csv(caminho: str, cabecalho: Sequence[str], lotes: Iterable[Sequence[tuple]],
+                progresso: Optional[Progresso], total: Optional[int]) -> int:
+    """
+    Acrescenta os lotes ao fim do CSV (com cabeçalho, se o arquivo é novo).
+    Em caso de erro, o arquivo volta ao tamanho que tinha.
+    """
+    tamanho = os.path.getsize(caminho) if os.path.exists(caminho) else None
+    escritas = 0
+    try:
+        with open(caminho, "a", newline="", encoding=CSV_CODIFICACAO) as arquivo:
+            escritor = csv.writer(arquivo, delimiter=CSV_DELIMITADOR)
+            if not tamanho:
+                escritor.writerow(cabecalho)
+            for lote in lotes:
+                escritor.writerows(lote)
+                escritas += len(lote)
+                if progresso:
+                    progresso(escritas, total)
+    except BaseException:
+        if tamanho is None:
+            if os.path.exists(caminho):
+                os.remove(caminho)
+        else:
+            with open(caminho, "r+b") as arquivo:
+                arquivo.truncate(tamanho)
+        raise
+    return escritas
+
+
+def marcas_exportacao() -> List[dict]:
+    """Destinos da exportação incremental, do mais recente ao mais antigo."""
+    with closing(sqlite3.connect(config.DATABASE_CAMINHO)) as conn:
+        linhas = conn.execute(
+            "SELECT destino, ultimo_log_id, linhas, exportado_em FROM marcas_exportacao ORDER BY exportado_em DESC"
+        ).fetchall()
+    colunas = ("destino", "ultimo_log_id", "linhas", "exportado_em")
+    return [dict(zip(colunas, linha)) for linha in linhas]
+
+
+def definir_marca(destino: str, ultimo_log_id: int) -> None:
+    """Reposiciona a marca de um destino (0 reenvia o histórico inteiro na próxima exportação)."""
+    with closing(sqlite3.connect(config.DATABASE_CAMINHO, timeout=30)) as conn, conn:
+        conn.execute(
+            """
+            INSERT INTO marcas_exportacao (destino, ultimo_log_id) VALUES (?, ?)
+            ON CONFLICT (destino) DO UPDATE SET ultimo_log_id = excluded.ultimo_log_id
+            """,
+            (_chave_destino(destino), ultimo_log_id)
+        )
+
+
+def exportar_incremental(destino: str, lote: int = LOTE_PADRAO,
+                         progresso: Optional[Progresso] = None) -> Tuple[int, Optional[str]]:
+    """
+    Exporta os logs que ainda não foram para `destino`, com os nomes de
+    usuário e ferramenta, e avança a marca d'água do destino.
+
+    Destino .csv: as linhas são acrescentadas ao fim do arquivo. Destino
+    .xlsx: um .xlsx não cresce sem ser reescrito por inteiro, então cada
+    exportação grava um arquivo ao lado, <nome>_<id inicial>-<id final>.xlsx.
+
+    A faixa de ids é fixada no início e a marca só avança depois do arquivo
+    gravado. Se o processo cair entre as duas coisas, a faixa sai de novo na
+    exportação seguinte; a coluna log_id permite ao ERP descartar a repetição.
+
+    :return: (linhas exportadas, arquivo gravado — None se não havia logs novos)
+    """
+    chave = _chave_destino(destino)
+    with closing(sqlite3.connect(config.DATABASE_CAMINHO, timeout=30, isolation_level=None)) as conn:
+        conn.execute("BEGIN")
+        marca = conn.execute("SELECT ultimo_log_id FROM marcas_exportacao WHERE destino = ?", (chave,)).fetchone()
+        de = marca[0] if marca else 0
+        ate = conn.execute("SELECT COALESCE(MAX(id), 0) FROM logs").fetchone()[0]
+        if ate <= de:
+            conn.execute("COMMIT")
+            return 0, None
+        total = conn.execute("SELECT COUNT(*) FROM logs WHERE id > ? AND id <= ?", (de, ate)).fetchone()[0]
+        cursor = conn.execute(SELECT_LOGS_DETALHADOS, (de, ate))
+        cabecalho = [coluna[0] for coluna in cursor.description]
+        lotes = iter(lambda: cursor.fetchmany(lote), [])
+        if destino.lower().endswith(".csv"):
+            arquivo = destino
+            escritas = _anexar_csv(arquivo, cabecalho, lotes, progresso, total)
+        else:
+            base, extensao = os.path.splitext(destino)
+            arquivo = f"{base}_{de + 1}-{ate}{extensao or '.xlsx'}"
+            escritas = exportar_lotes(lotes, cabecalho, arquivo, "logs", progresso, total)
+        conn.execute("COMMIT")
+
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            """
+            INSERT INTO marcas_exportacao (destino, ultimo_log_id, linhas) VALUES (?, ?, ?)
+            ON CONFLICT (destino) DO UPDATE SET ultimo_log_id = excluded.ultimo_log_id,
+                linhas = linhas + excluded.linhas, exportado_em = CURRENT_TIMESTAMP
+            """,
+            (chave, ate, escritas)
+        )
+        conn.execute("COMMIT")
+    logger.info("Exportação incremental: logs %d a %d (%d linha(s)) em %s", de + 1, ate, escritas, arquivo)
+    return escritas, arquivo
+
+
+def _exportar_em_processo(banco: str, nome_tabela: str, caminho: str, fila, cancelar) -> int:
+    """Tarefa de um processo do pool: exporta uma tabela e relata o progresso pela fila."""
+    config.DATABASE_CAMINHO = banco
+
+    def relatar(escritas: int, total: Optional[int]) -> None:
+        if cancelar.is_set():
+            raise ExportacaoCancelada(nome_tabela)
+        fila.put((nome_tabela, escritas, total))
+
+    if cancelar.is_set():
+        raise ExportacaoCancelada(nome_tabela)
+    return exportar_tabela(nome_tabela, caminho, progresso=relatar)
+
+
+def exportar_tabelas(destinos: Dict[str, str], progresso: Optional[ProgressoTabela] = None,
+                     cancelar: Optional[threading.Event] = None,
+                     processos: Optional[int] = None) -> Dict[str, object]:
+    """
+    Exporta várias tabelas em paralelo, cada uma num processo, e bloqueia
+    até todas terminarem (chamar fora da thread da interface).
+
+    Os processos são criados com "spawn" também no Linux: o quiosque tem
+    threads com conexões abertas, que um fork copiaria no meio do uso.
+
+    :param destinos: {tabela: caminho do arquivo}
+    :param progresso: chamado na thread que chamou com (tabela, linhas gravadas, total)
+    :param cancelar: ao ser sinalizado, as tabelas em andamento param no
+                     próximo lote e as que ainda não começaram não começam
+    :param processos: tamanho do pool (padrão: um por tabela, até o número de CPUs)
+    :return: {tabela: linhas exportadas, ou a exceção que a interrompeu
+             (ExportacaoCancelada, se cancelada)}
+    """
+    if not destinos:
+        return {}
+    processos = processos or min(len(destinos), os.cpu_count() or 1)
+    contexto = multiprocessing.get_context("spawn")
+    resultados: Dict[str, object] = {}
+    with contexto.Manager() as gerente, ProcessPoolExecutor(processos, mp_context=contexto) as pool:
+        fila, sinal = gerente.Queue(), gerente.Event()
+        futuros = {
+            pool.submit(_exportar_em_processo, config.DATABASE_CAMINHO, tabela, caminho, fila, sinal): tabela
+            for tabela, caminho in destinos.items()
+        }
+
+        def repassar(espera: float) -> None:
+            """Entrega ao progresso as mensagens da fila, esperando até `espera` s pela primeira."""
+            try:
+                mensagem = fila.get(timeout=espera) if espera else fila.get_nowait()
+                while True:
+                    if progresso:
+                        progresso(*mensagem)
+                    mensagem = fila.get_nowait()
+            except queue.Empty:
+                pass
+
+        pendentes = set(futuros)
+        while pendentes:
+            if cancelar is not None and cancelar.is_set() and not sinal.is_set():
+                sinal.set()
+                for futuro in pendentes:
+                    futuro.cancel()
+            repassar(0.1)
+            pendentes = {futuro for futuro in pendentes if not futuro.done()}
+        repassar(0)
+
+        for futuro, tabela in futuros.items():
+            if futuro.cancelled():
+                resultados[tabela] = ExportacaoCancelada(tabela)
+            elif futuro.exception() is not None:
+                resultados[tabela] = futuro.exception()
+            else:
+                resultados[tabela] = futuro.result()
+
+    # Um processo derrubado no meio (BrokenProcessPool) não chega a apagar o seu .tmp
+    for caminho in destinos.values():
+        if os.path.exists(caminho + ".tmp"):
+            os.remove(caminho + ".tmp")
+    for tabela, resultado in resultados.items():
+        if isinstance(resultado, Exception) and not isinstance(resultado, ExportacaoCancelada):
+            logger.error("Falha ao exportar '%s': %s", tabela, resultado)
+    return resultados
+
+
+def listar_tabelas() -> List[str]:
+    """
+    Nomes das tabelas do banco em uso, sem as tabelas virtuais (o índice de
+    busca FTS5) e as tabelas internas delas.
+    """
+    with closing(sqlite3.connect(config.DATABASE_CAMINHO)) as conn:
+        tabelas = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table'").fetchall()
+    virtuais = [nome for nome, sql in tabelas if (sql or "").upper().startswith("CREATE VIRTUAL TABLE")]
+    return [
+        nome for nome, _ in tabelas
+        if nome not in virtuais and not any(nome.startswith(virtual + "_") for virtual in virtuais)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta tabelas em fluxo para .xlsx ou .csv")
+    parser.add_argument("tabela", nargs="?")
+    parser.add_argument("destino", help="Arquivo .xlsx ou .csv (com --todas, a pasta)")
+    parser.add_argument("--todas", action="store_true", help="Todas as tabelas, em paralelo, para a pasta destino")
+    parser.add_argument("--csv", action="store_true", help="Com --todas, gravar .csv em vez de .xlsx")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Só os logs ainda não exportados para o destino (.csv ou .xlsx)")
+    parser.add_argument("--desde", type=int, help="Com --incremental, reposiciona antes a marca neste logs.id")
+    args = parser.parse_args()
+
+    if args.incremental:
+        from database.database import criar_tabelas
+        criar_tabelas()
+        if args.desde is not None:
+            definir_marca(args.destino, args.desde)
+        linhas, arquivo = exportar_incremental(args.destino)
+        print(f"✅ {linhas} logs novos exportados em {arquivo}" if arquivo else "ℹ️ Nenhum log novo para este destino.")
+    elif args.todas:
+        os.makedirs(args.destino, exist_ok=True)
+        extensao = "csv" if args.csv else "xlsx"
+        destinos = {tabela: os.path.join(args.destino, f"{tabela}.{extensao}") for tabela in listar_tabelas()}
+        for tabela, resultado in exportar_tabelas(destinos).items():
+            if isinstance(resultado, Exception):
+                print(f"❌ {tabela}: {resultado}")
+            else:
+                print(f"✅ {tabela}: {resultado} linhas")
+    elif args.tabela:
+        def _mostrar(escritas, total):
+            print(f"\r⏳ {escritas}/{total} linhas", end="", flush=True)
+
+        linhas = exportar_tabela(args.tabela, args.destino, progresso=_mostrar)
+        print(f"\n✅ {linhas} linhas exportadas em {args.destino}")
+    else:
+        parser.error("informe a tabela ou use --todas")
@@ -8,14 +8,20 @@ Módulo responsável pela lógica de movimentações de ferramentas:
 - adição
 - subtração
 - zeragem de estoque
+- retirada/devolução em lote (carrinho)
 
 Remove dependência circular movendo lógica de movimentação para este serviço.
 """
 import logging
-from typing import Optional, Dict
+from typing import Optional, Dict, Sequence, Tuple
 
-from database.database_utils import executar_query
-from database.database import registrar_movimentacao as db_registrar_movimentacao, buscar_ferramenta_por_codigo
+from database.conexao import transacao
+from database.diretorio_usuarios import buscar_usuario_por_rfid
+from database.database import (
+    registrar_movimentacao as db_registrar_movimentacao,
+    registrar_movimentacoes_em_lote as db_registrar_movimentacoes_em_lote,
+    buscar_ferramenta_por_codigo
+)
 
 # Configuração do logger
 logger = logging.getLogger(__name__)
@@ -41,20 +47,19 @@ def realizar_movimentacao(
     :param operacoes: número de operações extras em consumo
     :param avaliacao: nota de avaliação em consumo
     :return: dict com chaves 'status' (bool) e 'mensagem' (str)
+
+    O usuário é resolvido pelo diretório em memória; o registro no banco roda
+    numa única transação (ver database.database.registrar_movimentacao).
     """
     try:
-        rfid_limpo = rfid.strip()
         codigo_limpo = codigo_barra.strip()
         # Busca ID do usuário a partir do RFID
-        result = executar_query(
-            "SELECT id FROM usuarios WHERE rfid = ?", (rfid_limpo,), fetch=True
-        )
-        if not result:
+        usuario = buscar_usuario_por_rfid(rfid)
+        if not usuario:
             return {"status": False, "mensagem": "⚠️ Usuário não encontrado!"}
-        usuario_id = result[0][0]
         # Chama função de banco para registrar movimentação
-        resp = db_registrar_movimentacao(
-            usuario_id,
+        return db_registrar_movimentacao(
+            usuario["id"],
             codigo_limpo,
             acao,
             quantidade,
@@ -62,12 +67,35 @@ def realizar_movimentacao(
             operacoes,
             avaliacao
         )
-        return resp
     except Exception as e:
         logger.exception("Erro ao realizar movimentação")
         return {"status": False, "mensagem": f"⚠️ Erro ao realizar movimentação: {e}"}
 
 
+def realizar_movimentacoes_em_lote(
+    rfid: str,
+    itens: Sequence[Tuple[str, int]],
+    acao: str
+) -> Dict[str, object]:
+    """
+    Retirada ou devolução de vários itens numa única transação (modo lote).
+
+    :param rfid: código RFID do usuário
+    :param itens: pares (codigo_barra, quantidade) do carrinho
+    :param acao: 'RETIRADA' ou 'DEVOLUCAO'
+    :return: dict com 'status', 'mensagem' e 'erros' (itens recusados)
+    """
+    try:
+        usuario = buscar_usuario_por_rfid(rfid)
+        if not usuario:
+            return {"status": False, "mensagem": "⚠️ Usuário não encontrado!", "erros": []}
+        itens_limpos = [(codigo.strip(), quantidade) for codigo, quantidade in itens]
+        return db_registrar_movimentacoes_em_lote(usuario["id"], itens_limpos, acao)
+    except Exception as e:
+        logger.exception("Erro ao realizar movimentação em lote")
+        return {"status": False, "mensagem": f"⚠️ Erro ao realizar movimentação em lote: {e}", "erros": []}
+
+
 def retirar_ferramenta(rfid: str, codigo_barra: str, quantidade: int = 1) -> Dict[str, object]:
     """Retira uma ferramenta do estoque ativo."""
     return realizar_movimentacao(rfid, codigo_barra, "RETIRADA", quantidade)
@@ -92,11 +120,16 @@ def zerar_ferramenta(rfid: str, codigo_barra: str) -> Dict[str, object]:
     """
     Zera todo o estoque ativo de uma ferramenta marcando subtração do total armazenado.
     """
-    # Busca dados da ferramenta para obter estoque atual
-    dados = buscar_ferramenta_por_codigo(codigo_barra)
-    if not dados:
-        return {"status": False, "mensagem": "⚠️ Ferramenta não encontrada!"}
-    qtd = dados.get("estoque_almoxarifado", 0)
-    if qtd <= 0:
-        return {"status": False, "mensagem": "⚠️ Estoque já está zerado!"}
-    return realizar_movimentacao(rfid, codigo_barra, "SUBTRACAO", qtd)
+    try:
+        # Leitura do estoque e subtração na mesma transação
+        with transacao():
+            dados = buscar_ferramenta_por_codigo(codigo_barra)
+            if not dados:
+                return {"status": False, "mensagem": "⚠️ Ferramenta não encontrada!"}
+            qtd = dados.get("estoque_almoxarifado", 0)
+            if qtd <= 0:
+                return {"status": False, "mensagem": "⚠️ Estoque já está zerado!"}
+            return realizar_movimentacao(rfid, codigo_barra, "SUBTRACAO", qtd)
+    except Exception as e:
+        logger.exception("Erro ao zerar ferramenta")
+        return {"status": False, "mensagem": f"⚠️ Erro ao zerar ferramenta: {e}"}
@@ -9,6 +9,8 @@ import logging
 from typing import Tuple
 
 from database.database_utils import executar_query
+from database.cache_ferramentas import invalidar_ferramenta
+from database.diretorio_usuarios import recarregar_usuarios
 
 # Configuração do logger
 erlogger = logging.getLogger(__name__)
@@ -35,6 +37,7 @@ def registrar_usuario(nome: str, senha: str, rfid: str, tipo: str) -> str:
             " VALUES (?, ?, ?, ?)"
         )
         executar_query(query, (nome_valido, senha_valida, rfid_valido, tipo_valido))
+        recarregar_usuarios()
         return f"✅ Usuário '{nome_valido}' registrado com sucesso!"
     except Exception as e:
         erlogger.exception("Erro ao registrar usuário")
@@ -70,6 +73,7 @@ def registrar_ferramenta(
             " VALUES (?, ?, ?, ?)"
         )
         executar_query(query, (nome_valido, codigo_valido, estoque_almoxarifado, consumivel_flag))
+        invalidar_ferramenta(codigo_barra=codigo_valido)
         return f"✅ Ferramenta '{nome_valido}' registrada com sucesso!"
     except Exception as e:
         erlogger.exception("Erro ao registrar ferramenta")
@@ -1,4 +1,4 @@
-from database.database_utils import executar_query
+from database.diretorio_usuarios import buscar_usuario_por_rfid
 
 def ler_rfid() -> str | None:
     """
@@ -23,7 +23,7 @@ def ler_rfid() -> str | None:
 
 def get_user_from_rfid() -> str | None:
     """
-    Lê o RFID via entrada padrão e consulta diretamente o banco de dados.
+    Lê o RFID via entrada padrão e resolve o usuário pelo diretório em memória.
     
     Retorna:
         str: Nome do usuário, se encontrado.
@@ -35,12 +35,11 @@ def get_user_from_rfid() -> str | None:
             print("⚠️ Nenhum código RFID lido.")
             return None
 
-        query = "SELECT nome FROM usuarios WHERE rfid = ?"
-        user = executar_query(query, (rfid_code,), fetch_one=True)
+        user = buscar_usuario_por_rfid(rfid_code)
 
         if user:
-            print(f"✅ Usuário encontrado: {user[0]}")
-            return user[0]
+            print(f"✅ Usuário encontrado: {user['nome']}")
+            return user['nome']
         else:
             print("⚠️ Usuário não encontrado!")
             return None